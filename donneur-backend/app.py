@@ -1,14 +1,19 @@
 from flask                  import Flask
-from controllers            import Controller
+from controllers            import Controller, FeedController, SubscriptionController, FriendController, ReceiverController, TransactionController, WebhookQueue
+from models                 import Model, Post, Transaction
+from storage                import Storage
+from billing                import StripeClient, FakeStripe
 from flask_restful          import Api
 from flask_cors             import CORS
+import  click
+import  os
 # from flask_socketio         import join_room, leave_room, send, SocketIO
 
-from routes.feed            import GetFeedResource, ReplyToPostResource, CreatePostResource, DeletePostResource, GetPostResource, GetUserPostsResource
-from routes.friends         import GetFriendsResource, AddFriendResource, RemoveFriendResource, ReplyFriendRequestResource
-from routes.payments        import CreateDonationResource, ConfirmDonationResource, CancelDonationResource
+from routes.feed            import GetFeedResource, ReplyToPostResource, CreatePostResource, DeletePostResource, GetPostResource, GetUserPostsResource, GetCacheStatsResource, LikePostResource, UnlikePostResource
+from routes.friends         import GetFriendsResource, AddFriendResource, RemoveFriendResource, ReplyFriendRequestResource, GetFriendSuggestionsResource, GetMutualsResource
+from routes.payments        import CreateDonationResource, ConfirmDonationResource, CancelDonationResource, CreateDonationBatchResource
 from routes.receivers       import CreateReceiverResource, GetIDProfile, AddEmailResource, VerifyLinkResource, CreateAppAccountResource, DonationProfileResource, GetReceiverResource, GetBalanceResource, GetReceiverProfile
-from routes.transactions    import GetTransactionsResource, SendFundsResource, WithdrawFundsResource
+from routes.transactions    import GetTransactionsResource, SendFundsResource, WithdrawFundsResource, GetRollupResource
 from routes.subscriptions   import SubscribeResource, UnsubscribeResource, GetSubscriptionsResource
 from routes.organizations   import GetOrganizationsResource, GetCurrentOccupancy, SetCurrentOccupancy, SetData
 from routes.authentication  import AuthenticationResource
@@ -29,12 +34,23 @@ CORS(app)
 # socketio        = SocketIO(app, cors_allowed_origins="*")
 
 
+@app.before_request
+def begin_request():
+    Model.begin_request()
+
+@app.teardown_request
+def end_request( exception = None ):
+    Model.end_request()
+
+
 api.add_resource(   AuthenticationResource,     '/authenticate'                 )
 
 api.add_resource(   AddFriendResource,          '/friend/add'                   )
 api.add_resource(   GetFriendsResource,         '/friend/get'                   )
 api.add_resource(   ReplyFriendRequestResource, '/friend/reply'                 )
 api.add_resource(   RemoveFriendResource,       '/friend/remove'                )
+api.add_resource(   GetFriendSuggestionsResource, '/friend/suggestions'         )
+api.add_resource(   GetMutualsResource,         '/friend/mutuals'               ) # mutual friends and shelters params: ids, limit
 
 
 api.add_resource(   GetReceiverResource,        '/receiver/get'                 )
@@ -53,6 +69,7 @@ api.add_resource(   GetCurrentOccupancy,        '/organization/get_occupancy'
 api.add_resource(   SetData,                    '/organization/set_info'        )
 
 api.add_resource(   CreateDonationResource,     '/donation/create'              )
+api.add_resource(   CreateDonationBatchResource, '/donation/create_batch'       )
 api.add_resource(   CancelDonationResource,     '/donation/cancel'              )
 api.add_resource(   ConfirmDonationResource,    '/donation/confirm'             )
 
@@ -64,6 +81,7 @@ api.add_resource(   GetSubscriptionsResource,   '/subscription/get'
 api.add_resource(   GetTransactionsResource,    '/transaction/get'              )
 api.add_resource(   SendFundsResource,          '/transaction/send'             )
 api.add_resource(   WithdrawFundsResource,      '/transaction/withdraw'         )
+api.add_resource(   GetRollupResource,          '/transaction/rollup'           )
 
 api.add_resource(   IdPictureUploadResource,    '/media/set_id_picture'         )
 api.add_resource(   IdDocumentUploadResource,   '/media/set_id_document'        )
@@ -76,10 +94,106 @@ api.add_resource(   CreatePostResource,         '/feed/create'
 api.add_resource(   DeletePostResource,         '/feed/delete'                  ) # delete a post params: post_id
 api.add_resource(   ReplyToPostResource,        '/feed/reply'                   ) # reply to a post params: post_id
 api.add_resource(   GetUserPostsResource,       '/feed/get_user_posts'          ) # reply to a post params: post_id
+api.add_resource(   LikePostResource,           '/feed/like'                    ) # like a post params: post_id
+api.add_resource(   UnlikePostResource,         '/feed/unlike'                  ) # unlike a post params: post_id
+api.add_resource(   GetCacheStatsResource,      '/feed/cache_stats'             ) # feed and author cache hit/miss counters, ADMIN_IDS only
 
 
 
 
 @app.route('/')
 def index():
-    return {'ok':'ok'}
\ No newline at end of file
+    return {'ok':'ok'}
+
+
+
+@app.cli.command('backfill-subscribers')
+def backfill_subscribers():
+    count : int = SubscriptionController.backfill_subscribers()
+    print(f'{count} subscriber entries written')
+
+@app.cli.command('rebuild-timelines')
+def rebuild_timelines():
+    receivers : dict = Storage.reference('/receivers').get(shallow = True) or {}
+    for receiver_id in receivers:
+        count : int = FeedController.rebuild_timeline( receiver_id )
+        print(f'{receiver_id} : {count} entries')
+
+@app.cli.command('refresh-author-snapshots')
+@click.option('--all', 'everyone', is_flag = True, help = 'Rewrite the snapshots of every author, not only the stale ones')
+def refresh_author_snapshots( everyone : bool ):
+    author_ids  : list[str] | None  = Post.get_authors() if everyone else None
+    count       : int               = FeedController.refresh_author_snapshots( author_ids )
+    print(f'{count} post snapshots written')
+
+@app.cli.command('purge-deleted-posts')
+def purge_deleted_posts():
+    count : int = Post.purge_deleted()
+    print(f'{count} posts purged')
+
+@app.cli.command('backfill-post-previews')
+def backfill_post_previews():
+    count : int = Post.backfill_previews()
+    print(f'{count} post previews written')
+
+@app.cli.command('backfill-friend-index')
+def backfill_friend_index():
+    count : int = FriendController.backfill_index()
+    print(f'{count} friendships indexed')
+
+@app.cli.command('build-friend-suggestions')
+def build_friend_suggestions():
+    count : int = FriendController.build_suggestions()
+    print(f'{count} suggestion lists written')
+
+@app.cli.command('migrate-balances')
+def migrate_balances():
+    count : int = ReceiverController.migrate_balances()
+    print(f'{count} opening balances written to the ledger')
+
+@app.cli.command('compact-ledgers')
+def compact_ledgers():
+    count : int = ReceiverController.compact_ledgers()
+    print(f'{count} balance snapshots updated')
+
+@app.cli.command('reconcile-ledgers')
+def reconcile_ledgers():
+    count : int = ReceiverController.reconcile_ledgers()
+    print(f'{count} debit totals rebuilt from ledger entries')
+
+@app.cli.command('backfill-user-transactions')
+def backfill_user_transactions():
+    count : int = Transaction.backfill_index()
+    print(f'{count} transactions indexed')
+
+@app.cli.command('reconcile-rollups')
+def reconcile_rollups():
+    count : int = TransactionController.reconcile_rollups()
+    print(f'{count} transactions rolled up')
+
+@app.cli.command('drain-webhooks')
+def drain_webhooks():
+    count : int = WebhookQueue.drain()
+    print(f'{count} webhook events processed')
+
+@app.cli.command('purge-webhooks')
+def purge_webhooks():
+    count : int = WebhookQueue.purge()
+    print(f'{count} webhook events purged')
+
+@app.cli.command('register-payment-domain')
+def register_payment_domain():
+    domain : dict = StripeClient.register_domain( os.getenv('DONATION_DOMAIN') )
+    print(f'{domain["domain_name"]} registered')
+
+@app.cli.command('fake-stripe')
+@click.option('--port', type = int, default = 12111, help = 'Port to listen on, point STRIPE_API_BASE at it')
+@click.option('--latency-ms', type = float, default = 0, help = 'Delay added to every response')
+def fake_stripe( port : int, latency_ms : float ):
+    server : FakeStripe = FakeStripe( port = port, latency = latency_ms / 1000 )
+    print(f'Fake Stripe listening on {server.url}')
+    server.serve()
+
+@app.cli.command('run-workers')
+def run_workers():
+    Controller.run_workers()
@@ -0,0 +1,66 @@
+# Run from donneur-backend with either of:
+#   python benchmarks/friend_suggestions.py --users 100000
+#   python -m benchmarks.friend_suggestions --users 100000
+import  os
+import  sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from    utils           import SuggestionEngine
+import  argparse
+import  random
+import  time
+
+
+def generate( users : int, degree : int, shelters : int, seed : int ) -> tuple[dict, dict]:
+    generator       : random.Random = random.Random(seed)
+    user_ids        : list[str]     = [f'user-{index}' for index in range(users)]
+    shelter_ids     : list[str]     = [f'shelter-{index}' for index in range(shelters)]
+    friendships     : dict          = {}
+    subscriptions   : dict          = {}
+
+    for index in range(users * degree // 2):
+        user_1, user_2 = generator.sample(user_ids, 2)
+        friendships[f'friendship-{index}'] = {
+            'user_1'        : user_1,
+            'user_2'        : user_2,
+            'friends_since' : '2025-01-01T00:00:00' if generator.random() < 0.9 else None
+        }
+
+    for user_id in user_ids:
+        subscriptions[user_id] = { shelter_id : True for shelter_id in generator.sample(shelter_ids, generator.randint(0, 3)) }
+
+    return friendships, subscriptions
+
+
+def main():
+    parser = argparse.ArgumentParser( description = 'Benchmark the friend suggestions batch job on a synthetic graph' )
+    parser.add_argument( '--users',     type = int, default = 100_000 )
+    parser.add_argument( '--degree',    type = int, default = 10 )
+    parser.add_argument( '--shelters',  type = int, default = 500 )
+    parser.add_argument( '--top-k',     type = int, default = SuggestionEngine.TOP_K )
+    parser.add_argument( '--seed',      type = int, default = 0 )
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    friendships, subscriptions = generate( args.users, args.degree, args.shelters, args.seed )
+    print(f'generated {args.users} users, {len(friendships)} friendships in {time.perf_counter() - started:.2f}s')
+
+    started = time.perf_counter()
+    friends, linked     = SuggestionEngine.build_graph( friendships )
+    shelters, members   = SuggestionEngine.build_shelters( subscriptions )
+    print(f'graph built in {time.perf_counter() - started:.2f}s')
+
+    started     = time.perf_counter()
+    users       = 0
+    candidates  = 0
+    for user, suggestions in SuggestionEngine.suggest_graph( friends, linked, shelters, members, args.top_k ):
+        users       += 1
+        candidates  += len(suggestions)
+    elapsed = time.perf_counter() - started
+
+    print(f'{users} users, {candidates} suggestions in {elapsed:.2f}s ({elapsed / max(users, 1) * 1e6:.0f}us per user)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,2 @@
+from .stripe_client import StripeClient
+from .fake_stripe   import FakeStripe
@@ -0,0 +1,148 @@
+from    http.server     import ThreadingHTTPServer, BaseHTTPRequestHandler
+from    urllib.parse    import parse_qsl
+import  threading
+import  secrets
+import  json
+import  time
+
+
+class FakeStripe:
+
+    class Handler(BaseHTTPRequestHandler):
+
+        protocol_version        : str   = 'HTTP/1.1'
+        disable_nagle_algorithm : bool  = True
+
+        def log_message( self, format : str, *args ) -> None:
+            pass
+
+        def __reply( self, status : int, body : dict ) -> None:
+            data : bytes = json.dumps(body).encode()
+
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def __form( self ) -> dict:
+            length : int = int(self.headers.get('Content-Length') or 0)
+            return dict(parse_qsl( self.rfile.read(length).decode() )) if length else {}
+
+        def __dispatch( self, method : str ) -> None:
+            server  : FakeStripe    = self.server.fake
+            path    : list[str]     = [segment for segment in self.path.split('?')[0].split('/') if segment]
+            form    : dict          = self.__form() if method == 'POST' else {}
+
+            if server.latency:
+                time.sleep(server.latency)
+
+            with server.lock:
+                server.requests += 1
+                response : tuple[int, dict] = server.route( method, path, form )
+
+            self.__reply( *response )
+
+        def do_GET( self ) -> None:
+            self.__dispatch('GET')
+
+        def do_POST( self ) -> None:
+            self.__dispatch('POST')
+
+        def do_DELETE( self ) -> None:
+            self.__dispatch('DELETE')
+
+    def __init__( self, host : str = '127.0.0.1', port : int = 12111, latency : float = 0.0 ):
+        self.host       : str                   = host
+        self.port       : int                   = port
+        self.latency    : float                 = latency
+        self.lock       : threading.Lock        = threading.Lock()
+        self.requests   : int                   = 0
+        self.intents    : dict                  = {}
+        self.server     : ThreadingHTTPServer   = None
+        self.thread     : threading.Thread      = None
+
+    @property
+    def url( self ) -> str:
+        return f'http://{self.host}:{self.port}'
+
+    def __identifier( prefix : str ) -> str:
+        return f'{prefix}_{secrets.token_hex(12)}'
+
+    def __not_found( path : list[str] ) -> tuple[int, dict]:
+        return 404, { 'error' : { 'type' : 'invalid_request_error', 'message' : f'Unrecognized request URL : /{"/".join(path)}' } }
+
+    def payment_method( payment_method_id : str ) -> dict:
+        return {
+            'id'                : payment_method_id,
+            'object'            : 'payment_method',
+            'type'              : 'card',
+            'billing_details'   : {
+                'name'      : 'Fake Donor',
+                'email'     : None,
+                'phone'     : None,
+                'address'   : {
+                    'line1'         : '1 Fake Street',
+                    'line2'         : None,
+                    'city'          : 'Montreal',
+                    'state'         : 'QC',
+                    'postal_code'   : 'H2X 1Y4',
+                    'country'       : 'CA'
+                }
+            },
+            'card'              : { 'brand' : 'visa', 'last4' : '4242', 'wallet' : { 'type' : 'apple_pay' } }
+        }
+
+    def route( self, method : str, path : list[str], form : dict ) -> tuple[int, dict]:
+        if len(path) < 2 or path[0] != 'v1':
+            return FakeStripe.__not_found(path)
+
+        match method, path[1:]:
+            case 'POST', ['payment_intents']:
+                intent_id : str = FakeStripe.__identifier('pi')
+                self.intents[intent_id] = {
+                    'id'                    : intent_id,
+                    'object'                : 'payment_intent',
+                    'amount'                : int(form.get('amount', 0)),
+                    'currency'              : form.get('currency', 'cad'),
+                    'status'                : 'requires_payment_method',
+                    'client_secret'         : f'{intent_id}_secret_{secrets.token_hex(12)}',
+                    'payment_method_types'  : [value for key, value in form.items() if key.startswith('payment_method_types')],
+                    'created'               : int(time.time())
+                }
+                return 200, self.intents[intent_id]
+
+            case 'GET', ['payment_intents', intent_id] if intent_id in self.intents:
+                return 200, self.intents[intent_id]
+
+            case 'POST', ['payment_intents', intent_id, 'cancel'] if intent_id in self.intents:
+                self.intents[intent_id]['status'] = 'canceled'
+                return 200, self.intents[intent_id]
+
+            case 'GET', ['payment_methods', payment_method_id]:
+                return 200, FakeStripe.payment_method( payment_method_id )
+
+            case 'POST', ['payment_method_domains']:
+                return 200, { 'id' : FakeStripe.__identifier('pmd'), 'object' : 'payment_method_domain', 'domain_name' : form.get('domain_name'), 'enabled' : True }
+
+        return FakeStripe.__not_found(path)
+
+    def start( self ) -> str:
+        self.server         = ThreadingHTTPServer( (self.host, self.port), FakeStripe.Handler )
+        self.server.fake    = self
+        self.port           = self.server.server_address[1]
+        self.thread         = threading.Thread( target = self.server.serve_forever, name = 'fake-stripe', daemon = True )
+        self.thread.start()
+        return self.url
+
+    def serve( self ) -> None:
+        self.server         = ThreadingHTTPServer( (self.host, self.port), FakeStripe.Handler )
+        self.server.fake    = self
+        self.server.serve_forever()
+
+    def stop( self ) -> None:
+        if self.server is None:
+            return
+        self.server.shutdown()
+        self.server.server_close()
+        self.server = None
@@ -0,0 +1,99 @@
+from    concurrent.futures  import ThreadPoolExecutor
+from    requests.adapters   import HTTPAdapter
+from    typing              import Callable
+from    cache               import Cache, MemoryCache
+import  threading
+import  requests
+import  stripe
+
+
+class StripeClient:
+
+    api_key         : str           = None
+    api_base        : str           = None
+    connect_timeout : float         = 3
+    read_timeout    : float         = 15
+    pool_size       : int           = 32
+    max_retries     : int           = 2
+    concurrency     : int           = 8
+
+    session         : requests.Session  = None
+    method_cache    : Cache             = MemoryCache( max_entries = 1024, ttl = 60 )
+
+    __pool          : ThreadPoolExecutor    = None
+    __pool_lock     : threading.Lock        = threading.Lock()
+
+    def configure( api_key : str, api_base : str = None, connect_timeout : float = None, read_timeout : float = None, pool_size : int = None, max_retries : int = None, concurrency : int = None, method_cache : Cache = None ) -> None:
+        StripeClient.api_key            = api_key
+        StripeClient.api_base           = api_base          or StripeClient.api_base
+        StripeClient.connect_timeout    = connect_timeout   or StripeClient.connect_timeout
+        StripeClient.read_timeout       = read_timeout      or StripeClient.read_timeout
+        StripeClient.pool_size          = pool_size         or StripeClient.pool_size
+        StripeClient.max_retries        = max_retries if max_retries is not None else StripeClient.max_retries
+        StripeClient.concurrency        = concurrency       or StripeClient.concurrency
+        StripeClient.method_cache       = method_cache      or StripeClient.method_cache
+
+        with StripeClient.__pool_lock:
+            if StripeClient.__pool is not None:
+                StripeClient.__pool.shutdown(wait = False)
+                StripeClient.__pool = None
+
+        if StripeClient.session is not None:
+            StripeClient.session.close()
+
+        adapter : HTTPAdapter = HTTPAdapter( pool_connections = 1, pool_maxsize = max(StripeClient.pool_size, StripeClient.concurrency) )
+
+        StripeClient.session = requests.Session()
+        StripeClient.session.mount('https://', adapter)
+        StripeClient.session.mount('http://', adapter)
+
+        stripe.api_key              = StripeClient.api_key
+        stripe.max_network_retries  = StripeClient.max_retries
+        stripe.default_http_client  = stripe.RequestsClient(
+            timeout = (StripeClient.connect_timeout, StripeClient.read_timeout),
+            session = StripeClient.session
+        )
+        if StripeClient.api_base:
+            stripe.api_base = StripeClient.api_base
+
+    def gather( calls : list[Callable] ) -> list:
+        with StripeClient.__pool_lock:
+            if StripeClient.__pool is None:
+                StripeClient.__pool = ThreadPoolExecutor( max_workers = StripeClient.concurrency, thread_name_prefix = 'stripe' )
+            pool : ThreadPoolExecutor = StripeClient.__pool
+
+        def settle( call : Callable ):
+            try:
+                return call()
+            except Exception as e:
+                return e
+
+        return list(pool.map(settle, calls))
+
+    def create_intent( amount : int, currency : str = 'cad', payment_method_types : list[str] = None, idempotency_key : str = None ) -> dict:
+        intent = stripe.PaymentIntent.create(
+            amount                  = amount,
+            currency                = currency,
+            payment_method_types    = payment_method_types or ['card'],
+            idempotency_key         = idempotency_key
+        )
+        return intent.to_dict()
+
+    def cancel_intent( intent_id : str ) -> dict:
+        return stripe.PaymentIntent.cancel( intent_id ).to_dict()
+
+    def retrieve_payment_method( payment_method_id : str ) -> dict:
+        cached : dict | None = StripeClient.method_cache.get( payment_method_id )
+
+        if cached is not None:
+            return cached
+
+        payment_method : dict = stripe.PaymentMethod.retrieve( payment_method_id ).to_dict()
+        StripeClient.method_cache.set( payment_method_id, payment_method )
+        return payment_method
+
+    def register_domain( domain_name : str ) -> dict:
+        return stripe.PaymentMethodDomain.create( domain_name = domain_name ).to_dict()
+
+    def verify_webhook( payload : bytes, signature : str, secret : str ) -> None:
+        stripe.Webhook.construct_event( payload, signature, secret )
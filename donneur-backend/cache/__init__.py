@@ -0,0 +1,3 @@
+from .cache         import Cache
+from .memory_cache  import MemoryCache
+from .sqlite_cache  import SQLiteCache
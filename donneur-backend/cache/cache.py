@@ -0,0 +1,47 @@
+import  os
+
+
+class Cache:
+
+    shared : bool = False
+
+    def __init__( self, max_entries : int = 1024, ttl : float = 300 ):
+        self.max_entries    : int   = max_entries
+        self.ttl            : float = ttl
+        self.hits           : int   = 0
+        self.misses         : int   = 0
+
+    def get( self, key : str ):
+        raise NotImplementedError()
+
+    def set( self, key : str, value, ttl : float = None ) -> None:
+        raise NotImplementedError()
+
+    def delete( self, *keys : str ) -> None:
+        raise NotImplementedError()
+
+    def clear( self ) -> None:
+        raise NotImplementedError()
+
+    def keys( self ) -> list[str]:
+        raise NotImplementedError()
+
+    def stats( self ) -> dict:
+        return {'hits' : self.hits, 'misses' : self.misses}
+
+    def from_env( prefix : str, max_entries : int = 1024, ttl : float = 300 ) -> 'Cache':
+        from .memory_cache import MemoryCache
+        from .sqlite_cache import SQLiteCache
+
+        backend     : str   = os.getenv(f'{prefix}_BACKEND', 'memory')
+        max_entries : int   = int(os.getenv(f'{prefix}_SIZE', max_entries))
+        ttl         : float = float(os.getenv(f'{prefix}_TTL', ttl))
+
+        match backend:
+            case 'memory':
+                return MemoryCache( max_entries, ttl )
+            case 'sqlite':
+                path : str = os.getenv(f'{prefix}_PATH', f'/tmp/donneur-{prefix.lower()}.sqlite3')
+                return SQLiteCache( path, prefix.lower(), max_entries, ttl )
+            case _:
+                raise ValueError(f'Unknown cache backend : {backend}')
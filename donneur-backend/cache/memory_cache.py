@@ -0,0 +1,51 @@
+from    collections     import OrderedDict
+from    .cache          import Cache
+import  threading
+import  copy
+import  time
+
+
+class MemoryCache(Cache):
+
+    def __init__( self, max_entries : int = 1024, ttl : float = 300 ):
+        super().__init__( max_entries, ttl )
+        self.entries    : OrderedDict       = OrderedDict()
+        self.lock       : threading.Lock    = threading.Lock()
+
+    def get( self, key : str ):
+        with self.lock:
+            entry : tuple | None = self.entries.get(key)
+
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+
+    def set( self, key : str, value, ttl : float = None ) -> None:
+        expires_at : float = time.monotonic() + (ttl if ttl is not None else self.ttl)
+
+        with self.lock:
+            self.entries[key] = (expires_at, copy.deepcopy(value))
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last = False)
+
+    def delete( self, *keys : str ) -> None:
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+
+    def clear( self ) -> None:
+        with self.lock:
+            self.entries.clear()
+
+    def keys( self ) -> list[str]:
+        now : float = time.monotonic()
+        with self.lock:
+            return [key for key, (expires_at, _) in reversed(self.entries.items()) if expires_at > now]
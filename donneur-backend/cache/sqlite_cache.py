@@ -0,0 +1,89 @@
+from    .cache          import Cache
+import  threading
+import  sqlite3
+import  json
+import  time
+
+
+class SQLiteCache(Cache):
+
+    shared : bool = True
+
+    def __init__( self, path : str, name : str = 'cache', max_entries : int = 1024, ttl : float = 300 ):
+        super().__init__( max_entries, ttl )
+        self.path       : str               = path
+        self.table      : str               = ''.join( character for character in name if character.isalnum() or character == '_' )
+        self.local      : threading.local   = threading.local()
+
+        with self.__connection() as connection:
+            connection.execute(
+                f'CREATE TABLE IF NOT EXISTS {self.table} ('
+                '   key         TEXT PRIMARY KEY,'
+                '   value       TEXT NOT NULL,'
+                '   expires_at  REAL NOT NULL,'
+                '   accessed_at REAL NOT NULL'
+                ')'
+            )
+            connection.execute(f'CREATE INDEX IF NOT EXISTS {self.table}_accessed_at ON {self.table} (accessed_at)')
+
+    def __connection( self ) -> sqlite3.Connection:
+        connection : sqlite3.Connection | None = getattr(self.local, 'connection', None)
+
+        if connection is None:
+            connection = sqlite3.connect( self.path, timeout = 5, isolation_level = None )
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self.local.connection = connection
+
+        return connection
+
+    def get( self, key : str ):
+        now         : float             = time.time()
+        connection  : sqlite3.Connection = self.__connection()
+
+        row : tuple | None = connection.execute(
+            f'SELECT value FROM {self.table} WHERE key = ? AND expires_at > ?', (key, now)
+        ).fetchone()
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        connection.execute(f'UPDATE {self.table} SET accessed_at = ? WHERE key = ?', (now, key))
+        self.hits += 1
+        return json.loads(row[0])
+
+    def set( self, key : str, value, ttl : float = None ) -> None:
+        now         : float             = time.time()
+        expires_at  : float             = now + (ttl if ttl is not None else self.ttl)
+        connection  : sqlite3.Connection = self.__connection()
+
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            connection.execute(
+                f'INSERT OR REPLACE INTO {self.table} (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)',
+                (key, json.dumps(value), expires_at, now)
+            )
+            connection.execute(f'DELETE FROM {self.table} WHERE expires_at <= ?', (now,))
+            connection.execute(
+                f'DELETE FROM {self.table} WHERE key IN ('
+                f'  SELECT key FROM {self.table} ORDER BY accessed_at DESC LIMIT -1 OFFSET ?'
+                ')',
+                (self.max_entries,)
+            )
+
+    def delete( self, *keys : str ) -> None:
+        if not keys:
+            return
+        self.__connection().execute(
+            f'DELETE FROM {self.table} WHERE key IN ({", ".join("?" for _ in keys)})', keys
+        )
+
+    def clear( self ) -> None:
+        self.__connection().execute(f'DELETE FROM {self.table}')
+
+    def keys( self ) -> list[str]:
+        rows : list = self.__connection().execute(
+            f'SELECT key FROM {self.table} WHERE expires_at > ? ORDER BY accessed_at DESC', (time.time(),)
+        ).fetchall()
+        return [row[0] for row in rows]
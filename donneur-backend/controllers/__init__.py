@@ -1,8 +1,11 @@
 from .controller                import Controller
 from .auth_controller           import decode_token
 from .feed_controller           import FeedController
+from .feed_warmer               import FeedWarmer
 from .friend_controller         import FriendController
 from .payment_controller        import PaymentController
+from .webhook_queue             import WebhookQueue
+from .maintenance               import Maintenance
 from .receiver_controller       import ReceiverController
 from .transaction_controller    import TransactionController
 from .subscription_controller   import SubscriptionController
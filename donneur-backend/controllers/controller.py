@@ -1,15 +1,18 @@
 from    firebase_admin          import  credentials
+from    storage                 import  Storage, FirebaseBackend, LocalBackend
+from    cache                   import  Cache
 import  firebase_admin
 
 import  logging
-import  stripe
+import  time
 import  dotenv
 import  os
 
 class Controller:
 
-    flask_secret    : str   = None
-    google_key      : str   = None
+    flask_secret    : str       = None
+    google_key      : str       = None
+    admin_ids       : set[str]  = set()
 
     def __init_firebase():
         database_url                = os.getenv('DATABASE_URL')
@@ -18,24 +21,163 @@ class Controller:
         firebase_credentials        = credentials.Certificate(firebase_credentials_path)
         firebase_admin.initialize_app(firebase_credentials, {'databaseURL': database_url})
 
+    def __init_storage():
+        storage_backend     = os.getenv('STORAGE_BACKEND', 'firebase')
+        storage_seed        = os.getenv('LOCAL_STORAGE_SEED')
+        storage_latency     = float(os.getenv('STORAGE_LATENCY_MS', '0')) / 1000
+
+        match storage_backend:
+            case 'firebase':
+                Controller.__init_firebase()
+                Storage.configure( FirebaseBackend() )
+            case 'local':
+                if os.getenv('FIREBASE_CRED_PATH'):
+                    Controller.__init_firebase()
+                backend = LocalBackend.from_file( storage_seed, storage_latency ) if storage_seed else LocalBackend( latency = storage_latency )
+                Storage.configure( backend )
+            case _:
+                raise ValueError(f'Unknown storage backend : {storage_backend}')
+
+    def __init_feed():
+        from .feed_controller import FeedController
+
+        FeedController.feed_cache    = Cache.from_env( 'FEED_CACHE', max_entries = 1024, ttl = 300 )
+        if not FeedController.feed_cache.shared:
+            FeedController.feed_cache.ttl = min( FeedController.feed_cache.ttl, FeedController.local_feed_ttl )
+        FeedController.author_cache  = Cache.from_env( 'AUTHOR_CACHE', max_entries = 4096, ttl = 3600 )
+        if not FeedController.author_cache.shared:
+            FeedController.author_cache.ttl = min( FeedController.author_cache.ttl, FeedController.local_author_ttl )
+        FeedController.fanout_mode   = FeedController.FanoutMode( os.getenv('FEED_FANOUT', 'read') )
+        FeedController.fanout_limit  = int( os.getenv('FEED_FANOUT_LIMIT', '1000') )
+        FeedController.max_page_size = int( os.getenv('FEED_MAX_PAGE_SIZE', FeedController.max_page_size) )
+        FeedController.public_every  = int( os.getenv('FEED_PUBLIC_EVERY', FeedController.public_every) )
+
+    def __init_friends():
+        from .friend_controller import FriendController
+
+        FriendController.adjacency_cache = Cache.from_env( 'ADJACENCY_CACHE', max_entries = 4096, ttl = 300 )
+
+    def __init_feed_warmer():
+        from .feed_controller import FeedController
+        from .receiver_controller import ReceiverController
+        from .feed_warmer import FeedWarmer
+
+        if os.getenv('FEED_WARMER', 'off') != 'on':
+            return
+
+        activity : Cache = Cache.from_env( 'FEED_ACTIVITY', max_entries = 10000, ttl = FeedWarmer.active_window )
+
+        if not (FeedController.feed_cache.shared and activity.shared):
+            logging.warning('FEED_WARMER needs FEED_CACHE_BACKEND and FEED_ACTIVITY_BACKEND set to a shared cache, feed warmer disabled')
+            return
+
+        FeedWarmer.configure(
+            interval        = float( os.getenv('FEED_WARMER_INTERVAL', FeedWarmer.interval) ),
+            concurrency     = int( os.getenv('FEED_WARMER_CONCURRENCY', FeedWarmer.concurrency) ),
+            budget          = int( os.getenv('FEED_WARMER_BUDGET', FeedWarmer.budget) ),
+            active_window   = float( os.getenv('FEED_WARMER_WINDOW', FeedWarmer.active_window) ),
+            activity        = activity
+        )
+
+    def __init_webhooks():
+        from .payment_controller import PaymentController
+        from .webhook_queue import WebhookQueue
+
+        PaymentController.webhook_secret = os.getenv('STRIPE_WEBHOOK_SECRET')
+        PaymentController.allow_unsigned = os.getenv('STRIPE_WEBHOOK_INSECURE', 'off') == 'on'
+        if not PaymentController.webhook_secret:
+            if PaymentController.allow_unsigned:
+                logging.warning('STRIPE_WEBHOOK_INSECURE is on, webhook signatures will not be verified')
+            else:
+                logging.error('STRIPE_WEBHOOK_SECRET is not set, webhooks will be rejected')
+
+        if not os.getenv('WEBHOOK_QUEUE_PATH'):
+            logging.error('WEBHOOK_QUEUE_PATH is not set, webhooks will be rejected')
+
+        WebhookQueue.configure(
+            path                = os.getenv('WEBHOOK_QUEUE_PATH'),
+            workers             = int( os.getenv('WEBHOOK_WORKERS', WebhookQueue.workers) ),
+            max_attempts        = int( os.getenv('WEBHOOK_MAX_ATTEMPTS', WebhookQueue.max_attempts) ),
+            retry_delay         = float( os.getenv('WEBHOOK_RETRY_DELAY', WebhookQueue.retry_delay) ),
+            visibility_timeout  = float( os.getenv('WEBHOOK_VISIBILITY_TIMEOUT', WebhookQueue.visibility_timeout) )
+        )
+        WebhookQueue.register( 'payment_intent.succeeded', PaymentController.confirm_payment )
+
+    def __init_maintenance():
+        from .maintenance import Maintenance
+        from models import Post
+
+        from .feed_controller import FeedController
+        from .receiver_controller import ReceiverController
+        from .feed_warmer import FeedWarmer
+        from .webhook_queue import WebhookQueue
+
+        Maintenance.register( 'refresh-author-snapshots', float( os.getenv('AUTHOR_REFRESH_INTERVAL', '60') ), FeedController.refresh_author_snapshots )
+        Maintenance.register( 'reconcile-ledgers', float( os.getenv('LEDGER_RECONCILE_INTERVAL', '300') ), ReceiverController.reconcile_ledgers )
+        Maintenance.register( 'purge-deleted-posts', float( os.getenv('PURGE_DELETED_INTERVAL', '60') ), Post.purge_deleted )
+        Maintenance.register( 'worker-stats', float( os.getenv('WORKER_STATS_INTERVAL', '300') ), lambda : {
+            'warmer'    : FeedWarmer.stats(),
+            'webhooks'  : WebhookQueue.stats() if WebhookQueue.path else None
+        } )
+
     def __init_stripe():
-        donation_domain = os.getenv('DONATION_DOMAIN')
-        stripe_key      = os.getenv('STRIPE_KEY')
+        from billing import StripeClient
+
+        StripeClient.configure(
+            api_key         = os.getenv('STRIPE_KEY'),
+            api_base        = os.getenv('STRIPE_API_BASE'),
+            connect_timeout = float( os.getenv('STRIPE_CONNECT_TIMEOUT', StripeClient.connect_timeout) ),
+            read_timeout    = float( os.getenv('STRIPE_READ_TIMEOUT', StripeClient.read_timeout) ),
+            pool_size       = int( os.getenv('STRIPE_POOL_SIZE', StripeClient.pool_size) ),
+            max_retries     = int( os.getenv('STRIPE_MAX_RETRIES', StripeClient.max_retries) ),
+            concurrency     = int( os.getenv('STRIPE_CONCURRENCY', StripeClient.concurrency) ),
+            method_cache    = Cache.from_env( 'PAYMENT_METHOD_CACHE', max_entries = 1024, ttl = 60 )
+        )
+
+
+    def run_workers():
+        from .feed_warmer import FeedWarmer
+        from .webhook_queue import WebhookQueue
+        from .maintenance import Maintenance
+
+        workers : list = [worker for worker, enabled in (
+            (FeedWarmer,    FeedWarmer.enabled),
+            (WebhookQueue,  WebhookQueue.path is not None),
+            (Maintenance,   bool(Maintenance.jobs))
+        ) if enabled]
+
+        if not workers:
+            logging.warning('No background workers enabled')
+            return
 
-        stripe.api_key  = stripe_key
-        stripe.PaymentMethodDomain.create(domain_name=donation_domain)
+        for worker in workers:
+            worker.start()
 
+        try:
+            while True:
+                time.sleep(60)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            for worker in workers:
+                worker.stop()
 
     def initialize():
 
         logging.basicConfig(level=logging.INFO)
         dotenv.load_dotenv()
         
-        Controller.__init_firebase()
+        Controller.__init_storage()
+        Controller.__init_feed()
+        Controller.__init_friends()
+        Controller.__init_feed_warmer()
+        Controller.__init_webhooks()
+        Controller.__init_maintenance()
         Controller.__init_stripe()
 
         Controller.flask_secret = os.getenv('SECRET_KEY')
         Controller.google_key   = os.getenv('GOOGLE_MAPS_API')
+        Controller.admin_ids    = { id.strip() for id in os.getenv('ADMIN_IDS', '').split(',') if id.strip() }
     
 
         
\ No newline at end of file
@@ -1,7 +1,13 @@
 from firebase_admin import  db
 from datetime       import datetime
-from models         import Post, Receiver, Organization
+from models         import Model, Post, Receiver, Organization, Timeline
+from cache          import Cache, MemoryCache
+from utils          import FeedEngine
 from collections import deque
+import itertools
+import time
+import heapq
+import enum
 
 from .friend_controller         import FriendController
 from .subscription_controller   import SubscriptionController
@@ -11,12 +17,34 @@ import logging
 
 class FeedController:
 
-    feed_cache : dict = {}
+    class FanoutMode(enum.Enum):
+        READ    = 'read'
+        WRITE   = 'write'
 
     class FeedError(Exception):
         class Unauthorized  (Exception) : pass
         class UserNotFound  (Exception) : pass
         class PostNotFound  (Exception) : pass
+        class InvalidCursor (Exception) : pass
+
+    feed_cache       : Cache         = MemoryCache( max_entries = 1024, ttl = 30 )
+    author_cache     : Cache         = MemoryCache( max_entries = 4096, ttl = 60 )
+    local_author_ttl : float         = 60
+    local_feed_ttl   : float         = 30
+    page_size        : int           = 20
+    max_page_size    : int           = 50
+    max_scan         : int           = 500
+    warm_ttl         : float         = 120
+    public_every     : int           = FeedEngine.PUBLIC_EVERY
+    fanout_mode      : FanoutMode    = FanoutMode.READ
+    fanout_limit     : int           = 1000
+
+    def __audience( author_id : str ) -> list[str]:
+        friends, subscribers = Model.parallel([
+            lambda : FriendController.get_friend_ids( author_id ),
+            lambda : SubscriptionController.get_subscribers( author_id ),
+        ])
+        return list(dict.fromkeys(friends + subscribers))
 
     def create_post( id : str, content : dict, visibiliy_str : str ) -> Post:
 
@@ -25,7 +53,20 @@ class FeedController:
         if not visibility:
             raise Post.PostError.InvalidVisibility('Invalid Visibility')
 
-        post : Post = Post.create( author = id, content = content, visibility = visibility )
+        created_at  : str       = datetime.now().isoformat()
+        audience    : list[str] = FeedController.__audience( id )
+        author      : dict      = FeedController.__get_author( id )
+
+        with Model.UnitOfWork():
+            post : Post = Post.create( author = id, content = content, visibility = visibility, created_at = created_at, author_summary = author )
+
+            if FeedController.fanout_mode == FeedController.FanoutMode.WRITE:
+                if len(audience) > FeedController.fanout_limit:
+                    Timeline.set_pull_author( id )
+                else:
+                    Timeline.fan_out( post.id, created_at, audience )
+
+        FeedController.invalidate_feeds( id, *audience )
 
         return post
 
@@ -37,133 +78,292 @@ class FeedController:
         if id != author:
             raise FeedController.FeedError.Unauthorized()
 
+        audience : list[str] = FeedController.__audience( id )
+
         post.delete()
 
+        if FeedController.fanout_mode == FeedController.FanoutMode.WRITE:
+            Timeline.retract( post_id, audience )
+
+        FeedController.invalidate_feeds( id, *audience )
+
     def get_post( post_id : str ) : 
         post : Post = Post ( post_id )
         post_data = post.get()
-        if post_data:
+        if post_data and not post_data.get('deleted'):
             return {post_id : post_data}
         raise FeedController.FeedError.PostNotFound('Post not found')
     
 
+    def __format_organization( author_id : str, author_data : dict ) -> dict:
+        pic =  author_data.get("logo_file")
+        return {
+            'name' : author_data.get('name'),
+            'picture_id' : pic if pic else 'https://appalachiantrail.org/wp-content/uploads/2020/02/Deep-Gap-Shelter.jpg',
+            'id'        : author_id,
+            'type'      : 'organization'
+        }
+
+    def __format_receiver( author_id : str, author_data : dict ) -> dict:
+        pic = author_data.get("id_picture_file")
+        return {
+            'name' : f'{author_data.get("first_name")} {(author_data.get("last_name") or " ")[0]}.',
+            'picture_id' :  pic if pic else '',
+            'id'        : author_id,
+            'type'      : 'receiver'
+        }
+
+    def __get_authors( author_ids : list[str] ) -> dict:
+        author_ids  : list[str] = list(dict.fromkeys(author_ids))
+        authors     : dict      = {}
+        missing     : list[str] = []
+
+        for author_id in author_ids:
+            author : dict | None = FeedController.author_cache.get(author_id)
+            if author is not None:
+                authors[author_id] = author
+            else:
+                missing.append(author_id)
+
+        if not missing:
+            return authors
+
+        organization_ids : list[str] = []
+
+        receivers : list = Receiver.get_many(missing, 'first_name', 'last_name', 'id_picture_file')
+        for author_id, author_data in zip(missing, receivers):
+            if author_data:
+                authors[author_id] = FeedController.__format_receiver(author_id, author_data)
+            else:
+                organization_ids.append(author_id)
+
+        organizations : list = Organization.get_many(organization_ids, 'name', 'logo_file') if organization_ids else []
+        for author_id, author_data in zip(organization_ids, organizations):
+            if author_data:
+                authors[author_id] = FeedController.__format_organization(author_id, author_data)
+
+        for author_id in missing:
+            if author_id in authors:
+                FeedController.author_cache.set(author_id, authors[author_id])
+
+        return authors
+
     def __get_author( author_id : str ):
-        user = Receiver(author_id)
-        if not user.exist():
-            user = Organization( author_id )
+        return FeedController.__get_authors([author_id]).get(author_id)
         
-        author_data : dict = user.get()
 
-        if not author_data:
+    def __get_author_posts( authors : list[str] ) -> list[dict]:
+        return Model.parallel([lambda author = author : Post.get_posts(author) for author in authors])
+
+    def __followed_authors( receiver_id : str ) -> list[str]:
+        entry : dict | None = FeedController.feed_cache.get(receiver_id)
+
+        if entry is None:
+            if not Receiver(receiver_id).exist():
+                raise FeedController.FeedError.UserNotFound()
+
+            friends, subscriptions = Model.parallel([
+                lambda : FriendController.get_friend_ids( receiver_id ),
+                lambda : SubscriptionController.get_subscriptions( receiver_id ),
+            ])
+            entry = { 'authors' : list(dict.fromkeys(friends + subscriptions)) }
+            FeedController.feed_cache.set(receiver_id, entry)
+
+        return entry['authors']
+
+    def __followed_fetches( receiver_id : str, authors : list[str] ) -> list:
+        if FeedController.fanout_mode == FeedController.FanoutMode.READ:
+            return [lambda before, limit, author = author : Post.get_posts(author, before, limit) for author in authors]
+
+        timeline        : Timeline  = Timeline( receiver_id )
+        pull_authors    : list[str] = Timeline.get_pull_authors()
+
+        return [lambda before, limit : timeline.get_entries(limit, before)] + [
+            lambda before, limit, author = author : Post.get_posts(author, before, limit)
+            for author in authors if author in pull_authors
+        ]
+
+    def rebuild_timeline( receiver_id : str ) -> int:
+        timeline    : Timeline  = Timeline( receiver_id )
+        sources     : list      = FeedController.__get_author_posts( FeedController.__followed_authors( receiver_id ) )
+        newest                  = heapq.merge( *[FeedEngine.newest_first(source) for source in sources], reverse = True )
+        entries     : dict      = { post_id : created_at for created_at, post_id in itertools.islice(newest, Timeline.MAX_ENTRIES) }
+
+        if entries:
+            timeline.update( entries )
+            timeline.trim()
+
+        return len(entries)
+
+    def follow_author( receiver_id : str, author_id : str ) -> None:
+        if FeedController.fanout_mode != FeedController.FanoutMode.WRITE or author_id in Timeline.get_pull_authors():
+            return
+
+        Timeline( receiver_id ).backfill( Post.get_posts( author_id, limit = Timeline.MAX_ENTRIES ) )
+
+    def unfollow_author( receiver_id : str, author_id : str ) -> None:
+        if FeedController.fanout_mode != FeedController.FanoutMode.WRITE or author_id in Timeline.get_pull_authors():
+            return
+
+        Timeline( receiver_id ).forget( list(Post.get_posts( author_id, limit = Timeline.MAX_ENTRIES )) )
+
+    def invalidate_feeds( *receiver_ids : str ) -> None:
+        FeedController.feed_cache.delete( *receiver_ids )
+
+    def invalidate_author( author_id : str ) -> None:
+        FeedController.author_cache.delete( author_id )
+        Post.mark_author_stale( author_id )
+
+    def refresh_author_snapshots( author_ids : list[str] = None ) -> int:
+        author_ids  : list[str] = Post.get_stale_authors() if author_ids is None else author_ids
+        authors     : dict      = FeedController.__get_authors( author_ids )
+        count       : int       = 0
+
+        for author_id in author_ids:
+            if author_id in authors:
+                count += Post.set_author_summary( author_id, authors[author_id] )
+
+        return count
+
+    def cache_stats() -> dict:
+        return {
+            'feeds'     : FeedController.feed_cache.stats(),
+            'authors'   : FeedController.author_cache.stats()
+        }
+
+    def needs_warm( receiver_id : str, lead : float = 0 ) -> bool:
+        entry : dict = FeedController.feed_cache.get(receiver_id) or {}
+
+        return entry.get('warmed_at', 0) + FeedController.warm_ttl - lead <= time.time()
+
+    def __keep_first_page( receiver_id : str, page : dict ) -> None:
+        entry : dict = FeedController.feed_cache.get(receiver_id) or { 'authors' : FeedController.__followed_authors( receiver_id ) }
+
+        entry['first_page'] = page
+        entry['warmed_at']  = time.time()
+        FeedController.feed_cache.set(receiver_id, entry)
+
+    def warm_feed( receiver_id : str ) -> dict:
+        page : dict = FeedController.__build_page( receiver_id, None, FeedController.page_size )
+
+        FeedController.__keep_first_page( receiver_id, page )
+        return page
+
+    def __warm_page( receiver_id : str ) -> dict | None:
+        entry : dict = FeedController.feed_cache.get(receiver_id) or {}
+
+        if 'first_page' not in entry or entry.get('warmed_at', 0) + FeedController.warm_ttl <= time.time():
             return None
+        return entry['first_page']
 
-        if isinstance(user, Organization):
-            pic =  author_data.get("logo_file")
-            author = {
-                'name' : author_data.get('name'),
-                'picture_id' : pic if pic else 'https://appalachiantrail.org/wp-content/uploads/2020/02/Deep-Gap-Shelter.jpg',
-                'id'        : author_id
-            }
-        else:
-            pic = author_data.get("id_picture_file"),
-            author = {
-                'name' : f'{author_data.get("first_name")} {author_data.get("last_name")[0]}.',
-                'picture_id' :  pic if pic else '',
-                'id'        : author_id
-            }
-
-        return author
-        
+    def get_feed( receiver_id : str, cursor : str = None, limit : int = None ):
 
-    def __generate_feed( receiver_id : str ) -> dict:
+        limit : int = limit or FeedController.page_size
 
-        receiver : Receiver = Receiver(receiver_id)
+        if cursor is not None or limit != FeedController.page_size:
+            return FeedController.__build_page( receiver_id, cursor, limit )
 
-        if not receiver.exist():
-            raise FeedController.FeedError.UserNotFound()
-        
-        friends         : list = FriendController.get_friends( receiver.id ).get('friends')
-        subscriptions   : list = SubscriptionController.get_subscriptions( receiver.id )
+        page : dict | None = FeedController.__warm_page( receiver_id )
+        if page is not None:
+            return page
 
-        
-       
-        friend_posts        : dict = {}
-        public_posts        : dict = {}
-        organization_posts  : dict = {}
-        
+        page = FeedController.__build_page( receiver_id, cursor, limit )
+        FeedController.__keep_first_page( receiver_id, page )
+        return page
 
-        for friend in friends:
-            logging.info(f'friend : {friend}')
-            friend_posts.update(Post.get_posts(friend.get('id')))
+    def __build_page( receiver_id : str, cursor : str, limit : int ) -> dict:
 
-        for subscription in subscriptions:
-            organization_posts.update(Post.get_posts(subscription))
+        try:
+            state : dict = FeedEngine.decode_cursor( cursor )
+        except FeedEngine.FeedEngineError.InvalidCursor as e:
+            raise FeedController.FeedError.InvalidCursor(str(e))
 
+        limit       : int       = max(1, min(limit, FeedController.max_page_size))
+        batch       : int       = limit + 1
+        authors     : list[str] = FeedController.__followed_authors( receiver_id )
+        fetches     : list      = FeedController.__followed_fetches( receiver_id, authors ) + [
+            lambda before, limit : Post.get_public_posts(before, limit)
+        ]
 
-        public_posts = Post.get_public_posts()
-        public_posts : list = [item for item in public_posts]
-        public_posts.reverse()
-        
-        friend_and_subsciption_posts = friend_posts | organization_posts
+        positions   : list      = [state['followed']] * (len(fetches) - 1) + [state['public']]
+        first       : list      = Model.parallel([
+            lambda fetch = fetch, position = position : fetch(position[0] if position else None, batch)
+            for fetch, position in zip(fetches, positions)
+        ])
 
-        followed_posts = [key for key, _ in sorted((friend_and_subsciption_posts).items(), key=lambda x: datetime.fromisoformat(x[1]))]
+        streams     : list      = [
+            FeedEngine.keyset(fetch, batch, position, entries)
+            for fetch, position, entries in zip(fetches, positions, first)
+        ]
+        stream                  = FeedEngine.merge( streams[:-1], streams[-1], FeedController.public_every, state )
 
-        feed = []
+        return FeedController.__fill_page( receiver_id, set(authors), stream, state, limit )
 
-        chunk_size : int  = 5
+    def __fill_page( receiver_id : str, followed : set[str], stream, state : dict, limit : int ) -> dict:
+        accepted    : list  = []
+        scanned     : int   = 0
+        position    : dict  = None
 
-        
-        for i in range(0, len(followed_posts)):
-            feed.append(followed_posts[i])
-
-            if i % chunk_size == 0 and i != 0:
-                
-                while(True):
-                    if len(public_posts) == 0:
-                        break
-                    public = public_posts.pop(0)
-                    if public in followed_posts:
-                        continue
-                    
-                    feed.append(public)
+        while len(accepted) <= limit and scanned < FeedController.max_scan:
+            chunk : list = []
+            for post_id, public in stream:
+                chunk.append((post_id, public, dict(state)))
+                if len(chunk) > limit - len(accepted):
                     break
-        
-        for public_post in public_posts:
-            if public_post not in followed_posts:
-                feed.append(public_post)
 
-        FeedController.feed_cache[receiver_id] = feed
+            if not chunk:
+                break
+            scanned += len(chunk)
 
-    def get_feed( receiver_id : str, page : int = 0):
+            previews    : list  = Post.get_previews([post_id for post_id, _, _ in chunk], receiver_id)
+            unresolved  : list  = [preview['author'] for preview in previews if preview and not preview.get('author_summary')]
+            profiles    : dict  = FeedController.__get_authors(unresolved) if unresolved else {}
 
-        result_per_page = 40
+            for (post_id, public, snapshot), preview in zip(chunk, previews):
+                position = snapshot
 
-        feed : dict = FeedController.feed_cache.get(receiver_id)
+                if not preview:
+                    continue
+                if public and preview['author'] in followed:
+                    continue
 
-        if not feed or page == 0:
-            FeedController.__generate_feed(receiver_id)
-            feed : dict = FeedController.feed_cache.get(receiver_id)
-        
-        
-        feed = feed[page * result_per_page : page * result_per_page + 20]
-        feed_data = []
-        for i, post_id in enumerate(feed):
-            post_data : dict = Post(post_id).get()
-            post_data['id'] = post_id
-
-            author = FeedController.__get_author(post_data['author'])
-            if not author:
-                continue
-            if author.get('id') == receiver_id:
-                continue
-            post_data['author'] = author
+                author = preview.get('author_summary') or profiles.get(preview['author'])
+                if not author or author.get('id') == receiver_id:
+                    continue
+
+                accepted.append((FeedController.__feed_item(preview, author), snapshot))
+                if len(accepted) > limit:
+                    break
 
-            feed_data.append(post_data)
+        if len(accepted) > limit:
+            next_cursor : str | None = FeedEngine.encode_cursor( accepted[limit - 1][1] )
+        elif scanned >= FeedController.max_scan and position is not None:
+            next_cursor : str | None = FeedEngine.encode_cursor( position )
+        else:
+            next_cursor : str | None = None
 
-        return { 'feed' : feed_data }
+        return { 'feed' : [item for item, _ in accepted[:limit]], 'cursor' : next_cursor }
     
+    def __feed_item( preview : dict, author : dict ) -> dict:
+        return {
+            'id'            : preview['id'],
+            'author'        : author,
+            'content'       : preview.get('content') or {},
+            'truncated'     : preview.get('truncated', False),
+            'created_at'    : preview.get('created_at'),
+            'visibility'    : preview.get('visibility'),
+            'like_count'    : preview['like_count'],
+            'liked_by_me'   : preview['liked_by_me'],
+            'reply_count'   : preview['reply_count']
+        }
+
     def like_post ( receiver_id : str, post_id : str ):
-        pass
+        Post( post_id ).like( receiver_id )
+        FeedController.invalidate_feeds( receiver_id )
+
+    def unlike_post ( receiver_id : str, post_id : str ):
+        Post( post_id ).remove_like( receiver_id )
+        FeedController.invalidate_feeds( receiver_id )
 
     def reply_to_post ( post_id : str, author : str, content : str, visibiliy_str : str ) -> Post:
 
@@ -172,10 +372,13 @@ class FeedController:
         if not visibility:
             raise Post.PostError.InvalidVisibility()
         
-        reply_post  : Post = Post.create( author = author, content = content, visibility = visibility, parent_id = post_id )
-        parent_post : Post = Post( post_id )
+        with Post.UnitOfWork():
+            reply_post  : Post = Post.create( author = author, content = content, visibility = visibility, parent_id = post_id, author_summary = FeedController.__get_author( author ) )
+            parent_post : Post = Post( post_id )
+
+            parent_post.reply( reply_post.id )
 
-        parent_post.reply( reply_post.id )
+        parent_post.count_reply()
 
         return reply_post
     
@@ -184,18 +387,17 @@ class FeedController:
         posts = Post.get_posts( receiver_id )
         posts : list = [key for key, _ in sorted((posts).items(), key=lambda x: datetime.fromisoformat(x[1]))]
 
-        author = FeedController.__get_author( receiver_id )
+        author = None
 
         user_posts = []
 
-        for post_id in posts:
-            post_data : dict = Post(post_id).get()
-            print(f'post_data : {post_data}')
-            post_data['id'] = post_id
-            post_data['author'] = author
+        for preview in Post.get_previews(posts, receiver_id):
+            if not preview:
+                continue
+
+            if not preview.get('author_summary') and author is None:
+                author = FeedController.__get_author( receiver_id )
 
-            user_posts.append(post_data)
+            user_posts.append(FeedController.__feed_item(preview, preview.get('author_summary') or author))
         
         return {'posts' : user_posts}
-        
-        
\ No newline at end of file
@@ -0,0 +1,109 @@
+from    collections         import OrderedDict
+from    concurrent.futures  import ThreadPoolExecutor
+from    models              import Model
+from    cache               import Cache, MemoryCache
+import  threading
+import  logging
+import  time
+
+from    .feed_controller    import FeedController
+
+
+class FeedWarmer:
+
+    enabled         : bool              = False
+    interval        : float             = 30
+    concurrency     : int               = 4
+    budget          : int               = 100
+    active_window   : float             = 900
+    touch_interval  : float             = 30
+    max_tracked     : int               = 10000
+
+    activity        : Cache             = MemoryCache( max_entries = 10000, ttl = 900 )
+    touched         : OrderedDict       = OrderedDict()
+    lock            : threading.Lock    = threading.Lock()
+    stopping        : threading.Event   = threading.Event()
+    thread          : threading.Thread  = None
+    counters        : dict              = {'cycles' : 0, 'warmed' : 0, 'failed' : 0}
+
+    def configure( interval : float = None, concurrency : int = None, budget : int = None, active_window : float = None, activity : Cache = None ) -> None:
+        FeedWarmer.enabled          = True
+        FeedWarmer.interval         = interval      or FeedWarmer.interval
+        FeedWarmer.concurrency      = concurrency   or FeedWarmer.concurrency
+        FeedWarmer.budget           = budget        or FeedWarmer.budget
+        FeedWarmer.active_window    = active_window or FeedWarmer.active_window
+        FeedWarmer.activity         = activity      or FeedWarmer.activity
+
+    def touch( receiver_id : str ) -> None:
+        if not FeedWarmer.enabled:
+            return
+
+        now : float = time.monotonic()
+
+        with FeedWarmer.lock:
+            if FeedWarmer.touched.get(receiver_id, -FeedWarmer.touch_interval) + FeedWarmer.touch_interval > now:
+                return
+
+            FeedWarmer.touched[receiver_id] = now
+            FeedWarmer.touched.move_to_end(receiver_id)
+
+            while len(FeedWarmer.touched) > FeedWarmer.max_tracked:
+                FeedWarmer.touched.popitem(last = False)
+
+        FeedWarmer.activity.set( receiver_id, True, ttl = FeedWarmer.active_window )
+
+    def __recent() -> list[str]:
+        return FeedWarmer.activity.keys()
+
+    def __warm( receiver_id : str ) -> bool:
+        Model.begin_request()
+        try:
+            FeedController.warm_feed( receiver_id )
+            return True
+        except Exception as e:
+            logging.warning(f'FEED WARMER : {receiver_id} : {e}')
+            return False
+        finally:
+            Model.end_request()
+
+    def run_cycle() -> int:
+        receivers : list[str] = [receiver_id for receiver_id in FeedWarmer.__recent() if FeedController.needs_warm(receiver_id, FeedWarmer.interval)]
+        receivers = receivers[:FeedWarmer.budget]
+
+        if not receivers:
+            return 0
+
+        with ThreadPoolExecutor( max_workers = FeedWarmer.concurrency, thread_name_prefix = 'feed-warmer' ) as executor:
+            results : list[bool] = list(executor.map(FeedWarmer.__warm, receivers))
+
+        with FeedWarmer.lock:
+            FeedWarmer.counters['cycles'] += 1
+            FeedWarmer.counters['warmed'] += results.count(True)
+            FeedWarmer.counters['failed'] += results.count(False)
+
+        return results.count(True)
+
+    def __loop() -> None:
+        while not FeedWarmer.stopping.wait(FeedWarmer.interval):
+            try:
+                FeedWarmer.run_cycle()
+            except Exception as e:
+                logging.error(f'FEED WARMER : {e}')
+
+    def start() -> None:
+        if FeedWarmer.thread is not None and FeedWarmer.thread.is_alive():
+            return
+
+        FeedWarmer.stopping.clear()
+        FeedWarmer.thread = threading.Thread( target = FeedWarmer.__loop, name = 'feed-warmer', daemon = True )
+        FeedWarmer.thread.start()
+
+    def stop() -> None:
+        FeedWarmer.stopping.set()
+        if FeedWarmer.thread is not None:
+            FeedWarmer.thread.join()
+        FeedWarmer.thread = None
+
+    def stats() -> dict:
+        with FeedWarmer.lock:
+            return dict(FeedWarmer.counters, enabled = FeedWarmer.enabled, running = FeedWarmer.thread is not None)
@@ -1,10 +1,22 @@
 from    firebase_admin  import  db
 from    datetime        import  datetime
-from    models          import  Receiver
+from    models          import  Model, Receiver
+from    storage         import  Storage
+from    utils           import  SuggestionEngine
+from    cache           import  Cache, MemoryCache
+import  itertools
 
 class FriendController:
 
-    BASE_TABLE : str = 'friendships'
+    BASE_TABLE          : str       = 'friendships'
+    INDEX_TABLE         : str       = 'friend_index'
+    SUGGESTION_TABLE    : str       = 'friend_suggestions'
+    SUGGESTION_CHUNK    : int       = 500
+    PROFILE_FIELDS      : tuple     = ('first_name', 'last_name', 'id_picture_file')
+    MUTUAL_LIMIT        : int       = 5
+    MAX_MUTUAL_IDS      : int       = 50
+
+    adjacency_cache     : Cache     = MemoryCache( max_entries = 4096, ttl = 300 )
 
     class FriendError(Exception):
         class CannotBefriendHimself (Exception) : pass
@@ -13,21 +25,52 @@ class FriendController:
         class AlreadyFriends        (Exception) : pass
         class UserNotFound          (Exception) : pass
         class Unauthorized          (Exception) : pass
+        class TooManyIds            (Exception) : pass
+
+    class FriendStatus:
+        REQUESTED   : str = 'requested'
+        RECEIVED    : str = 'received'
+        FRIENDS     : str = 'friends'
+
+    def __invalidate( *user_ids : str ) -> None:
+        from .feed_controller import FeedController
+        FeedController.invalidate_feeds( *user_ids )
+        FriendController.invalidate_adjacency( *user_ids )
+
+    def invalidate_adjacency( *user_ids : str ) -> None:
+        FriendController.adjacency_cache.delete( *user_ids )
+
+    def __index_entries( friendship_id : str, friendship : dict ) -> dict:
+        user_1          : str       = friendship['user_1']
+        user_2          : str       = friendship['user_2']
+        friends_since   : str       = friendship.get('friends_since')
+
+        def entry( status : str ) -> dict:
+            return {
+                'friendship_id' : friendship_id,
+                'status'        : FriendController.FriendStatus.FRIENDS if friends_since else status,
+                'created_at'    : friendship.get('created_at'),
+                'friends_since' : friends_since
+            }
+
+        return {
+            f'{FriendController.INDEX_TABLE}/{user_1}/{user_2}' : entry( FriendController.FriendStatus.REQUESTED ),
+            f'{FriendController.INDEX_TABLE}/{user_2}/{user_1}' : entry( FriendController.FriendStatus.RECEIVED )
+        }
 
     def __already_friends( user_1 : str, user_2 : str):
 
-        friendships = FriendController.get_friends(user_1)
+        return Model.read(f'{FriendController.INDEX_TABLE}/{user_1}/{user_2}', shallow = True) is not None
 
-        for friendship_type in friendships:
-            for friendship in friendships[friendship_type]:
-                if user_2 == friendship['user_1'] or user_2 == friendship['user_2']:
-                    return True
-                
-        return False
+    def are_friends( user_1 : str, user_2 : str ) -> bool:
+
+        return Model.read(f'{FriendController.INDEX_TABLE}/{user_1}/{user_2}/status') == FriendController.FriendStatus.FRIENDS
     
-    def friend_profile( friend_id : str , friendship : dict):
+    def friend_profile( friend_id : str , friendship : dict, data : dict = None):
         friend  : Receiver  = Receiver(friend_id)
-        data    : dict      = friend.get()
+
+        if data is None:
+            data = friend.get_fields(*FriendController.PROFILE_FIELDS)
 
         friends_since = friendship.get('friends_since')
         friendship_id = friendship.get('friendship_id')
@@ -68,11 +111,17 @@ class FriendController:
             'user_2'        : friend_id
         }
 
-        db.reference(FriendController.BASE_TABLE).push(data)
+        with Model.UnitOfWork():
+            friendship_id : str = Model.push(FriendController.BASE_TABLE, data)
+
+            for path, entry in FriendController.__index_entries( friendship_id, data ).items():
+                Model.write(path, entry)
+
+        FriendController.__invalidate( user_id, friend_id )
 
     def remove_friend( user_id : str, friendship_id : str ) -> None:
 
-        reference   : db.Reference  = db.reference(FriendController.BASE_TABLE).child(friendship_id)
+        reference   : db.Reference  = Storage.reference(FriendController.BASE_TABLE).child(friendship_id)
         friendship  : dict          = reference.get()
         if not friendship:
             raise FriendController.FriendError.FriendshipNotFound('Friendship not found')
@@ -80,16 +129,28 @@ class FriendController:
         if (user_id != friendship['user_1']) and (user_id != friendship['user_2']):
             raise FriendController.FriendError.Unauthorized()
         
-        reference.delete()
+        with Model.UnitOfWork():
+            Model.remove(f'{FriendController.BASE_TABLE}/{friendship_id}')
+
+            for path in FriendController.__index_entries( friendship_id, friendship ):
+                Model.remove(path)
+
+        FriendController.__invalidate( friendship['user_1'], friendship['user_2'] )
             
     def request_reply( user_id : str, friendship_id : str, accept : bool = True) -> None:
 
-        def accept_request( reference : db.Reference ):
-            reference.child('friends_since').set(datetime.now().isoformat())
+        def accept_request( friendship : dict ):
+            friendship['friends_since'] = datetime.now().isoformat()
+
+            with Model.UnitOfWork():
+                Model.write(f'{FriendController.BASE_TABLE}/{friendship_id}/friends_since', friendship['friends_since'])
+
+                for path, entry in FriendController.__index_entries( friendship_id, friendship ).items():
+                    Model.write(path, entry)
         def refuse_request():
             FriendController.remove_friend(user_id, friendship_id)
 
-        reference   : db.Reference  = db.reference(FriendController.BASE_TABLE).child(friendship_id)
+        reference   : db.Reference  = Storage.reference(FriendController.BASE_TABLE).child(friendship_id)
         friendship  : dict          = reference.get()
 
         if not friendship:
@@ -102,59 +163,175 @@ class FriendController:
             raise FriendController.FriendError.Unauthorized()
     
         if accept:
-            accept_request(reference)
+            accept_request(friendship)
+            FriendController.__invalidate( friendship['user_1'], friendship['user_2'] )
         else:
             refuse_request()
 
     def __get_friendships( user_id : str ) -> dict:
 
-        USERS       : list[str]     = ['user_1', 'user_2']
-
         requests    : list[dict]    = []
         friends     : list[dict]    = []
 
-        reference   : db.Reference  = db.reference(FriendController.BASE_TABLE)
-
-        for user in USERS:
-
-            query       = reference.order_by_child(user).equal_to(user_id)
-            friendships = query.get()
-
-            if not friendships:
-                continue
+        index       : dict          = Model.read(f'{FriendController.INDEX_TABLE}/{user_id}') or {}
 
-            for friendship_id in friendships:
-                if friendships[friendship_id].get('friends_since'):
+        for friend_id, entry in index.items():
+            match entry.get('status'):
+                case FriendController.FriendStatus.FRIENDS:
                     friends.append(
                         {
-                            'friend_id'     : friendships[friendship_id][USERS[1]] if user == USERS[0] else friendships[friendship_id][USERS[0]] ,
-                            'friends_since' : friendships[friendship_id]['friends_since'],
-                            'friendship_id' : friendship_id
+                            'friend_id'     : friend_id,
+                            'friends_since' : entry.get('friends_since'),
+                            'friendship_id' : entry.get('friendship_id')
                         }
                     )
-                    continue
-
-                if user == USERS[1]:
+                case FriendController.FriendStatus.RECEIVED:
                     requests.append(
                         {
-                            'friend_id'     : friendships[friendship_id][USERS[0]],
-                            'created_at'    : friendships[friendship_id]['created_at'],
-                            'friendship_id' : friendship_id
+                            'friend_id'     : friend_id,
+                            'created_at'    : entry.get('created_at'),
+                            'friendship_id' : entry.get('friendship_id')
                         }
                     )
         return {'requests' : requests, 'friends' : friends} 
     
+    def backfill_index() -> int:
+
+        friendships : dict  = Storage.reference(FriendController.BASE_TABLE).get() or {}
+        count       : int   = 0
+
+        with Model.UnitOfWork():
+            for friendship_id, friendship in friendships.items():
+                if not isinstance(friendship, dict) or not friendship.get('user_1') or not friendship.get('user_2'):
+                    continue
+
+                for path, entry in FriendController.__index_entries( friendship_id, friendship ).items():
+                    Model.write(path, entry)
+                count += 1
+
+        return count
+
+    def get_friend_ids( user_id : str ) -> list[str]:
+        friendships : dict = FriendController.__get_friendships(user_id)
+        return [friendship['friend_id'] for friendship in friendships['friends']]
 
     def get_friends( user_id : str ) -> dict:
-        print(user_id)
         friendships : dict = FriendController.__get_friendships(user_id)
 
-        print(friendships)
         friends = {'requests' : [], 'friends' : []} 
 
         for friendship_type in friendships:
-            print(friendship_type)
-            for friendship in friendships.get(friendship_type):
-                friend_profile : dict = FriendController.friend_profile(friendship.get('friend_id'),friendship)
+            entries     : list[dict] = friendships.get(friendship_type)
+            profiles    : list[dict] = Receiver.get_many([friendship.get('friend_id') for friendship in entries], *FriendController.PROFILE_FIELDS)
+
+            for friendship, data in zip(entries, profiles):
+                friend_profile : dict = FriendController.friend_profile(friendship.get('friend_id'), friendship, data or {})
                 friends[friendship_type].append(friend_profile)
-        return friends
\ No newline at end of file
+        return friends
+
+    def build_suggestions( top_k : int = None ) -> int:
+
+        friendships, subscriptions = Storage.gather([
+            lambda : Storage.reference(FriendController.BASE_TABLE).get() or {},
+            lambda : Storage.reference('subscriptions').get() or {},
+        ])
+
+        generated_at    : str       = datetime.now().isoformat()
+        suggestions                 = SuggestionEngine.suggest_all( friendships, subscriptions, top_k )
+        count           : int       = 0
+
+        while chunk := list(itertools.islice(suggestions, FriendController.SUGGESTION_CHUNK)):
+            with Model.UnitOfWork():
+                for user_id, candidates in chunk:
+                    Model.write(f'{FriendController.SUGGESTION_TABLE}/{user_id}', {
+                        'generated_at'  : generated_at,
+                        'suggestions'   : candidates
+                    })
+            count += len(chunk)
+
+        return count
+
+    def get_suggestions( user_id : str ) -> list[dict]:
+
+        data, linked = Model.read_many([
+            f'{FriendController.SUGGESTION_TABLE}/{user_id}/suggestions',
+            f'{FriendController.INDEX_TABLE}/{user_id}',
+        ])
+
+        linked      : dict          = linked or {}
+        candidates  : list[dict]    = [candidate for candidate in (data or []) if candidate and candidate.get('id') not in linked]
+        profiles    : list[dict]    = Receiver.get_many([candidate['id'] for candidate in candidates], *FriendController.PROFILE_FIELDS)
+
+        suggestions : list[dict]    = []
+
+        for candidate, profile in zip(candidates, profiles):
+            if not profile:
+                continue
+            suggestions.append({
+                'id'                : candidate['id'],
+                'last_name'         : profile.get('last_name'),
+                'first_name'        : profile.get('first_name'),
+                'picture_id'        : profile.get('id_picture_file'),
+                'mutual_friends'    : candidate.get('mutual_friends', 0),
+                'shared_shelters'   : candidate.get('shared_shelters', 0)
+            })
+
+        return suggestions
+
+    def __adjacency( user_ids : list[str] ) -> dict:
+
+        adjacency   : dict      = {}
+        missing     : list[str] = []
+
+        for user_id in dict.fromkeys(user_ids):
+            entry : dict | None = FriendController.adjacency_cache.get(user_id)
+            if entry is not None:
+                adjacency[user_id] = entry
+            else:
+                missing.append(user_id)
+
+        if not missing:
+            return adjacency
+
+        values : list = Model.read_many(
+            [f'{FriendController.INDEX_TABLE}/{user_id}' for user_id in missing] +
+            [f'subscriptions/{user_id}' for user_id in missing]
+        )
+
+        for index, user_id in enumerate(missing):
+            index_entries   : dict = values[index] or {}
+            subscriptions   : dict = values[len(missing) + index] or {}
+
+            entry : dict = {
+                'friends'   : sorted(friend_id for friend_id, link in index_entries.items() if link.get('status') == FriendController.FriendStatus.FRIENDS),
+                'shelters'  : sorted(subscriptions)
+            }
+            FriendController.adjacency_cache.set(user_id, entry)
+            adjacency[user_id] = entry
+
+        return adjacency
+
+    def get_mutuals( user_id : str, other_ids : list[str], limit : int = None ) -> dict:
+
+        other_ids   : list  = list(dict.fromkeys(other_ids))
+        if len(other_ids) > FriendController.MAX_MUTUAL_IDS:
+            raise FriendController.FriendError.TooManyIds(f'At most {FriendController.MAX_MUTUAL_IDS} ids per request')
+
+        limit       : int   = FriendController.MUTUAL_LIMIT if limit is None else limit
+        adjacency   : dict  = FriendController.__adjacency([user_id, *other_ids])
+        friends     : set   = set(adjacency[user_id]['friends'])
+        shelters    : set   = set(adjacency[user_id]['shelters'])
+        mutuals     : dict  = {}
+
+        for other_id in other_ids:
+            mutual_friends  : list[str] = sorted(friends.intersection(adjacency[other_id]['friends']))
+            mutual_shelters : list[str] = sorted(shelters.intersection(adjacency[other_id]['shelters']))
+
+            mutuals[other_id] = {
+                'mutual_friends'        : len(mutual_friends),
+                'mutual_friend_ids'     : mutual_friends[:limit],
+                'mutual_shelters'       : len(mutual_shelters),
+                'mutual_shelter_ids'    : mutual_shelters[:limit]
+            }
+
+        return mutuals
@@ -0,0 +1,68 @@
+from    typing              import Callable
+from    models              import Model
+import  threading
+import  logging
+import  time
+
+
+class Maintenance:
+
+    tick        : float             = 5
+
+    jobs        : dict              = {}
+    lock        : threading.Lock    = threading.Lock()
+    stopping    : threading.Event   = threading.Event()
+    thread      : threading.Thread  = None
+    counters    : dict              = {}
+
+    def register( name : str, interval : float, job : Callable[[], object] ) -> None:
+        Maintenance.jobs[name] = {'interval' : interval, 'job' : job, 'next_run' : 0}
+
+    def run_job( name : str ) -> object:
+        entry : dict = Maintenance.jobs[name]
+
+        Model.begin_request()
+        try:
+            result : object = entry['job']()
+        except Exception as e:
+            logging.error(f'MAINTENANCE : {name} : {e}')
+            result = None
+        finally:
+            Model.end_request()
+            entry['next_run'] = time.monotonic() + entry['interval']
+
+        with Maintenance.lock:
+            counters : dict = Maintenance.counters.setdefault(name, {'runs' : 0, 'failed' : 0})
+            counters['runs' if result is not None else 'failed'] += 1
+
+        if result:
+            logging.info(f'MAINTENANCE : {name} : {result}')
+        return result
+
+    def run_due() -> int:
+        now : float = time.monotonic()
+        due : list  = [name for name, entry in Maintenance.jobs.items() if entry['next_run'] <= now]
+
+        for name in due:
+            Maintenance.run_job( name )
+
+        return len(due)
+
+    def __loop() -> None:
+        while not Maintenance.stopping.is_set():
+            Maintenance.run_due()
+            Maintenance.stopping.wait(Maintenance.tick)
+
+    def start() -> None:
+        if Maintenance.thread is not None and Maintenance.thread.is_alive():
+            return
+
+        Maintenance.stopping.clear()
+        Maintenance.thread = threading.Thread( target = Maintenance.__loop, name = 'maintenance', daemon = True )
+        Maintenance.thread.start()
+
+    def stop() -> None:
+        Maintenance.stopping.set()
+        if Maintenance.thread is not None:
+            Maintenance.thread.join()
+        Maintenance.thread = None
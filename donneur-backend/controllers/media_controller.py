@@ -1,5 +1,6 @@
 from    firebase_admin import storage, db
 from    PIL import Image
+from    models import Model
 import  base64
 import  enum
 import  io
@@ -33,12 +34,14 @@ class MediaController:
             case _:
                 raise ValueError("Unsupported media type for database storage")
             
-        reference : db.Reference = db.reference(path)
-
-        if not reference.parent.get():
+        if not Model.read(path.rsplit('/', 1)[0]):
             raise ValueError("Invalid user")
         
-        reference.set(firebase_link)
+        Model.write(path, firebase_link)
+
+        if media_type in (MediaController.MediaType.ID_PICTURE, MediaController.MediaType.LOGO):
+            from .feed_controller import FeedController
+            FeedController.invalidate_author( user_id )
         
 
       
@@ -1,5 +1,6 @@
 from firebase_admin import db, auth
-from models         import Organization
+from models         import Model, Organization
+from storage        import Storage
 
 class OrganizationController:
 
@@ -9,7 +10,7 @@ class OrganizationController:
     def get_organizations() -> dict:
 
         shelters    : list = []
-        reference   : db.Reference = db.reference('/organizations')
+        reference   : db.Reference = Storage.reference('/organizations')
 
         return {'shelters' : reference.get()}
     
@@ -48,15 +49,18 @@ class OrganizationController:
         if not org.exist():
             raise ValueError("OrgNotFound")
 
-        org.set_address(street, postalcode, city, state, 'Canada', apt)
+        with Model.UnitOfWork():
+            org.set_address(street, postalcode, city, state, 'Canada', apt)
 
-        ref = db.reference(f'/organizations/{org_id}')
+            org.update({
+                'phone'         : phone,
+                'name'          : name,
+                'description'   : description,
+                'max_occupancy' : max_occupancy
+            })
 
-
-        ref.child('phone').set(phone)
-        ref.child('name').set(name)
-        ref.child('description').set(description)
-        ref.child('max_occupancy').set(max_occupancy)
+        from .feed_controller import FeedController
+        FeedController.invalidate_author( org_id )
 
 
 
@@ -79,7 +83,7 @@ class OrganizationController:
         
         organization : Organization = Organization.create(name, street, apt, city, country, province, postalcode, max_occupancy, banner_file, logo_file, description)
 
-        users_reference = db.reference('users')
+        users_reference = Storage.reference('users')
         firebase_user : auth.UserRecord = auth.create_user (
                 email       = email,
                 password    = password,
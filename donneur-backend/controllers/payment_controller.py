@@ -1,14 +1,28 @@
 from    firebase_admin  import db
 from    datetime        import datetime
-from    models          import Transaction, Sender, Receiver
+from    models          import Model, Transaction, Sender, Receiver
+from    storage         import Storage
+from    billing         import StripeClient
 
 
+import  secrets
 import  stripe
+import  json
+import  time
 
 class PaymentController():
 
     class PaymentError(Exception):
         class ReceiverNotFound(Exception) : pass
+        class InvalidWebhook(Exception)   : pass
+        class InvalidBatch(Exception)     : pass
+        class PaymentInProgress(Exception): pass
+
+    webhook_secret  : str   = None
+    allow_unsigned  : bool  = False
+    max_batch_size  : int   = 50
+    claim_timeout   : float = 120
+
     def __format_payment_method( stripe_payment_method : dict ) -> dict:
         payment_method = {
             'wallet'    : stripe_payment_method['wallet']['type'],
@@ -23,13 +37,13 @@ class PaymentController():
             raise PaymentController.PaymentError.ReceiverNotFound('Receiver Not Found')
         
         converted_amount = int(amount * 100)
-        intent = stripe.PaymentIntent.create(
+        intent = StripeClient.create_intent(
             amount                      = converted_amount,
             currency                    = 'cad',
             payment_method_types        = ['card']
         )
         
-        reference : db.Reference = db.reference(f'/payments/{intent["id"]}')
+        reference : db.Reference = Storage.reference(f'/payments/{intent["id"]}')
 
         payment_data = {
             'receiver_id'   : receiver_id,
@@ -43,52 +57,162 @@ class PaymentController():
 
         return intent['client_secret']
 
+    def create_payments( donations : list[dict], IP : str = '', organization_id : str = None, idempotency_key : str = None ) -> list[dict]:
+        if not isinstance(donations, list) or not donations:
+            raise PaymentController.PaymentError.InvalidBatch('No donations provided')
+        if len(donations) > PaymentController.max_batch_size:
+            raise PaymentController.PaymentError.InvalidBatch(f'At most {PaymentController.max_batch_size} donations per batch')
+
+        for donation in donations:
+            if not isinstance(donation, dict) or not donation.get('receiver_id') or not isinstance(donation.get('amount'), (int, float)) or donation['amount'] <= 0:
+                raise PaymentController.PaymentError.InvalidBatch('Each donation needs a receiver_id and a positive amount')
+
+        receiver_ids    : list[str] = list(dict.fromkeys( donation['receiver_id'] for donation in donations ))
+        existing        : set[str]  = {
+            receiver_id for receiver_id, receiver in zip(receiver_ids, Model.read_many([f'{Receiver.BASE_TABLE}/{receiver_id}' for receiver_id in receiver_ids], shallow = True))
+            if receiver
+        }
+
+        results : list[dict]    = [{'receiver_id' : donation['receiver_id'], 'amount' : donation['amount']} for donation in donations]
+        pending : list[int]     = []
+
+        for index, result in enumerate(results):
+            if result['receiver_id'] in existing:
+                pending.append(index)
+            else:
+                result['error'] = 'Receiver Not Found'
+
+        intents : list = StripeClient.gather([
+            lambda index = index : StripeClient.create_intent(
+                amount                  = int(results[index]['amount'] * 100),
+                currency                = 'cad',
+                payment_method_types    = ['card'],
+                idempotency_key         = f'{idempotency_key}-{index}' if idempotency_key else None
+            )
+            for index in pending
+        ])
+
+        with Model.UnitOfWork():
+            for index, intent in zip(pending, intents):
+                if isinstance(intent, Exception):
+                    results[index]['error'] = str(intent)
+                    continue
+
+                Model.write(f'payments/{intent["id"]}', {
+                    'receiver_id'       : results[index]['receiver_id'],
+                    'amount'            : results[index]['amount'],
+                    'confirmed'         : False,
+                    'curency'           : 'cad',
+                    'creation_date'     : datetime.now().isoformat(),
+                    'organization_id'   : organization_id,
+                    'IP'                : IP
+                })
+                results[index]['client_secret'] = intent['client_secret']
+
+        return results
+
     def confirm_payment( payment_intent : dict ) -> None:
         stripe_id               = payment_intent['id']
         sender_payment_method   = payment_intent['payment_method']
-        sender_details          = stripe.PaymentMethod.retrieve(sender_payment_method)
-
-        sender_address          = sender_details['billing_details']['address']
-        sender_name             = sender_details['billing_details']['name']
-
-        payment_method          = PaymentController.__format_payment_method( sender_details['card'] )
 
-        sender_id               = Sender.create_anonymous( sender_name, sender_address )
+        payment : dict = Model.read(f'payments/{stripe_id}')
 
-        reference = db.reference(f'/payments/{stripe_id}')
+        if not payment or payment.get('confirmed'):
+            return
 
-        payment : dict = reference.get()
+        lease : str | None = PaymentController.__claim_payment( stripe_id )
 
-        if not payment:
+        if lease is None:
             return
-        
-        reference.child('confirmed').set(True)
-        reference.child('confirmation_date').set(datetime.now().isoformat())
-        
+
         receiver_id = payment.get('receiver_id')
         amount = payment.get('amount')
         IP = payment.get('IP')
-        
+
 
         receiver : Receiver = Receiver(receiver_id)
 
-        receiver.deposit(amount)
+        with Model.UnitOfWork():
+            Model.on_rollback( lambda : PaymentController.__release_payment( stripe_id, lease ) )
 
-        Transaction.create_transaction( 
-            receiver_id = receiver_id,
-            sender_id   = sender_id,
-            amount      = amount,
-            type        = Transaction.TransactionType.DONATION,
-            IP          = IP,
-            stripe_id   = stripe_id,
+            sender_details          = StripeClient.retrieve_payment_method(sender_payment_method)
 
-        )
+            sender_address          = sender_details['billing_details']['address']
+            sender_name             = sender_details['billing_details']['name']
+
+            payment_method          = PaymentController.__format_payment_method( sender_details['card'] )
+
+            sender_id = Sender.create_anonymous( sender_name, sender_address )
+
+            Model.write(f'payments/{stripe_id}/confirmed', True)
+            Model.write(f'payments/{stripe_id}/confirmation_date', datetime.now().isoformat())
+            Model.remove(f'payments/{stripe_id}/processing')
+
+            receiver.deposit(amount, stripe_id)
+
+            Transaction.create_transaction( 
+                receiver_id = receiver_id,
+                sender_id   = sender_id,
+                amount      = amount,
+                type        = Transaction.TransactionType.DONATION,
+                IP          = IP,
+                stripe_id   = stripe_id,
+
+            )
+
+    def __claim_payment( stripe_id : str ) -> str | None:
+        lease   : str   = secrets.token_hex(8)
+        outcome : dict  = {'claimed' : False, 'busy' : False}
+
+        def claim( payment ):
+            outcome['claimed'] = outcome['busy'] = False
+
+            if not payment or payment.get('confirmed'):
+                return payment
+
+            processing : dict = payment.get('processing') or {}
+
+            if processing.get('expires_at', 0) > time.time():
+                outcome['busy'] = True
+                return payment
+
+            outcome['claimed'] = True
+            return dict(payment, processing = {'lease' : lease, 'expires_at' : time.time() + PaymentController.claim_timeout})
+
+        Storage.reference(f'/payments/{stripe_id}').transaction(claim)
+        Model.invalidate(f'payments/{stripe_id}')
+
+        if outcome['busy']:
+            raise PaymentController.PaymentError.PaymentInProgress(f'Payment {stripe_id} is being confirmed by another worker')
+        return lease if outcome['claimed'] else None
+
+    def __release_payment( stripe_id : str, lease : str ) -> None:
+        def release( processing ):
+            return None if (processing or {}).get('lease') == lease else processing
+
+        Storage.reference(f'/payments/{stripe_id}/processing').transaction(release)
+        Model.invalidate(f'payments/{stripe_id}')
+
+    def receive_webhook( payload : bytes, signature : str = None ) -> bool:
+        from .webhook_queue import WebhookQueue
+
+        if not PaymentController.webhook_secret and not PaymentController.allow_unsigned:
+            raise PaymentController.PaymentError.InvalidWebhook('Webhook signing secret is not configured')
+
+        try:
+            if PaymentController.webhook_secret:
+                StripeClient.verify_webhook( payload, signature, PaymentController.webhook_secret )
+            event : dict = json.loads(payload)
+        except (ValueError, stripe.SignatureVerificationError) as e:
+            raise PaymentController.PaymentError.InvalidWebhook(f'Invalid webhook : {e}')
+
+        return WebhookQueue.enqueue( event )
 
     def cancel_payment( client_secret : str ):
 
         stripe_id = client_secret.split('_secret_')[0]
 
-        reference = db.reference(f'/payments/{stripe_id}')
+        reference = Storage.reference(f'/payments/{stripe_id}')
 
         reference.delete()
-        stripe.PaymentIntent.cancel( stripe_id )
+        StripeClient.cancel_intent( stripe_id )
@@ -1,9 +1,10 @@
 import  re
 import  enum
 from    utils           import SendMail
-from    models          import Receiver
+from    models          import Model, Receiver, Ledger
 from    datetime        import datetime
 from    firebase_admin  import db, auth
+from    storage         import Storage
 import logging
 
 
@@ -26,11 +27,11 @@ class ReceiverController():
     def donation_profile( receiver_id : str ) -> dict:
         receiver : Receiver = Receiver(receiver_id)
 
-        receiver_data : dict = receiver.get()
+        receiver_data : dict = receiver.get_fields('first_name', 'last_name', 'id_picture_file')
 
         profile = None
 
-        if receiver_data:
+        if any(receiver_data.values()):
             profile = {
                 'id' : receiver_id,
                 'name' : f'{receiver_data.get("first_name")} {receiver_data.get("last_name")[0]}.',
@@ -57,9 +58,7 @@ class ReceiverController():
         print(f'SEND ACCOUNT LINK RECEIVER : {receiver_id}')
         logging.info(f'SEND ACCOUNT LINK RECEIVER : {receiver_id}')
         receiver        : Receiver  = Receiver( receiver_id )
-        receiver_data   : dict      = receiver.get()
-
-        email           : str       = receiver_data.get('email')
+        email           : str       = receiver.get_child('email')
 
         print(f'SEND ACCOUNT LINK EMAIL : {email}')
         logging.info(f'SEND ACCOUNT LINK EMAIL : {email}')
@@ -76,12 +75,12 @@ class ReceiverController():
     def create_app_account ( receiver_id : str, password : str ):
 
         receiver        : Receiver      = Receiver( receiver_id )
-        users_reference : db.Reference  = db.reference( f'/users' )
+        users_reference : db.Reference  = Storage.reference( f'/users' )
 
-        receiver_data : dict = receiver.get()
-        
-        if not receiver_data:
+        if not receiver.exist():
             raise ReceiverError.ReceiverNotFound()
+
+        receiver_data : dict = receiver.get_fields('email', 'has_app_access')
         
         if not receiver_data.get('email'):
             raise ReceiverError.NoLinkedEmail()
@@ -107,6 +106,30 @@ class ReceiverController():
         receiver : Receiver = Receiver(receiver_id)
 
         return receiver.get_balance()
+
+    def migrate_balances() -> int:
+        receivers   : dict  = Storage.reference('/receivers').get() or {}
+        count       : int   = 0
+
+        for receiver_id, receiver_data in receivers.items():
+            if not isinstance(receiver_data, dict) or 'balance' not in receiver_data:
+                continue
+
+            ledger : Ledger = Ledger( receiver_id )
+
+            with Model.UnitOfWork():
+                if not ledger.is_opened() and float(receiver_data['balance'] or 0) > 0:
+                    ledger.open( receiver_data['balance'], 'opening_balance' )
+                    count += 1
+                Model.remove(f'receivers/{receiver_id}/balance')
+
+        return count
+
+    def compact_ledgers() -> int:
+        return sum( Ledger( receiver_id ).compact() for receiver_id in Ledger.get_ids() )
+
+    def reconcile_ledgers() -> int:
+        return sum( bool(Ledger( receiver_id ).reconcile()) for receiver_id in Ledger.get_ids() )
     
     def get_receiver( receiver_id : str ) -> dict:
         receiver : Receiver = Receiver(receiver_id)
@@ -119,9 +142,9 @@ class ReceiverController():
             return date.strftime("%B %Y")
         receiver : Receiver = Receiver( receiver_id )
 
-        data = receiver.get()
+        data = receiver.get_fields('id_picture_file', 'first_name', 'last_name', 'creation_date')
 
-        if not data:
+        if not any(data.values()):
             raise ValueError("receiver_not_found")
         
         profile = {
@@ -1,15 +1,30 @@
 from firebase_admin import db
-from models         import Receiver, Organization
+from models         import Model, Receiver, Organization
+from storage        import Storage
 
 
 class SubscriptionController:
     
-    BASE_TABLE : str = 'subscriptions'
+    BASE_TABLE          : str = 'subscriptions'
+    SUBSCRIBERS_TABLE   : str = 'subscribers'
 
     class SubscriptionError(Exception):
         class ReceiverNotFound      (Exception) :pass
         class OrganizationNotFound  (Exception) :pass
 
+    def __timeline( receiver_id : str, organization_id : str, following : bool ) -> None:
+        from .feed_controller   import FeedController
+        if following:
+            FeedController.follow_author( receiver_id, organization_id )
+        else:
+            FeedController.unfollow_author( receiver_id, organization_id )
+
+    def __invalidate_feed( receiver_id : str ) -> None:
+        from .feed_controller   import FeedController
+        from .friend_controller import FriendController
+        FeedController.invalidate_feeds( receiver_id )
+        FriendController.invalidate_adjacency( receiver_id )
+
     def subscribe ( receiver_id : str, organization_id : str ) -> None:
         print("SUB")
         receiver        : Receiver      = Receiver      ( receiver_id )
@@ -19,7 +34,12 @@ class SubscriptionController:
         if not organization.exist():
             raise SubscriptionController.SubscriptionError.OrganizationNotFound('Organization not found')
         
-        db.reference(SubscriptionController.BASE_TABLE).child(receiver.id).child(organization.id).set(True)
+        with Model.UnitOfWork():
+            Model.write(f'{SubscriptionController.BASE_TABLE}/{receiver.id}/{organization.id}', True)
+            Model.write(f'{SubscriptionController.SUBSCRIBERS_TABLE}/{organization.id}/{receiver.id}', True)
+            SubscriptionController.__timeline( receiver.id, organization.id, following = True )
+
+        SubscriptionController.__invalidate_feed( receiver.id )
 
     def unsubscribe( receiver_id : str, organization_id : str ) -> None:
         print("UNSUB")
@@ -30,7 +50,12 @@ class SubscriptionController:
         if not organization.exist():
             raise SubscriptionController.SubscriptionError.OrganizationNotFound('Organization not found')
         
-        db.reference(SubscriptionController.BASE_TABLE).child(receiver.id).child(organization.id).delete()
+        with Model.UnitOfWork():
+            Model.remove(f'{SubscriptionController.BASE_TABLE}/{receiver.id}/{organization.id}')
+            Model.remove(f'{SubscriptionController.SUBSCRIBERS_TABLE}/{organization.id}/{receiver.id}')
+            SubscriptionController.__timeline( receiver.id, organization.id, following = False )
+
+        SubscriptionController.__invalidate_feed( receiver.id )
 
     def get_subscriptions( receiver_id : str ) -> list:
 
@@ -40,10 +65,33 @@ class SubscriptionController:
         if not receiver.exist():
             raise SubscriptionController.SubscriptionError.ReceiverNotFound('Receiver not found')
         
-        subscription_data : dict = db.reference(SubscriptionController.BASE_TABLE).child(receiver.id).get()
+        subscription_data : dict = Storage.reference(SubscriptionController.BASE_TABLE).child(receiver.id).get()
 
         if subscription_data:
             for subscription in subscription_data:
                 subscriptions.append(subscription)
 
-        return subscriptions
\ No newline at end of file
+        return subscriptions
+
+    def get_subscribers( organization_id : str ) -> list:
+
+        subscriber_data : dict = Storage.reference(SubscriptionController.SUBSCRIBERS_TABLE).child(organization_id).get(shallow = True)
+
+        if not subscriber_data:
+            return []
+
+        return list(subscriber_data)
+
+    def backfill_subscribers() -> int:
+
+        subscription_data   : dict = Storage.reference(SubscriptionController.BASE_TABLE).get() or {}
+        subscribers         : dict = {}
+
+        for receiver_id, organizations in subscription_data.items():
+            for organization_id in organizations or {}:
+                subscribers[f'{organization_id}/{receiver_id}'] = True
+
+        if subscribers:
+            Storage.reference(SubscriptionController.SUBSCRIBERS_TABLE).update(subscribers)
+
+        return len(subscribers)
@@ -1,22 +1,31 @@
-from models import Transaction, Receiver
+from models import Model, Transaction, Receiver, Rollup
+from utils  import FeedEngine, Cursor
 
 
 
 class TransactionController:
 
+    class TransactionError(Exception):
+        class InvalidCursor (Exception) : pass
+        class InvalidPeriod (Exception) : pass
+
+    page_size       : int   = 20
+    max_page_size   : int   = 100
+
     def send( sender_id : str, receiver_id : str, amount : float ) :
 
         sender : Receiver = Receiver( sender_id )
         receiver : Receiver = Receiver( receiver_id )
 
-        try:
-            sender.withdraw(amount)
-        except Exception as e:
-            raise e
-        
+        with Model.UnitOfWork():
+            try:
+                sender.withdraw(amount)
+            except Exception as e:
+                raise e
+            
 
-        receiver.deposit(amount)
-        Transaction.create_transaction(receiver_id, amount, Transaction.TransactionType.SEND, sender_id)
+            receiver.deposit(amount)
+            Transaction.create_transaction(receiver_id, amount, Transaction.TransactionType.SEND, sender_id)
         
         
 
@@ -24,14 +33,56 @@ class TransactionController:
 
         sender : Receiver = Receiver(sender_id)
 
+        with Model.UnitOfWork():
+            try:
+                sender.withdraw(amount)
+            except Exception as e:
+                raise e
+            
+            Transaction.create_transaction(organization_id, amount, Transaction.TransactionType.WITHDRAW, sender_id)
+
+
+    def __decode_cursor( cursor : str | None ) -> list | None:
+        if not cursor:
+            return None
+
         try:
-            sender.withdraw(amount)
-        except Exception as e:
-            raise e
-        
-        Transaction.create_transaction(organization_id, amount, Transaction.TransactionType.WITHDRAW, sender_id)
+            position = Cursor.decode( cursor )
+        except Cursor.CursorError.InvalidCursor as e:
+            raise TransactionController.TransactionError.InvalidCursor(str(e))
 
+        if not Cursor.is_position( position ):
+            raise TransactionController.TransactionError.InvalidCursor('Invalid cursor')
+
+        return position
+
+    def get_transactions( receiver_id : str, cursor : str = None, limit : int = None ) -> tuple[list[dict], str | None]:
+        if cursor is None and limit is None:
+            page        : list  = list(FeedEngine.newest_first( Transaction.get_index( receiver_id ) ))
+            next_cursor : str   = None
+        else:
+            limit       : int   = max(1, min(limit or TransactionController.page_size, TransactionController.max_page_size))
+            position    : list  = TransactionController.__decode_cursor( cursor )
+
+            fetch       = lambda before, count : Transaction.get_index( receiver_id, before, count )
+            entries     : list  = FeedEngine.take( FeedEngine.keyset( fetch, limit + 1, position ), limit + 1 )
+            page        : list  = entries[:limit]
+            next_cursor : str   = Cursor.encode( list(page[-1]) ) if len(entries) > limit else None
+
+        transactions : list = []
+        for (_, transaction_id), transaction in zip(page, Transaction.get_many([transaction_id for _, transaction_id in page])):
+            if not transaction:
+                continue
+            transaction['id'] = transaction_id
+            transactions.append(transaction)
+
+        return transactions, next_cursor
+
+    def get_rollup( user_id : str, period : str = None, key : str = None ) -> dict:
+        try:
+            return Rollup( user_id ).get_bucket( period or Rollup.Period.MONTHLY, key )
+        except ( Rollup.RollupError.InvalidPeriod, Rollup.RollupError.InvalidKey ) as e:
+            raise TransactionController.TransactionError.InvalidPeriod(str(e))
 
-    def get_transactions( receiver_id : str ):
-        txs = Transaction.get_transactions( receiver_id )
-        return txs
\ No newline at end of file
+    def reconcile_rollups() -> int:
+        return Rollup.rebuild( Transaction.BASE_TABLE )
@@ -0,0 +1,258 @@
+from    typing              import Callable
+from    models              import Model
+import  threading
+import  logging
+import  sqlite3
+import  json
+import  time
+
+
+class WebhookQueue:
+
+    class WebhookQueueError(Exception):
+        class InvalidEvent  (Exception) : pass
+        class NotConfigured (Exception) : pass
+
+    class Status:
+        PENDING     : str = 'pending'
+        PROCESSING  : str = 'processing'
+        DONE        : str = 'done'
+        DUPLICATE   : str = 'duplicate'
+        IGNORED     : str = 'ignored'
+        FAILED      : str = 'failed'
+
+    path                : str | None        = None
+    workers             : int               = 4
+    max_attempts        : int               = 8
+    retry_delay         : float             = 5
+    visibility_timeout  : float             = 300
+    poll_interval       : float             = 0.5
+    retention           : float             = 7 * 24 * 3600
+
+    handlers            : dict              = {}
+    local               : threading.local   = threading.local()
+    ready               : threading.Event   = threading.Event()
+    wakeup              : threading.Event   = threading.Event()
+    stopping            : threading.Event   = threading.Event()
+    threads             : list              = []
+    lock                : threading.Lock    = threading.Lock()
+    counters            : dict              = {'enqueued' : 0, 'duplicates' : 0, 'processed' : 0, 'retried' : 0, 'failed' : 0}
+
+    def configure( path : str = None, workers : int = None, max_attempts : int = None, retry_delay : float = None, visibility_timeout : float = None ) -> None:
+        WebhookQueue.path               = path                  or WebhookQueue.path
+        WebhookQueue.workers            = workers               or WebhookQueue.workers
+        WebhookQueue.max_attempts       = max_attempts          or WebhookQueue.max_attempts
+        WebhookQueue.retry_delay        = retry_delay           or WebhookQueue.retry_delay
+        WebhookQueue.visibility_timeout = visibility_timeout    or WebhookQueue.visibility_timeout
+        WebhookQueue.local              = threading.local()
+        WebhookQueue.ready.clear()
+
+    def register( event_type : str, handler : Callable[[dict], None] ) -> None:
+        WebhookQueue.handlers[event_type] = handler
+
+    def __connection() -> sqlite3.Connection:
+        connection : sqlite3.Connection | None = getattr(WebhookQueue.local, 'connection', None)
+
+        if WebhookQueue.path is None:
+            raise WebhookQueue.WebhookQueueError.NotConfigured('Webhook queue path is not configured')
+
+        if connection is None:
+            connection = sqlite3.connect( WebhookQueue.path, timeout = 5, isolation_level = None )
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=FULL')
+            WebhookQueue.local.connection = connection
+
+        if not WebhookQueue.ready.is_set():
+            WebhookQueue.__create_tables( connection )
+            WebhookQueue.ready.set()
+
+        return connection
+
+    def __create_tables( connection : sqlite3.Connection ) -> None:
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS webhook_events ('
+            '   id              TEXT PRIMARY KEY,'
+            '   type            TEXT NOT NULL,'
+            '   idempotency_key TEXT NOT NULL,'
+            '   payload         TEXT NOT NULL,'
+            '   status          TEXT NOT NULL,'
+            '   attempts        INTEGER NOT NULL DEFAULT 0,'
+            '   available_at    REAL NOT NULL,'
+            '   locked_at       REAL,'
+            '   created_at      REAL NOT NULL,'
+            '   last_error      TEXT'
+            ')'
+        )
+        connection.execute('CREATE INDEX IF NOT EXISTS webhook_events_ready ON webhook_events (status, available_at)')
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS webhook_idempotency ('
+            '   key             TEXT PRIMARY KEY,'
+            '   event_id        TEXT NOT NULL,'
+            '   processed_at    REAL NOT NULL'
+            ')'
+        )
+
+    def enqueue( event : dict ) -> bool:
+        event_id    : str   = event.get('id') if isinstance(event, dict) else None
+        event_type  : str   = event.get('type') if isinstance(event, dict) else None
+        data        : dict  = (event.get('data') or {}).get('object') if isinstance(event, dict) else None
+
+        if not event_id or not event_type or not isinstance(data, dict):
+            raise WebhookQueue.WebhookQueueError.InvalidEvent('Invalid webhook event')
+
+        now : float = time.time()
+
+        inserted : bool = WebhookQueue.__connection().execute(
+            'INSERT OR IGNORE INTO webhook_events (id, type, idempotency_key, payload, status, available_at, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (event_id, event_type, data.get('id') or event_id, json.dumps(event), WebhookQueue.Status.PENDING, now, now)
+        ).rowcount == 1
+
+        with WebhookQueue.lock:
+            WebhookQueue.counters['enqueued' if inserted else 'duplicates'] += 1
+
+        if inserted:
+            WebhookQueue.wakeup.set()
+        return inserted
+
+    def __claim() -> tuple | None:
+        now         : float                 = time.time()
+        connection  : sqlite3.Connection    = WebhookQueue.__connection()
+
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            connection.execute(
+                'UPDATE webhook_events SET status = ?, available_at = ? WHERE status = ? AND locked_at < ?',
+                (WebhookQueue.Status.PENDING, now, WebhookQueue.Status.PROCESSING, now - WebhookQueue.visibility_timeout)
+            )
+            row : tuple | None = connection.execute(
+                'SELECT id, type, idempotency_key, payload, attempts FROM webhook_events '
+                'WHERE status = ? AND available_at <= ? ORDER BY available_at LIMIT 1',
+                (WebhookQueue.Status.PENDING, now)
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            connection.execute(
+                'UPDATE webhook_events SET status = ?, locked_at = ?, attempts = attempts + 1 WHERE id = ?',
+                (WebhookQueue.Status.PROCESSING, now, row[0])
+            )
+            return row
+
+    def __finish( event_id : str, status : str, idempotency_key : str = None ) -> None:
+        connection : sqlite3.Connection = WebhookQueue.__connection()
+
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            if idempotency_key is not None:
+                connection.execute(
+                    'INSERT OR IGNORE INTO webhook_idempotency (key, event_id, processed_at) VALUES (?, ?, ?)',
+                    (idempotency_key, event_id, time.time())
+                )
+            connection.execute(
+                'UPDATE webhook_events SET status = ?, locked_at = NULL, last_error = NULL WHERE id = ?',
+                (status, event_id)
+            )
+
+    def __fail( event_id : str, attempts : int, error : Exception ) -> None:
+        final   : bool  = attempts >= WebhookQueue.max_attempts
+        delay   : float = WebhookQueue.retry_delay * 2 ** (attempts - 1)
+
+        WebhookQueue.__connection().execute(
+            'UPDATE webhook_events SET status = ?, available_at = ?, locked_at = NULL, last_error = ? WHERE id = ?',
+            (WebhookQueue.Status.FAILED if final else WebhookQueue.Status.PENDING, time.time() + delay, str(error), event_id)
+        )
+
+        with WebhookQueue.lock:
+            WebhookQueue.counters['failed' if final else 'retried'] += 1
+
+        logging.error(f'WEBHOOK QUEUE : {event_id} : attempt {attempts} : {error}')
+
+    def __processed( idempotency_key : str ) -> bool:
+        return WebhookQueue.__connection().execute(
+            'SELECT 1 FROM webhook_idempotency WHERE key = ?', (idempotency_key,)
+        ).fetchone() is not None
+
+    def process_next() -> bool:
+        row : tuple | None = WebhookQueue.__claim()
+
+        if row is None:
+            return False
+
+        event_id, event_type, idempotency_key, payload, attempts = row
+        handler : Callable | None = WebhookQueue.handlers.get(event_type)
+
+        if handler is None:
+            WebhookQueue.__finish( event_id, WebhookQueue.Status.IGNORED )
+            return True
+
+        if WebhookQueue.__processed( idempotency_key ):
+            WebhookQueue.__finish( event_id, WebhookQueue.Status.DUPLICATE )
+            return True
+
+        Model.begin_request()
+        try:
+            handler( json.loads(payload)['data']['object'] )
+        except Exception as e:
+            WebhookQueue.__fail( event_id, attempts + 1, e )
+            return True
+        finally:
+            Model.end_request()
+
+        WebhookQueue.__finish( event_id, WebhookQueue.Status.DONE, idempotency_key )
+
+        with WebhookQueue.lock:
+            WebhookQueue.counters['processed'] += 1
+        return True
+
+    def drain( limit : int = None ) -> int:
+        count : int = 0
+
+        while (limit is None or count < limit) and WebhookQueue.process_next():
+            count += 1
+
+        return count
+
+    def purge() -> int:
+        return WebhookQueue.__connection().execute(
+            'DELETE FROM webhook_events WHERE status IN (?, ?, ?) AND created_at < ?',
+            (WebhookQueue.Status.DONE, WebhookQueue.Status.DUPLICATE, WebhookQueue.Status.IGNORED, time.time() - WebhookQueue.retention)
+        ).rowcount
+
+    def __loop() -> None:
+        while not WebhookQueue.stopping.is_set():
+            try:
+                if WebhookQueue.process_next():
+                    continue
+            except Exception as e:
+                logging.error(f'WEBHOOK QUEUE : {e}')
+
+            WebhookQueue.wakeup.wait(WebhookQueue.poll_interval)
+            WebhookQueue.wakeup.clear()
+
+    def start() -> None:
+        if any(thread.is_alive() for thread in WebhookQueue.threads):
+            return
+
+        WebhookQueue.stopping.clear()
+        WebhookQueue.threads = [
+            threading.Thread( target = WebhookQueue.__loop, name = f'webhook-worker-{index}', daemon = True )
+            for index in range(WebhookQueue.workers)
+        ]
+        for thread in WebhookQueue.threads:
+            thread.start()
+
+    def stop() -> None:
+        WebhookQueue.stopping.set()
+        WebhookQueue.wakeup.set()
+        for thread in WebhookQueue.threads:
+            thread.join()
+        WebhookQueue.threads = []
+
+    def stats() -> dict:
+        rows : list = WebhookQueue.__connection().execute(
+            'SELECT status, COUNT(*) FROM webhook_events GROUP BY status'
+        ).fetchall()
+
+        with WebhookQueue.lock:
+            return dict(WebhookQueue.counters, statuses = dict(rows), workers = len(WebhookQueue.threads))
@@ -1,9 +1,12 @@
 from .model         import Model
+from .ledger        import Ledger
 from .user          import User
 from .receiver      import Receiver
 from .organization  import Organization
+from .rollup        import Rollup
 from .transaction   import Transaction
 from .post          import Post
 from .sender        import Sender
 from .chat          import Chat
+from .timeline      import Timeline
 
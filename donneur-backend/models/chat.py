@@ -23,7 +23,6 @@ class Chat(Model):
         if (len(members) > 2) and (not name):
             raise Chat.ChatError.NoChatNameProvided()
         
-        reference : db.Reference = db.reference('/chats')
         chat_data = {
             'created_at'    : datetime.now().isoformat(),
             'is_channel'    : False,
@@ -31,9 +30,9 @@ class Chat(Model):
             'name'          : name
         }
 
-        chat = reference.push(chat_data)
+        chat_id : str = Chat.push(Chat.BASE_TABLE, chat_data)
 
-        return Chat(chat.key) 
+        return Chat(chat_id) 
 
     def create_channel( members : list, name : str = '') -> Chat:
 
@@ -42,7 +41,6 @@ class Chat(Model):
         if not name:
             raise Chat.ChatError.NoChatNameProvided()
         
-        reference : db.Reference = db.reference('/chats')
         chat_data = {
             'created_at'    : datetime.now().isoformat(),
             'is_channel'    : True,
@@ -50,9 +48,9 @@ class Chat(Model):
             'name'          : name
         }
 
-        channel = reference.push(chat_data)
+        channel_id : str = Chat.push(Chat.BASE_TABLE, chat_data)
 
-        return Chat(channel.key) 
+        return Chat(channel_id) 
 
 
     def save_message( self, user_id : str, content : str ) -> None:
@@ -61,14 +59,14 @@ class Chat(Model):
             'content'   : content,
             'created_at': datetime.now().isoformat()
         }
-        self.reference.child('messages').push(message_data)
+        Chat.push(f'{self.path}/messages', message_data)
     
     def get_messages(self):
-        messages : list = self.reference.child('messages').get()
+        messages : list = self.get_child('messages')
         return messages
 
     def get_members( self ) -> list[str]:
-        members : list = self.reference.child('members').get()
+        members : list = self.get_child('members')
         return members
 
     def add_member( self , member_id : str) -> None:
@@ -79,7 +77,7 @@ class Chat(Model):
             raise Chat.ChatError.MemberAlreadyInChat()
         
         members.append(member_id)
-        self.reference.child('members').set(members)
+        self.set_child('members', members)
 
     def remove_member ( self, member_id : str) -> None:
         
@@ -89,4 +87,4 @@ class Chat(Model):
             raise Chat.ChatError.MemberNotInChat    
         
         members.remove(member_id)
-        self.reference.child('members').set(members)
+        self.set_child('members', members)
@@ -0,0 +1,222 @@
+from    __future__      import annotations
+from    models          import Model
+from    storage         import Storage
+from    datetime        import datetime
+import  logging
+import  time
+
+
+class Ledger(Model):
+
+    BASE_TABLE      : str   = 'ledger/entries'
+    SNAPSHOT_TABLE  : str   = 'ledger/snapshots'
+    DEBIT_TABLE     : str   = 'ledger/debits'
+    OPENING_KEY     : str   = 'opening'
+    SNAPSHOT_MARGIN : float = 300
+    PENDING_TIMEOUT : float = 300
+    COMPACT_AFTER   : int   = 200
+    MAX_ATTEMPTS    : int   = 5
+
+    class LedgerError(Exception):
+        class InsufficientFunds (Exception) : pass
+        class SnapshotConflict  (Exception) : pass
+
+    class EntryKind:
+        CREDIT  : str = 'credit'
+        DEBIT   : str = 'debit'
+
+    def __init__(self, id : str):
+        super().__init__(id, Ledger.BASE_TABLE)
+
+    def __amount( amount : float ) -> float:
+        return round(abs(float(amount)), 2)
+
+    def __append( self, amount : float, kind : str, reference : str = None ) -> str:
+        return Ledger.push(self.path, {
+            'amount'        : amount,
+            'kind'          : kind,
+            'reference'     : reference,
+            'created_at'    : datetime.now().isoformat()
+        })
+
+    def __debits( node ) -> dict:
+        if isinstance(node, dict):
+            return {'total' : float(node.get('total') or 0), 'pending' : dict(node.get('pending') or {})}
+        return {'total' : float(node or 0), 'pending' : {}}
+
+    def __reserve( self, key : str, amount : float, funds : float ) -> bool:
+        outcome : dict = {'applied' : False}
+
+        def reserve( node ):
+            debits : dict = Ledger.__debits(node)
+
+            outcome['applied'] = round(funds - debits['total'], 2) >= amount
+            if not outcome['applied']:
+                return node
+
+            debits['total']         = round(debits['total'] + amount, 2)
+            debits['pending'][key]  = {'amount' : amount, 'at' : time.time()}
+            return debits
+
+        Storage.reference(f'/{Ledger.DEBIT_TABLE}/{self.id}').transaction(reserve)
+        Ledger.invalidate(f'{Ledger.DEBIT_TABLE}/{self.id}')
+        return outcome['applied']
+
+    def __release( self, key : str ) -> bool:
+        outcome : dict = {'released' : False}
+
+        def release( node ):
+            debits  : dict          = Ledger.__debits(node)
+            hold    : dict | None   = debits['pending'].pop(key, None)
+
+            outcome['released'] = hold is not None
+            if hold is None:
+                return node
+
+            debits['total'] = round(max(debits['total'] - hold['amount'], 0), 2)
+            return debits
+
+        Storage.reference(f'/{Ledger.DEBIT_TABLE}/{self.id}').transaction(release)
+        Ledger.invalidate(f'{Ledger.DEBIT_TABLE}/{self.id}')
+        return outcome['released']
+
+    def open( self, amount : float, reference : str = None ) -> None:
+        Ledger.write(f'{self.path}/{Ledger.OPENING_KEY}', {
+            'amount'        : Ledger.__amount(amount),
+            'kind'          : Ledger.EntryKind.CREDIT,
+            'reference'     : reference,
+            'created_at'    : datetime.now().isoformat()
+        })
+
+    def is_opened( self ) -> bool:
+        return bool(Ledger.read(f'{self.path}/{Ledger.OPENING_KEY}', shallow = True))
+
+    def credit( self, amount : float, reference : str = None ) -> str:
+        return self.__append( Ledger.__amount(amount), Ledger.EntryKind.CREDIT, reference )
+
+    def debit( self, amount : float, reference : str = None ) -> str:
+        amount  : float = Ledger.__amount(amount)
+        key     : str   = Storage.generate_key()
+
+        if not self.__reserve( key, amount, self.get_credits() ):
+            raise Ledger.LedgerError.InsufficientFunds()
+
+        with Ledger.UnitOfWork():
+            Ledger.on_rollback( lambda : self.__release( key ) )
+
+            Ledger.write(f'{self.path}/{key}', {
+                'amount'        : -amount,
+                'kind'          : Ledger.EntryKind.DEBIT,
+                'reference'     : reference,
+                'created_at'    : datetime.now().isoformat()
+            })
+            Ledger.remove(f'{Ledger.DEBIT_TABLE}/{self.id}/pending/{key}')
+
+        return key
+
+    def __entries_since( self, through : str | None, until : str = None ) -> dict:
+        query = Storage.reference(self.path).order_by_key()
+
+        if through:
+            query = query.start_at(through)
+        if until:
+            query = query.end_at(until)
+
+        entries : dict = query.get() or {}
+        return { key : entry for key, entry in entries.items() if key != through and isinstance(entry, dict) }
+
+    def __sum_credits( entries : dict ) -> float:
+        return sum(entry.get('amount', 0) for entry in entries.values() if entry.get('amount', 0) > 0)
+
+    def __sum_debits( entries : dict ) -> float:
+        return -sum(entry.get('amount', 0) for entry in entries.values() if entry.get('amount', 0) < 0)
+
+    def get_credits( self ) -> float:
+        snapshot    : dict  = Ledger.read(f'{Ledger.SNAPSHOT_TABLE}/{self.id}') or {}
+        entries     : dict  = self.__entries_since( snapshot.get('through') )
+
+        if len(entries) > Ledger.COMPACT_AFTER:
+            self.__compact_quietly()
+
+        return round(snapshot.get('credits', 0) + Ledger.__sum_credits(entries), 2)
+
+    def __compact_quietly( self ) -> None:
+        try:
+            self.compact()
+        except Ledger.LedgerError.SnapshotConflict:
+            pass
+
+    def get_debits( self ) -> float:
+        return Ledger.__debits( Ledger.read(f'{Ledger.DEBIT_TABLE}/{self.id}') )['total']
+
+    def get_balance( self ) -> float:
+        credits, debits = Ledger.parallel([ self.get_credits, self.get_debits ])
+        return round(credits - debits, 2)
+
+    def compact( self ) -> bool:
+        cutoff      : str   = Storage.key_prefix( int((time.time() - Ledger.SNAPSHOT_MARGIN) * 1000) )
+        reference           = Storage.reference(f'/{Ledger.SNAPSHOT_TABLE}/{self.id}')
+
+        for _ in range(Ledger.MAX_ATTEMPTS):
+            snapshot, etag  = reference.get(etag = True)
+            snapshot        = snapshot or {}
+            entries : dict  = self.__entries_since( snapshot.get('through'), cutoff )
+
+            if not entries:
+                return False
+
+            updated : dict = {
+                'credits'       : round(snapshot.get('credits', 0) + Ledger.__sum_credits(entries), 2),
+                'debits'        : round(snapshot.get('debits', 0) + Ledger.__sum_debits(entries), 2),
+                'through'       : max(entries),
+                'updated_at'    : datetime.now().isoformat()
+            }
+
+            success, _, _ = reference.set_if_unchanged(etag, updated)
+            if success:
+                Ledger.invalidate(f'{Ledger.SNAPSHOT_TABLE}/{self.id}')
+                return True
+
+        raise Ledger.LedgerError.SnapshotConflict()
+
+    def reconcile( self ) -> float:
+        reference           = Storage.reference(f'/{Ledger.DEBIT_TABLE}/{self.id}')
+        stale   : list[str] = [
+            key for key, hold in Ledger.__debits( reference.get() )['pending'].items()
+            if (hold or {}).get('at', 0) + Ledger.PENDING_TIMEOUT < time.time()
+        ]
+
+        for key in stale:
+            if Storage.reference(f'/{self.path}/{key}').get(shallow = True):
+                Storage.reference(f'/{Ledger.DEBIT_TABLE}/{self.id}/pending/{key}').delete()
+            elif self.__release( key ):
+                logging.warning(f'LEDGER : {self.id} : released debit hold {key} that never reached the ledger')
+
+        pending     : set[str]  = set(Ledger.__debits( reference.get() )['pending'])
+        snapshot    : dict      = Storage.reference(f'/{Ledger.SNAPSHOT_TABLE}/{self.id}').get() or {}
+        recorded    : float     = snapshot.get('debits', 0) + Ledger.__sum_debits( self.__entries_since( snapshot.get('through') ) )
+        outcome     : dict      = {'drift' : 0.0}
+
+        def correct( node ):
+            debits : dict = Ledger.__debits(node)
+
+            if set(debits['pending']) != pending:
+                return node
+
+            expected : float = round(recorded + sum(hold['amount'] for hold in debits['pending'].values()), 2)
+            outcome['drift'] = round(debits['total'] - expected, 2)
+            if not outcome['drift']:
+                return node
+
+            debits['total'] = expected
+            return debits
+
+        reference.transaction(correct)
+        Ledger.invalidate(f'{Ledger.DEBIT_TABLE}/{self.id}')
+
+        if outcome['drift']:
+            logging.warning(f'LEDGER : {self.id} : debit total was off by {outcome["drift"]}, rebuilt from entries')
+        return outcome['drift']
+
+    def get_ids() -> list[str]:
+        return list(Ledger.read(Ledger.BASE_TABLE, shallow = True) or {})
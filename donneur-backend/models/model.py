@@ -1,14 +1,360 @@
-from firebase_admin import db
+from    firebase_admin      import db
+from    storage             import Storage
+from    typing              import Callable
+import  threading
+import  logging
+import  copy
 class Model:
 
+    class UnitOfWork:
+
+        __current : threading.local = threading.local()
+
+        def __init__( self ):
+            self.changes    : dict              = {}
+            self.rollbacks  : list[Callable]    = []
+            self.commits    : list[Callable]    = []
+            self.outer      : Model.UnitOfWork  = None
+
+        def current() -> 'Model.UnitOfWork | None':
+            return getattr(Model.UnitOfWork.__current, 'unit', None)
+
+        def stage( self, path : str, value ) -> None:
+            for staged_path in list(self.changes):
+                if staged_path == path or staged_path.startswith(f'{path}/'):
+                    del self.changes[staged_path]
+
+            for staged_path in self.changes:
+                if path.startswith(f'{staged_path}/'):
+                    node : dict = self.changes[staged_path]
+                    if not isinstance(node, dict):
+                        node = self.changes[staged_path] = {}
+
+                    segments : list[str] = path[len(staged_path) + 1:].split('/')
+                    for segment in segments[:-1]:
+                        if not isinstance(node.get(segment), dict):
+                            node[segment] = {}
+                        node = node[segment]
+                    node[segments[-1]] = copy.deepcopy(value)
+                    return
+
+            self.changes[path] = copy.deepcopy(value)
+
+        def on_rollback( self, callback : Callable ) -> None:
+            self.rollbacks.append(callback)
+
+        def on_commit( self, callback : Callable ) -> None:
+            self.commits.append(callback)
+
+        def __commit( self ) -> None:
+            for callback in self.commits:
+                try:
+                    callback()
+                except Exception as e:
+                    logging.error(f'UNIT OF WORK : commit hook failed : {e}')
+            self.commits = []
+
+        def __rollback( self ) -> None:
+            for callback in reversed(self.rollbacks):
+                try:
+                    callback()
+                except Exception as e:
+                    logging.error(f'UNIT OF WORK : rollback failed : {e}')
+            self.rollbacks = []
+
+        def __enter__( self ) -> 'Model.UnitOfWork':
+            self.outer = Model.UnitOfWork.current()
+            Model.UnitOfWork.__current.unit = self
+            return self
+
+        def __exit__( self, exception_type, exception, traceback ) -> bool:
+            Model.UnitOfWork.__current.unit = self.outer
+
+            if exception_type is not None:
+                self.__rollback()
+                self.commits = []
+                return False
+
+            if self.outer is not None:
+                for path, value in self.changes.items():
+                    self.outer.stage(path, value)
+                self.outer.rollbacks.extend(self.rollbacks)
+                self.outer.commits.extend(self.commits)
+                return False
+
+            try:
+                Model.apply(self.changes)
+            except Exception:
+                self.__rollback()
+                raise
+            self.__commit()
+            return False
+
+
+    __request               : threading.local   = threading.local()
+
     def __init__(self, id : str, base_table : str ):
-        self.id : str = id
-        self.reference : db.Reference = db.reference(f'/{base_table}/{id}')
+        self.id         : str           = id
+        self.path       : str           = Model.normalize(f'{base_table}/{id}')
+        self.reference  : db.Reference  = Storage.reference(f'/{base_table}/{id}')
+
+
+    def normalize( path : str ) -> str:
+        return '/'.join( segment for segment in str(path).split('/') if segment )
+
+    def begin_request() -> None:
+        Model.__request.identity_map    = {}
+        Model.__request.shallow_map     = {}
+        Model.__request.counters        = {'saved' : 0, 'issued' : 0}
+
+    def end_request() -> None:
+        if getattr(Model.__request, 'identity_map', None) is None:
+            return
+        counters : dict = Model.__request.counters
+        logging.debug(f'IDENTITY MAP : {counters["saved"]} reads saved, {counters["issued"]} reads issued')
+        Model.__request.identity_map = None
+        Model.__request.shallow_map  = None
+
+    def saved_reads() -> int:
+        return getattr(Model.__request, 'counters', {}).get('saved', 0)
+
+    def __count( counter : str, amount : int = 1 ) -> None:
+        counters : dict | None = getattr(Model.__request, 'counters', None)
+        if counters is not None and getattr(Model.__request, 'identity_map', None) is not None:
+            counters[counter] += amount
+
+
+    def parallel( calls : list[Callable], timeout : float = None ) -> list:
+        state : dict = dict(Model.__request.__dict__)
+
+        def bind( call : Callable ) -> Callable:
+            def run():
+                previous : dict = dict(Model.__request.__dict__)
+                Model.__request.__dict__.update(state)
+                try:
+                    return call()
+                finally:
+                    Model.__request.__dict__.clear()
+                    Model.__request.__dict__.update(previous)
+            return run
+
+        return Storage.gather([bind(call) for call in calls], timeout)
+
+
+    def __lookup( identity_map : dict, path : str ) -> tuple[bool, object]:
+        if path in identity_map:
+            return True, identity_map[path]
+
+        segments : list[str] = path.split('/') if path else []
+
+        for depth in range(len(segments) - 1, -1, -1):
+            ancestor : str = '/'.join(segments[:depth])
+            if ancestor not in identity_map:
+                continue
+
+            value = identity_map[ancestor]
+            for segment in segments[depth:]:
+                if isinstance(value, dict):
+                    value = value.get(segment)
+                elif isinstance(value, list) and segment.isdigit() and int(segment) < len(value):
+                    value = value[int(segment)]
+                else:
+                    value = None
+                if value is None:
+                    break
+            return True, value
+
+        return False, None
+
+    def __shallow( value ):
+        if isinstance(value, dict):
+            return {key : True for key in value}
+        if isinstance(value, list):
+            return {str(index) : True for index, item in enumerate(value) if item is not None}
+        return value
+
+    def __cached( path : str, shallow : bool ) -> tuple[bool, object]:
+        identity_map : dict | None = getattr(Model.__request, 'identity_map', None)
+
+        if identity_map is None:
+            return False, None
+
+        found, value = Model.__lookup(identity_map, path)
+        if found:
+            return True, Model.__shallow(value) if shallow else copy.deepcopy(value)
+
+        if shallow and path in Model.__request.shallow_map:
+            return True, copy.deepcopy(Model.__request.shallow_map[path])
+
+        return False, None
+
+    def __store( path : str, value, shallow : bool ) -> None:
+        if getattr(Model.__request, 'identity_map', None) is None:
+            return
+
+        cache : dict = Model.__request.shallow_map if shallow else Model.__request.identity_map
+        cache[path] = copy.deepcopy(value)
+
+    def __fetch( path : str, shallow : bool = False ):
+        return Storage.reference(f'/{path}').get(shallow = shallow)
+
+    def read( path : str, shallow : bool = False ):
+        path : str = Model.normalize(path)
+
+        found, value = Model.__cached(path, shallow)
+        if found:
+            Model.__count('saved')
+            return value
+
+        value = Model.__fetch(path, shallow)
+        Model.__count('issued')
+        Model.__store(path, value, shallow)
+        return value
+
+    def read_many( paths : list[str], shallow : bool = False ) -> list:
+        paths   : list[str] = [Model.normalize(path) for path in paths]
+        values  : dict      = {}
+        missing : list[str] = []
+
+        for path in dict.fromkeys(paths):
+            found, value = Model.__cached(path, shallow)
+            if found:
+                values[path] = value
+                Model.__count('saved')
+            else:
+                missing.append(path)
+
+        if missing:
+            fetched : list = Storage.gather([lambda path = path : Model.__fetch(path, shallow) for path in missing])
+
+            for path, value in zip(missing, fetched):
+                values[path] = value
+                Model.__store(path, value, shallow)
+            Model.__count('issued', len(missing))
+
+        return [copy.deepcopy(values[path]) for path in paths]
+
+    def invalidate( path : str ) -> None:
+        path : str = Model.normalize(path)
+
+        for cache in ( getattr(Model.__request, 'identity_map', None), getattr(Model.__request, 'shallow_map', None) ):
+            if not cache:
+                continue
+
+            for cached_path in list(cache):
+                if (
+                    cached_path == path
+                    or cached_path.startswith(f'{path}/')
+                    or path.startswith(f'{cached_path}/')
+                    or cached_path == ''
+                ):
+                    del cache[cached_path]
+
+    def on_rollback( callback : Callable ) -> bool:
+        unit : Model.UnitOfWork = Model.UnitOfWork.current()
+
+        if unit is None:
+            return False
+
+        unit.on_rollback(callback)
+        return True
+
+    def on_commit( callback : Callable ) -> None:
+        unit : Model.UnitOfWork = Model.UnitOfWork.current()
+
+        if unit is None:
+            callback()
+            return
+
+        unit.on_commit(callback)
+
+    def generate_key() -> str:
+        return Storage.generate_key()
+
+    def apply( changes : dict ) -> None:
+        if not changes:
+            return
+
+        Storage.reference('/').update(changes)
+        for path in changes:
+            Model.invalidate(path)
+
+    def write( path : str, value ) -> None:
+        path : str              = Model.normalize(path)
+        unit : Model.UnitOfWork = Model.UnitOfWork.current()
+
+        if unit is not None:
+            unit.stage(path, value)
+            return
+
+        Storage.reference(f'/{path}').set(value)
+        Model.invalidate(path)
+
+    def remove( path : str ) -> None:
+        path : str              = Model.normalize(path)
+        unit : Model.UnitOfWork = Model.UnitOfWork.current()
+
+        if unit is not None:
+            unit.stage(path, None)
+            return
+
+        Storage.reference(f'/{path}').delete()
+        Model.invalidate(path)
+
+    def push( table : str, value ) -> str:
+        table   : str               = Model.normalize(table)
+        unit    : Model.UnitOfWork  = Model.UnitOfWork.current()
+
+        if unit is not None:
+            key : str = Model.generate_key()
+            unit.stage(f'{table}/{key}', value)
+            return key
+
+        key : str = Storage.reference(f'/{table}').push(value).key
+        Model.invalidate(table)
+        return key
+
 
     def get( self ) -> dict:
-        return self.reference.get()
-    
+        return Model.read(self.path)
+
     def exist( self ) -> bool:
-        if self.reference.get():
+        if Model.read(self.path, shallow = True):
             return True
-        return False
\ No newline at end of file
+        return False
+
+    def get_fields( self, *names : str ) -> dict:
+        values : list = Model.read_many([f'{self.path}/{name}' for name in names])
+        return dict(zip(names, values))
+
+    @classmethod
+    def get_many( cls, ids : list[str], *fields : str ) -> list[dict | None]:
+        if not fields:
+            return Model.read_many([f'{cls.BASE_TABLE}/{id}' for id in ids])
+
+        values  : list          = Model.read_many([f'{cls.BASE_TABLE}/{id}/{field}' for id in ids for field in fields])
+        records : list[dict]    = []
+
+        for index in range(len(ids)):
+            record : dict = dict(zip(fields, values[index * len(fields) : (index + 1) * len(fields)]))
+            records.append(record if any(value is not None for value in record.values()) else None)
+
+        return records
+
+    def get_child( self, name : str ):
+        return Model.read(f'{self.path}/{name}')
+
+    def set_child( self, name : str, value ) -> None:
+        Model.write(f'{self.path}/{name}', value)
+
+    def delete_child( self, name : str ) -> None:
+        Model.remove(f'{self.path}/{name}')
+
+    def update( self, data : dict ) -> None:
+        if Model.UnitOfWork.current() is not None:
+            for name, value in data.items():
+                Model.write(f'{self.path}/{name}', value)
+            return
+
+        self.reference.update(data)
+        Model.invalidate(self.path)
@@ -24,8 +24,6 @@ class Organization(Model):
             description     : str   = None
         ):
 
-        reference : db.Reference = db.reference(Organization.BASE_TABLE)
-
         organization_data : dict = {
             'max_occupancy' : max_occupancy,
             'occupancy'     : 0,
@@ -38,22 +36,23 @@ class Organization(Model):
         }
 
         
-        organization_ref    : db.Reference = reference.push(organization_data)
-        organization        : Organization = Organization( organization_ref.key )
-        
-        if street and postalcode and city and province and country:
-            organization.set_address( street, postalcode, city, province, country, apt )
+        with Organization.UnitOfWork():
+            organization_id     : str          = Organization.push(Organization.BASE_TABLE, organization_data)
+            organization        : Organization = Organization( organization_id )
+            
+            if street and postalcode and city and province and country:
+                organization.set_address( street, postalcode, city, province, country, apt )
 
         return organization
     
 
     def set_occupancy(self, occupancy : int):
 
-        self.reference.child('occupancy').set(occupancy)
+        self.set_child('occupancy', occupancy)
 
     def get_occupancy(self) -> int:
 
-        return self.reference.child('occupancy').get()
+        return self.get_child('occupancy')
     
 
     def set_address( self, street : str, postalcode : str, city : str, province : str, country : str, apt : str = None ):
@@ -74,6 +73,6 @@ class Organization(Model):
         except Exception as e:
             logging.error(str(e))
             
-        self.reference.child('address').set(address_data)
+        self.set_child('address', address_data)
 
         
\ No newline at end of file
@@ -2,13 +2,24 @@ from    __future__      import annotations
 from    firebase_admin  import db
 from    datetime        import datetime
 from    models          import Model
+from    storage         import Storage
+import  hashlib
 import  enum
 class Post(Model):
 
 
     BASE_TABLE : str = 'posts/posts'
-    AUTHOR_TABLE = 'posts/authors'
-    PUBLIC_TABLE = 'posts/public'
+    AUTHOR_TABLE        = 'posts/authors'
+    REPLY_AUTHOR_TABLE  = 'posts/reply_authors'
+    PUBLIC_TABLE        = 'posts/public'
+    STALE_TABLE         = 'posts/stale_authors'
+    DELETE_TABLE        = 'posts/pending_deletes'
+    LIKE_TABLE          = 'posts/likes'
+    PREVIEW_TABLE       = 'posts/previews'
+
+    MAX_INLINE_DELETE   : int = 200
+    LIKE_SHARDS         : int = 8
+    PREVIEW_LENGTH      : int = 280
 
     class PostVisibility(enum.Enum):
         SUBSCRIBERS_ONLY    = 'subscribers'
@@ -26,25 +37,19 @@ class Post(Model):
         super().__init__(id, Post.BASE_TABLE)
 
     def __add_public_reference( post_id : str , creation_time : str):
-        reference : db.Reference = db.reference(Post.PUBLIC_TABLE).child(post_id)
-        reference.set(creation_time)
+        Post.write(f'{Post.PUBLIC_TABLE}/{post_id}', creation_time)
     def __remove_public_reference( post_id : str ):
-        reference : db.Reference = db.reference(Post.PUBLIC_TABLE).child(post_id)
-        reference.delete()
+        Post.remove(f'{Post.PUBLIC_TABLE}/{post_id}')
 
     def __add_author_reference( author : str, post_id : str , creation_time : str):
-        reference : db.Reference = db.reference(Post.AUTHOR_TABLE).child(author).child(post_id)
-        reference.set(creation_time)
+        Post.write(f'{Post.AUTHOR_TABLE}/{author}/{post_id}', creation_time)
     def __remove_author_reference( author : str, post_id : str ):
-        reference : db.Reference = db.reference(Post.AUTHOR_TABLE).child(author).child(post_id)
-        reference.delete()
+        Post.remove(f'{Post.AUTHOR_TABLE}/{author}/{post_id}')
 
 
 
-    def create( author : str, content : dict, visibility : Post.PostVisibility, parent_id : str = None) -> Post:
-        reference = db.reference(Post.BASE_TABLE)
-
-        creation_time : str = datetime.now().isoformat()
+    def create( author : str, content : dict, visibility : Post.PostVisibility, parent_id : str = None, created_at : str = None, author_summary : dict = None) -> Post:
+        creation_time : str = created_at or datetime.now().isoformat()
 
         post_data = {
             'created_at'    : creation_time,
@@ -52,105 +57,294 @@ class Post(Model):
             'parent_id'     : parent_id,
             'content'       : content,
             'author'        : author,
-            'likes'         : []
-            
+            'author_summary': author_summary
         }
 
-        post = reference.push(post_data)
+        with Post.UnitOfWork():
+            post_id : str = Post.push(Post.BASE_TABLE, post_data)
+            Post.write(f'{Post.PREVIEW_TABLE}/{post_id}', Post.preview(post_data))
 
-        if not parent_id:
-            Post.__add_author_reference( author, post.key, creation_time)
+            if not parent_id:
+                Post.__add_author_reference( author, post_id, creation_time)
+            else:
+                Post.write(f'{Post.REPLY_AUTHOR_TABLE}/{author}/{post_id}', creation_time)
 
-        if visibility == Post.PostVisibility.ALL:
-            Post.__add_public_reference( post.key , creation_time)
+            if visibility == Post.PostVisibility.ALL:
+                Post.__add_public_reference( post_id , creation_time)
 
-        return Post( post.key )
+        return Post( post_id )
     
 
-    def __delete( post_id : str ):
+    def __collect( post_id : str, limit : int = None ) -> tuple[dict, bool]:
+
+        thread  : dict      = {}
+        level   : list[str] = [post_id]
+
+        while level:
+            if limit is not None and len(thread) + len(level) > limit:
+                level = level[:limit - len(thread)]
+                if level:
+                    thread.update( (id, post) for id, post in zip(level, Post.read_many([f'{Post.BASE_TABLE}/{id}' for id in level])) if post )
+                return thread, False
+
+            posts       : list      = Post.read_many([f'{Post.BASE_TABLE}/{id}' for id in level])
+            next_level  : list[str] = []
+
+            for id, post in zip(level, posts):
+                if not post or id in thread:
+                    continue
+                thread[id] = post
+                next_level.extend(post.get('replies') or {})
+
+            level = next_level
+
+        return thread, True
 
-        post_reference  : db.Reference  = db.reference(f'/{Post.BASE_TABLE}/{post_id}')
-        post            : dict | None   = post_reference.get()
+    def __thread_changes( thread : dict ) -> dict:
 
+        changes : dict = {}
+
+        for id, post in thread.items():
+            changes[f'{Post.BASE_TABLE}/{id}']                      = None
+            changes[f'{Post.REPLY_AUTHOR_TABLE if post.get("parent_id") else Post.AUTHOR_TABLE}/{post["author"]}/{id}'] = None
+            if post.get('visibility') == Post.PostVisibility.ALL.value:
+                changes[f'{Post.PUBLIC_TABLE}/{id}']                = None
+            changes[f'{Post.LIKE_TABLE}/{id}']                      = None
+            changes[f'{Post.PREVIEW_TABLE}/{id}']                   = None
+
+        return changes
+
+    def __delete( post_id : str ):
+
+        post            : dict | None   = Post.read(f'{Post.BASE_TABLE}/{post_id}')
 
-        visibility : Post.PostVisibility = Post.PostVisibility(post['visibility'])
-        author : str = post['author']
         if not post:
-            raise Post.PostError.PostNotFound()
+            raise Post.PostError.PostNotFound('Post not found')
 
         parent_id       : str   | None  = post.get('parent_id')
-        replies         : dict  | None  = post.get('replies')
+        thread, complete                = Post.__collect( post_id, Post.MAX_INLINE_DELETE )
+        changes         : dict          = Post.__thread_changes( thread )
+
+        if not complete:
+            for id in thread:
+                del changes[f'{Post.BASE_TABLE}/{id}']
+            changes[f'{Post.BASE_TABLE}/{post_id}/deleted'] = True
+            changes[f'{Post.DELETE_TABLE}/{post_id}'] = True
+
+        with Post.UnitOfWork():
+            if parent_id:
+                Post.remove(f'{Post.BASE_TABLE}/{parent_id}/replies/{post_id}')
+
+            for path, value in changes.items():
+                Post.write(path, value)
 
         if parent_id:
-            parent_reference = db.reference(f'/{Post.BASE_TABLE}/{parent_id}/replies/{post_id}')
-            parent_reference.delete()
-        
-        if replies:
-            for reply_post in replies:
-                Post.__delete( reply_post )
-        
-        if visibility == Post.PostVisibility.ALL:
-            Post.__remove_public_reference( post_id )
-        
-        Post.__remove_author_reference( author, post_id )
-        post_reference.delete()
+            Post( parent_id ).count_reply( -1 )
 
     def delete ( self ):
         
         Post.__delete( self.id )
 
+    def purge_deleted() -> int:
+
+        pending : list[str] = list(Post.read(Post.DELETE_TABLE, shallow = True) or {})
+        count   : int       = 0
+
+        for post_id in pending:
+            thread, _ = Post.__collect( post_id )
+
+            with Post.UnitOfWork():
+                for path, value in Post.__thread_changes( thread ).items():
+                    Post.write(path, value)
+                Post.remove(f'{Post.DELETE_TABLE}/{post_id}')
+
+            count += len(thread)
+
+        return count
+
     def reply( self, reply_id : str ):
 
-        reply_reference : db.Reference = self.reference.child('replies').child(reply_id)
-        reply_reference.set(True)
+        self.set_child(f'replies/{reply_id}', True)
 
     def remove_reply ( self, reply_id : str ):
         
-        reply_reference = self.reference.child('replies').child(reply_id)
-
-        if not reply_reference.get():
+        if not self.get_child(f'replies/{reply_id}'):
             raise Post.PostError.ReplyNotFound()
         
-        reply_reference.delete()
+        self.delete_child(f'replies/{reply_id}')
+        self.count_reply( -1 )
+
+    def count_reply( self, amount : int = 1 ):
+
+        path : str = f'{Post.PREVIEW_TABLE}/{self.id}/reply_count'
+        Storage.reference(f'/{path}').transaction(lambda count : max((count or 0) + amount, 0) or None)
+        Post.invalidate(path)
+
+    def preview( post_data : dict ) -> dict:
+
+        content     : dict  = {}
+        truncated   : bool  = False
+
+        for key, value in (post_data.get('content') or {}).items():
+            if isinstance(value, str) and len(value) > Post.PREVIEW_LENGTH:
+                value, truncated = value[:Post.PREVIEW_LENGTH], True
+            elif isinstance(value, (dict, list)):
+                truncated = True
+                continue
+            content[key] = value
+
+        return {
+            'author'        : post_data.get('author'),
+            'author_summary': post_data.get('author_summary'),
+            'created_at'    : post_data.get('created_at'),
+            'visibility'    : post_data.get('visibility'),
+            'parent_id'     : post_data.get('parent_id'),
+            'content'       : content,
+            'truncated'     : truncated
+        }
 
-    def like( self, user_id : str ):
+    def get_previews( post_ids : list[str], user_id : str ) -> list[dict | None]:
+
+        count   : int   = len(post_ids)
+        values  : list  = Post.read_many(
+            [f'{Post.PREVIEW_TABLE}/{post_id}' for post_id in post_ids] +
+            [f'{Post.LIKE_TABLE}/{post_id}/{user_id}' for post_id in post_ids]
+        )
+        stored   : list = [value or {} for value in values[:count]]
+        previews : list = [dict(value) if value.get('created_at') else None for value in stored]
+
+        missing : list[int] = [index for index, preview in enumerate(previews) if preview is None]
+        if missing:
+            posts : list = Post.get_many([post_ids[index] for index in missing])
+            for index, post_data in zip(missing, posts):
+                previews[index] = Post.preview(post_data) if post_data and not post_data.get('deleted') else None
+
+        for index, preview in enumerate(previews):
+            if preview is None:
+                continue
+            preview.pop('like_shards', None)
+            preview['id']           = post_ids[index]
+            preview['like_count']   = Post.__sum_shards(stored[index].get('like_shards'))
+            preview['liked_by_me']  = bool(values[count + index])
+            preview['reply_count']  = stored[index].get('reply_count') or 0
 
-        like_reference : db.Reference = self.reference.child('likes').child(user_id)
+        return previews
 
-        if like_reference.get():
+    def backfill_previews() -> int:
+
+        posts           : dict  = Post.read(Post.BASE_TABLE) or {}
+        previews        : dict  = Post.read(Post.PREVIEW_TABLE) or {}
+        count           : int   = 0
+
+        with Post.UnitOfWork():
+            for post_id, post_data in posts.items():
+                if not isinstance(post_data, dict) or post_data.get('deleted'):
+                    continue
+
+                current : dict = previews.get(post_id) or {}
+                preview : dict = Post.preview(post_data)
+
+                preview['like_shards']  = current.get('like_shards')
+                preview['reply_count']  = current.get('reply_count') or len(post_data.get('replies') or {}) or None
+                Post.write(f'{Post.PREVIEW_TABLE}/{post_id}', preview)
+                count += 1
+
+        return count
+
+    def __shard( user_id : str ) -> int:
+        return int(hashlib.md5(user_id.encode()).hexdigest(), 16) % Post.LIKE_SHARDS
+
+    def __set_like( self, user_id : str, liked : bool ) -> bool:
+        if not self.exist():
+            raise Post.PostError.PostNotFound('Post not found')
+
+        changed : dict = {'value' : False}
+
+        def toggle( current ):
+            changed['value'] = bool(current) != liked
+            return True if liked else None
+
+        Storage.reference(f'/{Post.LIKE_TABLE}/{self.id}/{user_id}').transaction(toggle)
+        Post.invalidate(f'{Post.LIKE_TABLE}/{self.id}/{user_id}')
+
+        if not changed['value']:
+            return False
+
+        shard : str = f'{Post.PREVIEW_TABLE}/{self.id}/like_shards/{Post.__shard(user_id)}'
+        Storage.reference(f'/{shard}').transaction(lambda count : max((count or 0) + (1 if liked else -1), 0))
+        Post.invalidate(shard)
+        return True
+
+    def like( self, user_id : str ):
+
+        if not self.__set_like( user_id, True ):
             raise Post.PostError.PostAlreadyLiked()
-        
-        like_reference.set(True)
 
 
     def remove_like( self, user_id : str):
 
-        like_reference : db.Reference = self.reference.child('likes').child(user_id)
-
-        if not like_reference.get():
+        if not self.__set_like( user_id, False ):
             raise Post.PostError.PostWasNotLiked()
-        
-        like_reference.delete()
+
+    def __sum_shards( shards ) -> int:
+        if isinstance(shards, dict):
+            shards = list(shards.values())
+        if isinstance(shards, list):
+            return sum(count for count in shards if isinstance(count, int))
+        return 0
 
     def get_replies( self ) -> dict | None :
 
-        replies_reference = self.reference.child('replies')
-        return replies_reference.get()
+        return self.get_child('replies')
     
     def get_parent( self ) -> str | None :
 
-        parent_reference = self.reference.child('parent_id')
-        return parent_reference.get()
+        return self.get_child('parent_id')
     
     def get_author( self ) -> str :
         
-        author_reference = self.reference.child('author')
-        return author_reference.get()
+        return self.get_child('author')
     
 
-    def get_posts ( user_id : str ) -> list[dict]:
+    def __get_index( table : str, before : str = None, limit : int = None ) -> dict:
+        query = Storage.reference(f'/{table}').order_by_value()
+
+        if before is not None:
+            query = query.end_at(before)
+        if limit is not None:
+            query = query.limit_to_last(limit)
+
+        return dict(query.get() or {})
+
+    def set_author_summary( author : str, author_summary : dict ) -> int:
+
+        posts, replies  = Post.read_many([f'{Post.AUTHOR_TABLE}/{author}', f'{Post.REPLY_AUTHOR_TABLE}/{author}'], shallow = True)
+        post_ids : list = list(posts or {}) + list(replies or {})
+
+        with Post.UnitOfWork():
+            for post_id in post_ids:
+                Post.write(f'{Post.BASE_TABLE}/{post_id}/author_summary', author_summary)
+                Post.write(f'{Post.PREVIEW_TABLE}/{post_id}/author_summary', author_summary)
+            Post.remove(f'{Post.STALE_TABLE}/{author}')
+
+        return len(post_ids)
+
+    def mark_author_stale( author : str ):
+        Post.write(f'{Post.STALE_TABLE}/{author}', True)
+
+    def get_stale_authors() -> list[str]:
+        return list(Post.read(Post.STALE_TABLE, shallow = True) or {})
+
+    def get_authors() -> list[str]:
+        posts, replies = Post.read_many([Post.AUTHOR_TABLE, Post.REPLY_AUTHOR_TABLE], shallow = True)
+        return list(dict.fromkeys( list(posts or {}) + list(replies or {}) ))
+
+    def get_posts ( user_id : str, before : str = None, limit : int = None ) -> dict:
+
+        if before is not None or limit is not None:
+            return Post.__get_index(f'{Post.AUTHOR_TABLE}/{user_id}', before, limit)
         
-        posts : dict = db.reference(Post.AUTHOR_TABLE).child(user_id).get()
+        posts : dict = Post.read(f'{Post.AUTHOR_TABLE}/{user_id}')
 
         if not posts:
             return {}
@@ -158,8 +352,6 @@ class Post(Model):
         return posts
 
     
-    def get_public_posts () -> list[dict]:
+    def get_public_posts ( before : str = None, limit : int = None ) -> dict:
         
-        posts : dict = db.reference(Post.PUBLIC_TABLE).get()
-        
-        return posts
+        return Post.__get_index(Post.PUBLIC_TABLE, before, limit)
@@ -1,6 +1,7 @@
 from    __future__      import annotations
 from    firebase_admin  import db
 from    models.user     import User
+from    models.ledger   import Ledger
 from    datetime        import datetime
 
 
@@ -21,7 +22,6 @@ class Receiver(User):
         if not Receiver._validate_dob_format( dob ):
             raise Receiver.UserError.InvalidDateOfBirthFormat()
         
-        reference = db.reference(Receiver.BASE_TABLE)
         receiver_data = {
             'id_document_file'  : '',
             'id_picture_file'   : '',
@@ -29,57 +29,36 @@ class Receiver(User):
             'creation_date'     : datetime.now().isoformat(),
             'first_name'        : first_name,
             'last_name'         : last_name,
-            'balance'           : 0.00,
             'email'             : '',
             'dob'               : dob,
         }
 
-        receiver = reference.push(receiver_data)
-        return Receiver( receiver.key )
+        receiver_id = Receiver.push(Receiver.BASE_TABLE, receiver_data)
+        return Receiver( receiver_id )
     
     def set_email ( self, email : str ):
         COLUMN : str = 'email'
         if not Receiver._validate_email_format( email ):
             raise Receiver.UserError.InvalidEmailFormat()
-        reference   : db.Reference  = self.reference.child(COLUMN)
-        reference.set( email )
+        self.set_child( COLUMN, email )
         
-    def deposit ( self, amount : float ) -> float:
-        COLUMN      : str           = 'balance'
-        reference   : db.Reference  = self.reference.child(COLUMN)
-        balance     : float         = float(reference.get())
+    def deposit ( self, amount : float, reference : str = None ) -> str:
+        return Ledger( self.id ).credit( amount, reference )
 
-        updated_balance = balance + abs(amount)
-
-        if updated_balance < 0.00:
+    def withdraw ( self, amount : float, reference : str = None ) -> str:
+        try:
+            return Ledger( self.id ).debit( amount, reference )
+        except Ledger.LedgerError.InsufficientFunds:
             raise Receiver.ReceiverError.InsufficientFunds()
 
-        reference.set(updated_balance)
-        return updated_balance
-
-    def withdraw ( self, amount : float ) -> float:
-        COLUMN      : str           = 'balance'
-        reference   : db.Reference  = self.reference.child(COLUMN)
-        balance     : float         = float(reference.get())
-
-        updated_balance = balance - abs(amount)
-
-        if updated_balance < 0.00:
-            raise Receiver.ReceiverError.InsufficientFunds()
-
-        reference.set(updated_balance)
-
     def get_balance ( self ) -> float:
-        COLUMN      : str           = 'balance'
-        reference   : db.Reference  = self.reference.child(COLUMN)
-        balance     : float         = float(reference.get())
-        return balance
+        return Ledger( self.id ).get_balance()
     
 
     def has_app ( self ) -> bool:
-        return self.reference.child('has_app_access').get()
+        return self.get_child('has_app_access')
     
     def set_app ( self ) -> None:
-        self.reference.child('has_app_access').set(True)
+        self.set_child('has_app_access', True)
 
 
@@ -0,0 +1,177 @@
+from    __future__      import annotations
+from    models          import Model
+from    storage         import Storage
+from    datetime        import datetime
+import  time
+
+
+class Rollup(Model):
+
+    BASE_TABLE      : str   = 'rollups'
+    REBUILD_TABLE   : str   = 'rollup_rebuild'
+    PENDING_TABLE   : str   = 'rollup_pending'
+    SCAN_CHUNK      : int   = 1000
+    WRITE_CHUNK     : int   = 100
+    DRAIN_GRACE     : float = 5
+
+    class RollupError(Exception):
+        class InvalidPeriod (Exception) : pass
+        class InvalidKey    (Exception) : pass
+
+    class Period:
+        DAILY   : str = 'daily'
+        MONTHLY : str = 'monthly'
+
+    PERIOD_LENGTHS : dict = { Period.DAILY : 10, Period.MONTHLY : 7 }
+    PERIOD_FORMATS : dict = { Period.DAILY : '%Y-%m-%d', Period.MONTHLY : '%Y-%m' }
+
+    def __init__(self, id : str):
+        super().__init__(id, Rollup.BASE_TABLE)
+
+    def metrics( transaction_data : dict ) -> list[tuple[str, str]]:
+        transaction_type    : str           = transaction_data.get('type')
+        metrics             : list[tuple]   = []
+
+        if transaction_data.get('receiver_id'):
+            metrics.append( (transaction_data['receiver_id'], f'{transaction_type}_in') )
+        if transaction_data.get('sender_id'):
+            metrics.append( (transaction_data['sender_id'], f'{transaction_type}_out') )
+
+        return metrics
+
+    def buckets( creation_date : str ) -> list[tuple[str, str]]:
+        return [ (period, creation_date[:length]) for period, length in Rollup.PERIOD_LENGTHS.items() ]
+
+    def record( transaction_id : str, transaction_data : dict ) -> None:
+        state : dict = Storage.reference(f'/{Rollup.REBUILD_TABLE}').get() or {}
+
+        if state.get('running'):
+            Storage.reference(f'/{Rollup.PENDING_TABLE}/{transaction_id}').set(transaction_data)
+            return
+
+        Rollup.__increment( transaction_data, state.get('generation', 0) )
+
+    def __increment( transaction_data : dict, generation : int ) -> None:
+        amount : float = round(float(transaction_data.get('amount') or 0), 2)
+
+        def increment( metric : str ):
+            def apply( bucket ):
+                bucket  : dict = bucket or {}
+                if bucket.get('generation', 0) > generation:
+                    # Written by a rebuild that started after this increment was read, and so already counted it
+                    return bucket
+                total   : dict = bucket.get(metric) or {'amount' : 0, 'count' : 0}
+                bucket[metric] = {'amount' : round(total['amount'] + amount, 2), 'count' : total['count'] + 1}
+                return bucket
+            return apply
+
+        paths : list = [
+            (f'{Rollup.BASE_TABLE}/{user_id}/{period}/{key}', metric)
+            for user_id, metric in Rollup.metrics( transaction_data )
+            for period, key in Rollup.buckets( transaction_data['creation_date'] )
+        ]
+
+        Storage.gather([
+            lambda path = path, metric = metric : Storage.reference(f'/{path}').transaction( increment(metric) )
+            for path, metric in paths
+        ])
+
+        for path, _ in paths:
+            Rollup.invalidate(path)
+
+    def get_bucket( self, period : str, key : str = None ) -> dict:
+        if period not in Rollup.PERIOD_LENGTHS:
+            raise Rollup.RollupError.InvalidPeriod(f'Invalid period : {period}')
+
+        key : str = key or datetime.now().isoformat()[:Rollup.PERIOD_LENGTHS[period]]
+
+        try:
+            datetime.strptime(key, Rollup.PERIOD_FORMATS[period])
+        except ValueError:
+            raise Rollup.RollupError.InvalidKey(f'Invalid {period} key : {key}')
+
+        metrics : dict = self.get_child(f'{period}/{key}') or {}
+        metrics.pop('generation', None)
+
+        return { 'period' : period, 'key' : key, 'metrics' : metrics }
+
+    def scan_transactions( table : str ):
+        last_key : str | None = None
+
+        while True:
+            query = Storage.reference(f'/{table}').order_by_key()
+            if last_key is not None:
+                query = query.start_at(last_key)
+
+            chunk : dict = query.limit_to_first(Rollup.SCAN_CHUNK + (last_key is not None)).get() or {}
+
+            for transaction_id, transaction_data in chunk.items():
+                if transaction_id != last_key:
+                    yield transaction_id, transaction_data
+
+            if len(chunk) < Rollup.SCAN_CHUNK + (last_key is not None):
+                return
+            last_key = next(reversed(chunk))
+
+    def __start() -> int:
+        def apply( state ):
+            state : dict = state or {}
+            return { 'generation' : state.get('generation', 0) + 1, 'running' : datetime.now().isoformat() }
+
+        return Storage.reference(f'/{Rollup.REBUILD_TABLE}').transaction( apply )['generation']
+
+    def __write( rollups : dict, existing : list[str] ) -> None:
+        stale : list[str] = [ user_id for user_id in existing if user_id not in rollups ]
+        users : list[str] = list(rollups)
+
+        for start in range(0, len(stale), Rollup.WRITE_CHUNK):
+            with Rollup.UnitOfWork():
+                for user_id in stale[start:start + Rollup.WRITE_CHUNK]:
+                    Rollup.remove(f'{Rollup.BASE_TABLE}/{user_id}')
+
+        for start in range(0, len(users), Rollup.WRITE_CHUNK):
+            with Rollup.UnitOfWork():
+                for user_id in users[start:start + Rollup.WRITE_CHUNK]:
+                    Rollup.write(f'{Rollup.BASE_TABLE}/{user_id}', rollups[user_id])
+
+    def __drain( scanned : set[str], generation : int ) -> int:
+        count : int = 0
+
+        while pending := Storage.reference(f'/{Rollup.PENDING_TABLE}').get() or {}:
+            for transaction_id, transaction_data in pending.items():
+                if transaction_id not in scanned:
+                    Rollup.__increment( transaction_data, generation )
+                    count += 1
+                Storage.reference(f'/{Rollup.PENDING_TABLE}/{transaction_id}').delete()
+
+        return count
+
+    def rebuild( table : str ) -> int:
+        rollups     : dict      = {}
+        scanned     : set[str]  = set()
+        generation  : int       = Rollup.__start()
+
+        try:
+            for transaction_id, transaction_data in Rollup.scan_transactions( table ):
+                if not isinstance(transaction_data, dict) or not transaction_data.get('confirmed') or not transaction_data.get('creation_date'):
+                    continue
+
+                amount : float = round(float(transaction_data.get('amount') or 0), 2)
+
+                for user_id, metric in Rollup.metrics( transaction_data ):
+                    for period, key in Rollup.buckets( transaction_data['creation_date'] ):
+                        bucket  : dict = rollups.setdefault(user_id, {}).setdefault(period, {}).setdefault(key, {'generation' : generation})
+                        total   : dict = bucket.setdefault(metric, {'amount' : 0, 'count' : 0})
+                        total['amount'] = round(total['amount'] + amount, 2)
+                        total['count'] += 1
+                scanned.add(transaction_id)
+
+            Rollup.__write( rollups, list(Rollup.read(Rollup.BASE_TABLE, shallow = True) or {}) )
+            Rollup.__drain( scanned, generation )
+        finally:
+            Storage.reference(f'/{Rollup.REBUILD_TABLE}/running').delete()
+
+        time.sleep(Rollup.DRAIN_GRACE)
+        Rollup.__drain( scanned, generation )
+
+        return len(scanned)
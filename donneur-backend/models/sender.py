@@ -29,7 +29,6 @@ class Sender(User):
         if not Sender._validate_email_format( email ):
             raise Sender.UserError.InvalidEmailFormat()
         
-        reference = db.reference(Sender.BASE_TABLE)
         sender_data = {
             'is_anonymous'  : False,
             'created_at'    : datetime.now().isoformat(),
@@ -38,14 +37,12 @@ class Sender(User):
             'email'         : email
         }
 
-        sender = reference.push(sender_data)
-        return sender.key
+        return Sender.push(Sender.BASE_TABLE, sender_data)
     
     def create_anonymous( name : str, stripe_address : dict ) -> str:
 
         address = Sender.__format_address( stripe_address )
 
-        reference = db.reference(Sender.BASE_TABLE)
         sender_data = {
             'is_anonymous'  : True,
             'created_at'    : datetime.now().isoformat(),
@@ -53,7 +50,6 @@ class Sender(User):
             'name'          : name
         }
 
-        sender = reference.push(sender_data)
-        return sender.key
+        return Sender.push(Sender.BASE_TABLE, sender_data)
 
         
\ No newline at end of file
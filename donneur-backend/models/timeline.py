@@ -0,0 +1,86 @@
+from    __future__      import annotations
+from    models          import Model
+from    storage         import Storage
+import  random
+
+
+class Timeline(Model):
+
+    BASE_TABLE  : str = 'timelines/entries'
+    PULL_TABLE  : str = 'timelines/pull_authors'
+    MAX_ENTRIES : int = 500
+    TRIM_EVERY  : int = 50
+
+    def __init__(self, id : str):
+        super().__init__(id, Timeline.BASE_TABLE)
+
+    def fan_out( post_id : str, created_at : str, followers : list[str] ) -> None:
+        with Timeline.UnitOfWork():
+            for follower in followers:
+                Timeline.write(f'{Timeline.BASE_TABLE}/{follower}/{post_id}', created_at)
+            Timeline.on_commit( lambda : Timeline.trim_sampled( followers ) )
+
+    def trim_sampled( followers : list[str] ) -> int:
+        sampled : list[str] = [follower for follower in followers if random.randrange(Timeline.TRIM_EVERY) == 0]
+
+        if not sampled:
+            return 0
+
+        return sum(Storage.gather([lambda follower = follower : Timeline( follower ).trim() for follower in sampled]))
+
+    def backfill( self, entries : dict ) -> None:
+        with Timeline.UnitOfWork():
+            for post_id, created_at in entries.items():
+                self.set_child(post_id, created_at)
+            Timeline.on_commit( self.trim )
+
+    def forget( self, post_ids : list[str] ) -> None:
+        with Timeline.UnitOfWork():
+            for post_id in post_ids:
+                self.delete_child(post_id)
+
+    def retract( post_id : str, followers : list[str] ) -> None:
+        with Timeline.UnitOfWork():
+            for follower in followers:
+                Timeline.remove(f'{Timeline.BASE_TABLE}/{follower}/{post_id}')
+
+    def get_entries( self, limit : int = None, before : str = None ) -> dict:
+        query = Storage.reference(self.path).order_by_value()
+
+        if before is not None:
+            query = query.end_at(before)
+
+        entries = query.limit_to_last(limit or Timeline.MAX_ENTRIES).get()
+
+        if not entries:
+            return {}
+
+        return dict(entries)
+
+    def trim( self ) -> int:
+        kept : dict = self.get_entries()
+
+        if len(kept) < Timeline.MAX_ENTRIES:
+            return 0
+
+        stale : list[str] = [
+            post_id for post_id in Storage.reference(self.path).order_by_value().end_at(min(kept.values())).get() or {}
+            if post_id not in kept
+        ]
+
+        with Timeline.UnitOfWork():
+            for post_id in stale:
+                self.delete_child(post_id)
+
+        return len(stale)
+
+    def set_pull_author( author_id : str ) -> None:
+        Timeline.write(f'{Timeline.PULL_TABLE}/{author_id}', True)
+
+    def get_pull_authors() -> list[str]:
+        authors : dict = Timeline.read(Timeline.PULL_TABLE)
+
+        if not authors:
+            return []
+
+        return list(authors)
@@ -1,7 +1,8 @@
 from    firebase_admin  import db
 from    models          import Receiver
 from    datetime        import datetime
-from    models          import Model, User
+from    storage         import Storage
+from    models          import Model, User, Rollup
 import  enum
 
 
@@ -24,11 +25,12 @@ class Transaction(Model):
 
 
     BASE_TABLE  : str           = 'transactions'
+    INDEX_TABLE : str           = 'user_transactions'
 
     def __init__(self, id):
         super().__init__(id, Transaction.BASE_TABLE)
 
-    def create_transaction( receiver_id : str, amount : float, type : TransactionType, sender_id : str = '', IP : str = '', stripe_id : str = None ) -> None:
+    def create_transaction( receiver_id : str, amount : float, type : TransactionType, sender_id : str = '', IP : str = '', stripe_id : str = None ) -> str:
         
         if amount < 0.00:
             raise Transaction.TransactionError.InvalidAmountError( 'Amount must be a postive float' )
@@ -37,7 +39,6 @@ class Transaction(Model):
                 raise Transaction.TransactionError.NoSenderError( 'No sender assigned')
             
 
-        reference = db.reference(Transaction.BASE_TABLE)
         transaction_data = {
             'creation_date' : datetime.now().isoformat(),
             'receiver_id'   : receiver_id,
@@ -49,10 +50,19 @@ class Transaction(Model):
             'IP'            : IP
         }
 
-        if stripe_id:
-            reference.child(stripe_id).set(transaction_data)
-        else:
-            reference.push(transaction_data)
+        transaction_id : str = stripe_id or Transaction.generate_key()
+
+        with Transaction.UnitOfWork():
+            Transaction.write(f'{Transaction.BASE_TABLE}/{transaction_id}', transaction_data)
+            Transaction.__index( transaction_id, transaction_data )
+            Transaction.on_commit( lambda : Rollup.record( transaction_id, transaction_data ) )
+
+        return transaction_id
+
+    def __index( transaction_id : str, transaction_data : dict ) -> None:
+        for user_id in dict.fromkeys( (transaction_data.get('receiver_id'), transaction_data.get('sender_id')) ):
+            if user_id:
+                Transaction.write(f'{Transaction.INDEX_TABLE}/{user_id}/{transaction_id}', transaction_data['creation_date'])
 
     def __confirm_donation( amount : float, payment_method : dict, receiver_id : str, sender_id : str, IP : str):
         confirmation_data   : dict = {
@@ -90,8 +100,8 @@ class Transaction(Model):
         return confirmation_data
     
     def confirm_transaction( transaction_id : str , sender_id : str = None, payment_method : dict = None):
-        reference           : db.Reference  = db.reference(f'/{Transaction.BASE_TABLE}/{transaction_id}')
-        transaction         : dict          = reference.get()
+        transaction_model   : Transaction   = Transaction(transaction_id)
+        transaction         : dict          = transaction_model.get()
 
         if not transaction:
             raise Transaction.TransactionError.TransactionNotFound()
@@ -121,27 +131,32 @@ class Transaction(Model):
             raise Transaction.TransactionError.InvalidTransactionType()
         
 
-        reference.update(confirmation_data)
+        transaction_model.update(confirmation_data)
 
 
         return transaction_amount, transaction_receiver
 
-    def get_transactions( user_id : str):
+    def get_index( user_id : str, before : str = None, limit : int = None ) -> dict:
 
-        reference       : db.Reference = db.reference('/transactions')
-        
-        user_types      : list = ['receiver_id', 'sender_id']
-        transactions    : list = []
-        
-        for user_type in user_types:
-            query : db.Query = reference.order_by_child(user_type).equal_to(user_id)
-            transactions_data = query.get()
-            for transaction_id in transactions_data:
-                transaction = transactions_data[transaction_id]
-                transaction['id'] = transaction_id
-
-                transactions.append(transaction)
-     
-        sorted_transactions = sorted(transactions, key=lambda x: datetime.fromisoformat(x['creation_date']), reverse=True)
-        
-        return sorted_transactions
\ No newline at end of file
+        query = Storage.reference(f'/{Transaction.INDEX_TABLE}/{user_id}').order_by_value()
+
+        if before is not None:
+            query = query.end_at(before)
+        if limit is not None:
+            query = query.limit_to_last(limit)
+
+        return dict(query.get() or {})
+
+    def backfill_index() -> int:
+
+        transactions    : dict  = Storage.reference(f'/{Transaction.BASE_TABLE}').get() or {}
+        count           : int   = 0
+
+        with Transaction.UnitOfWork():
+            for transaction_id, transaction_data in transactions.items():
+                if not isinstance(transaction_data, dict) or not transaction_data.get('creation_date'):
+                    continue
+                Transaction.__index( transaction_id, transaction_data )
+                count += 1
+
+        return count
@@ -35,8 +35,7 @@ class User(Model):
 
     def get_user ( id : str ):
         for user_type in User.UserType:
-            reference = db.reference(f'/{user_type.value}s/{id}')
-            user_data = reference.get()
+            user_data = User.read(f'{user_type.value}s/{id}')
             
             if user_data:
                 match user_type:
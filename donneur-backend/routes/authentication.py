@@ -1,5 +1,5 @@
 from    flask_restful           import  Resource, reqparse
-from    controllers             import  decode_token
+from    controllers             import  decode_token, FeedWarmer
 from    flask                   import  request
 from    models                  import  User
 
@@ -15,6 +15,8 @@ def auth_required(func):
         user_id, role = decode_token(token)
 
         if user_id:
+            if role == User.UserType.RECEIVER.value:
+                FeedWarmer.touch(user_id)
             return func(args[0], user_id, role,  *args[2:], **kwargs)
         
         
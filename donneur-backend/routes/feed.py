@@ -1,7 +1,7 @@
 from flask_restful          import Resource, reqparse
 from routes.authentication  import auth_required
 
-from controllers    import FeedController
+from controllers    import Controller, FeedController, WebhookQueue
 from models         import Post
 
 import logging
@@ -55,8 +55,12 @@ class GetFeedResource(Resource):
     
     @auth_required
     def get( self, user_id, role : str ):
+        parser = reqparse.RequestParser()
+        parser.add_argument('cursor',   type=str, location='args', default=None)
+        parser.add_argument('limit',    type=int, location='args', default=None)
+        data = parser.parse_args()
         try:
-            feed = FeedController.get_feed( user_id )
+            feed = FeedController.get_feed( user_id, data.get('cursor'), data.get('limit') )
             return feed
         except Exception as e:
             print(str(e))
@@ -92,3 +96,46 @@ class GetUserPostsResource(Resource):
             logging.error(str(e))
             return {'error' : str(e)}, 400
 
+
+class LikePostResource(Resource):
+
+    @auth_required
+    def post(self, user_id : str, role : str ):
+        parser = reqparse.RequestParser()
+        parser.add_argument(    'post_id',      type=str,   required=True, help="No post_id provided"       )
+
+        data = parser.parse_args()
+
+        try:
+            FeedController.like_post( user_id, data.get('post_id') )
+            return {'status' : 'success'}, 200
+        except Post.PostError.PostNotFound as e:
+            return {'error' : str(e)}, 404
+        except Exception as e:
+            return {'error' : str(e)}, 400
+
+class UnlikePostResource(Resource):
+
+    @auth_required
+    def post(self, user_id : str, role : str ):
+        parser = reqparse.RequestParser()
+        parser.add_argument(    'post_id',      type=str,   required=True, help="No post_id provided"       )
+
+        data = parser.parse_args()
+
+        try:
+            FeedController.unlike_post( user_id, data.get('post_id') )
+            return {'status' : 'success'}, 200
+        except Post.PostError.PostNotFound as e:
+            return {'error' : str(e)}, 404
+        except Exception as e:
+            return {'error' : str(e)}, 400
+
+class GetCacheStatsResource(Resource):
+
+    @auth_required
+    def get(self, user_id : str, role : str):
+        if user_id not in Controller.admin_ids:
+            return {'error' : 'Only administrators can read cache statistics'}, 403
+
+        return dict(FeedController.cache_stats(), webhooks = WebhookQueue.stats() if WebhookQueue.path else None), 200
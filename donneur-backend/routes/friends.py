@@ -49,4 +49,27 @@ class ReplyFriendRequestResource(Resource):
             FriendController.request_reply(user_id, args.get('friendship_id'), args.get('accept'))
             return {'status' : 'ok'}, 200
         except Exception as e:
-            return {'error' : str(e)}
\ No newline at end of file
+            return {'error' : str(e)}
+
+class GetFriendSuggestionsResource(Resource):
+    @auth_required
+    def get( self, user_id : str, role : str  ):
+        try:
+            suggestions = FriendController.get_suggestions(user_id)
+            return {'suggestions' : suggestions}, 200
+        except Exception as e:
+            return {'error' : str(e)}
+
+class GetMutualsResource(Resource):
+    @auth_required
+    def get( self, user_id : str, role : str  ):
+        parser = reqparse.RequestParser()
+        parser.add_argument( 'ids',     type=str, location='args', required=True, help='No ids provided' )
+        parser.add_argument( 'limit',   type=int, location='args', default=None )
+        args = parser.parse_args()
+        try:
+            other_ids   = [other_id for other_id in args.get('ids').split(',') if other_id]
+            mutuals     = FriendController.get_mutuals(user_id, other_ids, args.get('limit'))
+            return {'mutuals' : mutuals}, 200
+        except Exception as e:
+            return {'error' : str(e)}, 400
@@ -1,5 +1,8 @@
-from flask_restful  import  Resource, reqparse
-from controllers    import  PaymentController
+from flask_restful          import  Resource, reqparse
+from flask                  import  request
+from routes.authentication  import  auth_required
+from models                 import  User
+from controllers            import  PaymentController
 import logging
 class CreateDonationResource(Resource):
 
@@ -18,17 +21,29 @@ class CreateDonationResource(Resource):
             return { 'error' : str(e) }, 400
         
 
+class CreateDonationBatchResource(Resource):
+    @auth_required
+    def post(self, user_id : str, role : str):
+        parser = reqparse.RequestParser()
+        parser.add_argument(    'donations',        type=list, location='json', required=True, help="A list of donations is required."    )
+        parser.add_argument(    'idempotency_key',  type=str, location='json', required=False                                       )
+        data = parser.parse_args()
+
+        if role != User.UserType.ORGANIZATION.value:
+            return { 'error' : 'Only organizations can create donation batches' }, 403
+
+        try:
+            donations = PaymentController.create_payments( data.get('donations'), request.remote_addr or '', user_id, data.get('idempotency_key') )
+            return { 'donations' : donations }, 200
+        except Exception as e:
+            return { 'error' : str(e) }, 400
+
+
 class ConfirmDonationResource(Resource):
     def post(self):
-        parser = reqparse.RequestParser()
-        parser.add_argument(    'data',       type=dict, required = False    )
-        args = parser.parse_args()
         try:
-            logging.debug(args)
-            
-            payment_intent = args['data']['object']
-            PaymentController.confirm_payment( payment_intent )
-            return {"status" : "ok"}, 200
+            queued : bool = PaymentController.receive_webhook( request.get_data(), request.headers.get('Stripe-Signature') )
+            return {"status" : "queued" if queued else "duplicate"}, 200
         
         except Exception as e:
             logging.error(str(e))
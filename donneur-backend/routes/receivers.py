@@ -113,13 +113,13 @@ class GetIDProfile(Resource):
         args = parser.parse_args()
         try:
             receiver : Receiver = Receiver( args.get('receiver_id'))
-            receiver_data : dict = receiver.get()
+            receiver_data : dict = receiver.get_fields('first_name', 'last_name', 'dob', 'id_picture_file')
 
             id_profile = {
                 'name' : f'{receiver_data["first_name"]} {receiver_data["last_name"]}',
                 'dob' : receiver_data["dob"],
                 'picture_url' : receiver_data['id_picture_file'],
-                'balance'   : receiver_data['balance']
+                'balance'   : receiver.get_balance()
             }
 
             return id_profile, 200
@@ -31,8 +31,24 @@ class SendFundsResource(Resource):
 class GetTransactionsResource(Resource):
     @auth_required
     def get(self, user_id : str, role : str):
+        parser = reqparse.RequestParser()
+        parser.add_argument( 'cursor', type=str, location='args', default=None )
+        parser.add_argument( 'limit', type=int, location='args', default=None )
+        args = parser.parse_args()
+        try:
+            transactions, cursor = TransactionController.get_transactions( user_id, args.get('cursor'), args.get('limit') )
+            return {'transactions' : transactions, 'cursor' : cursor}, 200
+        except Exception as e:
+            return { 'error' : str(e) }, 400
+
+class GetRollupResource(Resource):
+    @auth_required
+    def get(self, user_id : str, role : str):
+        parser = reqparse.RequestParser()
+        parser.add_argument( 'period', type=str, location='args', default=None )
+        parser.add_argument( 'key', type=str, location='args', default=None )
+        args = parser.parse_args()
         try:
-            transactions = TransactionController.get_transactions( user_id )
-            return {'transactions' : transactions}, 200
+            return TransactionController.get_rollup( user_id, args.get('period'), args.get('key') ), 200
         except Exception as e:
             return { 'error' : str(e) }, 400
@@ -0,0 +1,3 @@
+from .storage           import Storage, StorageBackend
+from .firebase_backend  import FirebaseBackend
+from .local_backend     import LocalBackend
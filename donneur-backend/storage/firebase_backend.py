@@ -0,0 +1,8 @@
+from    firebase_admin  import db
+from    .storage        import StorageBackend
+
+
+class FirebaseBackend(StorageBackend):
+
+    def reference( self, path : str = '/' ) -> db.Reference:
+        return db.reference(path)
@@ -0,0 +1,270 @@
+from    __future__      import annotations
+from    collections     import OrderedDict
+from    .storage        import Storage, StorageBackend
+import  threading
+import  hashlib
+import  json
+import  copy
+import  time
+
+
+class LocalBackend(StorageBackend):
+
+    class LocalError(Exception):
+        class TransactionAborted    (Exception) : pass
+        class InvalidPath           (Exception) : pass
+
+    def __init__( self, data : dict = None, latency : float = 0.0 ):
+        self.data           : dict              = LocalBackend.clean(copy.deepcopy(data)) or {}
+        self.latency        : float             = latency
+        self.round_trips    : int               = 0
+        self.lock           : threading.RLock   = threading.RLock()
+
+    def from_file( path : str, latency : float = 0.0 ) -> LocalBackend:
+        with open(path) as file:
+            return LocalBackend( json.load(file), latency )
+
+    def reference( self, path : str = '/' ) -> LocalReference:
+        return LocalReference( self, Storage.normalize(path) )
+
+    def round_trip( self, count : int = 1 ) -> None:
+        with self.lock:
+            self.round_trips += count
+        if self.latency:
+            time.sleep(self.latency * count)
+
+
+    def clean( value ):
+        if isinstance(value, dict):
+            cleaned = { str(key) : LocalBackend.clean(item) for key, item in value.items() }
+            cleaned = { key : item for key, item in cleaned.items() if item is not None }
+            return cleaned or None
+        if isinstance(value, (list, tuple)):
+            cleaned = [ LocalBackend.clean(item) for item in value ]
+            return cleaned if any(item is not None for item in cleaned) else None
+        return value
+
+    def __child( node, segment : str ):
+        if isinstance(node, dict):
+            return node.get(segment)
+        if isinstance(node, list) and segment.isdigit() and int(segment) < len(node):
+            return node[int(segment)]
+        return None
+
+    def read( self, path : str ):
+        with self.lock:
+            node = self.data
+            for segment in path.split('/') if path else []:
+                node = LocalBackend.__child(node, segment)
+                if node is None:
+                    return None
+            return copy.deepcopy(node)
+
+    def write( self, path : str, value ) -> None:
+        value = LocalBackend.clean(copy.deepcopy(value))
+
+        with self.lock:
+            if not path:
+                self.data = value if isinstance(value, dict) else {}
+                return
+
+            segments    : list[str] = path.split('/')
+            parents     : list      = []
+            node        : dict      = self.data
+
+            for segment in segments[:-1]:
+                child = node.get(segment)
+                if isinstance(child, list):
+                    child = { str(index) : item for index, item in enumerate(child) if item is not None }
+                    node[segment] = child
+                if not isinstance(child, dict):
+                    if value is None:
+                        return
+                    child = node[segment] = {}
+                parents.append((node, segment))
+                node = child
+
+            if value is None:
+                node.pop(segments[-1], None)
+                for parent, segment in reversed(parents):
+                    if parent[segment]:
+                        break
+                    del parent[segment]
+            else:
+                node[segments[-1]] = value
+
+    def update( self, path : str, changes : dict ) -> None:
+        with self.lock:
+            for child_path, value in changes.items():
+                self.write( Storage.normalize(f'{path}/{child_path}'), value )
+
+    def etag( value ) -> str:
+        return hashlib.md5( json.dumps(value, sort_keys = True).encode() ).hexdigest()
+
+
+class LocalReference:
+
+    def __init__( self, backend : LocalBackend, path : str ):
+        self.backend    : LocalBackend  = backend
+        self.path       : str           = path
+
+    @property
+    def key( self ) -> str | None:
+        return self.path.split('/')[-1] if self.path else None
+
+    @property
+    def parent( self ) -> LocalReference | None:
+        if not self.path:
+            return None
+        return LocalReference( self.backend, self.path.rsplit('/', 1)[0] if '/' in self.path else '' )
+
+    def child( self, path : str ) -> LocalReference:
+        return LocalReference( self.backend, Storage.normalize(f'{self.path}/{path}') )
+
+    def get( self, etag : bool = False, shallow : bool = False ):
+        self.backend.round_trip()
+        value = self.backend.read(self.path)
+
+        if shallow and isinstance(value, dict):
+            value = { key : True for key in value }
+        elif shallow and isinstance(value, list):
+            value = { str(index) : True for index, item in enumerate(value) if item is not None }
+
+        if etag:
+            return value, LocalBackend.etag(value)
+        return value
+
+    def set( self, value ) -> None:
+        if value is None:
+            raise ValueError('Value must not be None.')
+        self.backend.round_trip()
+        self.backend.write(self.path, value)
+
+    def set_if_unchanged( self, expected_etag : str, value ) -> tuple[bool, object, str]:
+        self.backend.round_trip()
+        with self.backend.lock:
+            current = self.backend.read(self.path)
+            if LocalBackend.etag(current) != expected_etag:
+                return False, current, LocalBackend.etag(current)
+            self.backend.write(self.path, value)
+            return True, value, LocalBackend.etag(LocalBackend.clean(value))
+
+    def update( self, value : dict ) -> None:
+        if not value:
+            raise ValueError('Value argument must be a non-empty dictionary.')
+        self.backend.round_trip()
+        self.backend.update(self.path, value)
+
+    def push( self, value = '' ) -> LocalReference:
+        reference : LocalReference = self.child( Storage.generate_key() )
+        self.backend.round_trip()
+        self.backend.write(reference.path, value)
+        return reference
+
+    def delete( self ) -> None:
+        self.backend.round_trip()
+        self.backend.write(self.path, None)
+
+    def transaction( self, transaction_update ):
+        self.backend.round_trip(2)
+        with self.backend.lock:
+            current = self.backend.read(self.path)
+            try:
+                value = transaction_update(current)
+            except Exception as e:
+                raise LocalBackend.LocalError.TransactionAborted(str(e))
+            self.backend.write(self.path, value)
+            return LocalBackend.clean(copy.deepcopy(value))
+
+    def order_by_child( self, path : str ) -> LocalQuery:
+        if path in ('$key', '$value', '$priority'):
+            raise ValueError(f'Illegal child path: {path}')
+        return LocalQuery( self, Storage.normalize(path) )
+
+    def order_by_key( self ) -> LocalQuery:
+        return LocalQuery( self, '$key' )
+
+    def order_by_value( self ) -> LocalQuery:
+        return LocalQuery( self, '$value' )
+
+
+class LocalQuery:
+
+    def __init__( self, reference : LocalReference, order_by : str ):
+        self.reference  : LocalReference    = reference
+        self.order_by   : str               = order_by
+        self.start      : tuple | None      = None
+        self.end        : tuple | None      = None
+        self.first      : int | None        = None
+        self.last       : int | None        = None
+
+    def __rank( value ) -> tuple:
+        if value is None:
+            return (0, 0)
+        if value is False:
+            return (1, 0)
+        if value is True:
+            return (2, 0)
+        if isinstance(value, (int, float)):
+            return (3, value)
+        if isinstance(value, str):
+            return (4, value)
+        return (5, 0)
+
+    def __value( self, key : str, item ):
+        if self.order_by == '$key':
+            return key
+        if self.order_by == '$value':
+            return item
+        for segment in self.order_by.split('/'):
+            item = item.get(segment) if isinstance(item, dict) else None
+        return item
+
+    def start_at( self, start ) -> LocalQuery:
+        if start is None:
+            raise ValueError('Start value must not be None.')
+        self.start = LocalQuery.__rank(start)
+        return self
+
+    def end_at( self, end ) -> LocalQuery:
+        if end is None:
+            raise ValueError('End value must not be None.')
+        self.end = LocalQuery.__rank(end)
+        return self
+
+    def equal_to( self, value ) -> LocalQuery:
+        if value is None:
+            raise ValueError('Equal to value must not be None.')
+        self.start = self.end = LocalQuery.__rank(value)
+        return self
+
+    def limit_to_first( self, limit : int ) -> LocalQuery:
+        self.first = limit
+        return self
+
+    def limit_to_last( self, limit : int ) -> LocalQuery:
+        self.last = limit
+        return self
+
+    def get( self ) -> OrderedDict:
+        self.reference.backend.round_trip()
+        node = self.reference.backend.read(self.reference.path)
+
+        if isinstance(node, list):
+            node = { str(index) : item for index, item in enumerate(node) if item is not None }
+        if not isinstance(node, dict):
+            return OrderedDict()
+
+        ranked : list = sorted(
+            ( LocalQuery.__rank(self.__value(key, item)), key, item ) for key, item in node.items()
+        )
+        if self.start is not None:
+            ranked = [entry for entry in ranked if entry[0] >= self.start]
+        if self.end is not None:
+            ranked = [entry for entry in ranked if entry[0] <= self.end]
+        if self.first is not None:
+            ranked = ranked[:self.first]
+        if self.last is not None:
+            ranked = ranked[-self.last:] if self.last else []
+
+        return OrderedDict( (key, item) for _, key, item in ranked )
@@ -0,0 +1,112 @@
+from    concurrent.futures  import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from    typing              import Callable
+import  threading
+import  random
+import  time
+import  os
+
+
+class StorageBackend:
+
+    def reference( self, path : str = '/' ):
+        raise NotImplementedError()
+
+
+class Storage:
+
+    class StorageError(Exception):
+        class CallTimeout   (Exception) : pass
+
+    PUSH_CHARS          : str               = '-0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz'
+
+    backend             : StorageBackend    = None
+    pool_size           : int               = int(os.getenv('STORAGE_POOL_SIZE', '16'))
+    call_timeout        : float | None      = float(os.getenv('STORAGE_CALL_TIMEOUT', '10')) or None
+
+    __pool              : ThreadPoolExecutor = None
+    __pool_lock         : threading.Lock    = threading.Lock()
+    __worker            : threading.local   = threading.local()
+
+    __key_lock          : threading.Lock    = threading.Lock()
+    __last_key_time     : int               = 0
+    __last_key_random   : list[int]         = []
+
+    def configure( backend : StorageBackend ) -> None:
+        Storage.backend = backend
+
+    def reference( path : str = '/' ):
+        if Storage.backend is None:
+            from .firebase_backend import FirebaseBackend
+            Storage.backend = FirebaseBackend()
+        return Storage.backend.reference( f'/{Storage.normalize(path)}' )
+
+    def configure_pool( size : int = None, call_timeout : float = None ) -> None:
+        with Storage.__pool_lock:
+            if size:
+                Storage.pool_size = size
+            if call_timeout is not None:
+                Storage.call_timeout = call_timeout or None
+            if Storage.__pool:
+                Storage.__pool.shutdown(wait = False)
+                Storage.__pool = None
+
+    def __get_pool() -> ThreadPoolExecutor:
+        with Storage.__pool_lock:
+            if Storage.__pool is None:
+                Storage.__pool = ThreadPoolExecutor( max_workers = Storage.pool_size, thread_name_prefix = 'storage' )
+            return Storage.__pool
+
+    def __run( call : Callable ):
+        Storage.__worker.active = True
+        try:
+            return call()
+        finally:
+            Storage.__worker.active = False
+
+    def gather( calls : list[Callable], timeout : float = None ) -> list:
+        timeout : float | None = timeout if timeout is not None else Storage.call_timeout
+
+        if len(calls) < 2 or getattr(Storage.__worker, 'active', False):
+            return [call() for call in calls]
+
+        pool    : ThreadPoolExecutor    = Storage.__get_pool()
+        started : float                 = time.monotonic()
+        futures : list                  = [pool.submit(Storage.__run, call) for call in calls]
+
+        try:
+            results : list = []
+            for future in futures:
+                remaining : float | None = None if timeout is None else max(0.0, timeout - (time.monotonic() - started))
+                results.append(future.result(timeout = remaining))
+            return results
+        except FutureTimeoutError:
+            for future in futures:
+                future.cancel()
+            raise Storage.StorageError.CallTimeout(f'Storage call exceeded {timeout}s')
+
+    def normalize( path : str ) -> str:
+        return '/'.join( segment for segment in str(path).split('/') if segment )
+
+    def generate_key() -> str:
+        with Storage.__key_lock:
+            now : int = int(time.time() * 1000)
+
+            if now == Storage.__last_key_time:
+                for index in range(11, -1, -1):
+                    if Storage.__last_key_random[index] != 63:
+                        Storage.__last_key_random[index] += 1
+                        break
+                    Storage.__last_key_random[index] = 0
+            else:
+                Storage.__last_key_time     = now
+                Storage.__last_key_random   = [random.randrange(64) for _ in range(12)]
+
+            return Storage.key_prefix(now) + ''.join(Storage.PUSH_CHARS[index] for index in Storage.__last_key_random)
+
+    def key_prefix( milliseconds : int ) -> str:
+        timestamp : list[str] = []
+        for _ in range(8):
+            timestamp.append(Storage.PUSH_CHARS[milliseconds % 64])
+            milliseconds //= 64
+
+        return ''.join(reversed(timestamp))
@@ -0,0 +1,52 @@
+import  os
+import  sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import  controllers
+import  pytest
+
+from    controllers     import FeedController, FriendController, PaymentController, WebhookQueue
+from    storage         import Storage, LocalBackend
+from    billing         import StripeClient, FakeStripe
+from    cache           import MemoryCache
+from    models          import Model
+
+
+@pytest.fixture(autouse = True)
+def backend() -> LocalBackend:
+    backend : LocalBackend = LocalBackend()
+
+    Storage.configure( backend )
+    FeedController.feed_cache           = MemoryCache( max_entries = 1024, ttl = 300 )
+    FeedController.author_cache         = MemoryCache( max_entries = 4096, ttl = 60 )
+    FriendController.adjacency_cache    = MemoryCache( max_entries = 4096, ttl = 300 )
+    Model.end_request()
+
+    yield backend
+
+    Model.end_request()
+
+
+@pytest.fixture
+def fake_stripe() -> FakeStripe:
+    server : FakeStripe = FakeStripe( port = 0 )
+
+    StripeClient.configure( api_key = 'sk_test_fake', api_base = server.start(), max_retries = 0, method_cache = MemoryCache( max_entries = 16, ttl = 60 ) )
+
+    yield server
+
+    server.stop()
+
+
+@pytest.fixture
+def webhook_queue( tmp_path ) -> type[WebhookQueue]:
+    WebhookQueue.configure( path = str(tmp_path / 'webhooks.sqlite3'), retry_delay = 0.01 )
+    WebhookQueue.register( 'payment_intent.succeeded', PaymentController.confirm_payment )
+    PaymentController.webhook_secret = 'whsec_test'
+    PaymentController.allow_unsigned = False
+
+    yield WebhookQueue
+
+    WebhookQueue.path                   = None
+    PaymentController.webhook_secret    = None
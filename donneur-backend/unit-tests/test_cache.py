@@ -0,0 +1,75 @@
+from    cache           import Cache, MemoryCache, SQLiteCache
+
+import  pytest
+import  time
+
+
+@pytest.fixture(params = ['memory', 'sqlite'])
+def cache( request, tmp_path ) -> Cache:
+    if request.param == 'memory':
+        return MemoryCache( max_entries = 3, ttl = 60 )
+    return SQLiteCache( str(tmp_path / 'cache.sqlite3'), 'feed', max_entries = 3, ttl = 60 )
+
+
+def test_values_round_trip_and_count_hits(cache):
+    cache.set('a', {'first_page' : [1, 2], 'warmed_at' : 1.5})
+
+    assert cache.get('a') == {'first_page' : [1, 2], 'warmed_at' : 1.5}
+    assert cache.get('b') is None
+    assert cache.stats() == {'hits' : 1, 'misses' : 1}
+
+
+def test_entries_expire(cache):
+    cache.set('a', 1, ttl = 0.01)
+    time.sleep(0.02)
+
+    assert cache.get('a') is None
+    assert cache.keys() == []
+
+
+def test_least_recently_used_entries_are_evicted(cache):
+    for key in ('a', 'b', 'c'):
+        cache.set(key, key)
+        time.sleep(0.001)
+    cache.get('a')
+    time.sleep(0.001)
+    cache.set('d', 'd')
+
+    assert sorted(cache.keys()) == ['a', 'c', 'd']
+
+
+def test_delete_and_clear(cache):
+    for key in ('a', 'b', 'c'):
+        cache.set(key, key)
+
+    cache.delete('a', 'b')
+    assert cache.keys() == ['c']
+
+    cache.clear()
+    assert cache.keys() == []
+
+
+def test_sqlite_cache_is_shared_between_instances(tmp_path):
+    path    : str           = str(tmp_path / 'cache.sqlite3')
+    writer  : SQLiteCache   = SQLiteCache( path, 'feed' )
+    reader  : SQLiteCache   = SQLiteCache( path, 'feed' )
+
+    writer.set('r1', {'authors' : ['a']})
+    assert reader.get('r1') == {'authors' : ['a']}
+
+    reader.delete('r1')
+    assert writer.get('r1') is None
+    assert SQLiteCache.shared and not MemoryCache.shared
+
+
+def test_from_env_builds_the_configured_backend(tmp_path, monkeypatch):
+    monkeypatch.setenv('TEST_CACHE_BACKEND', 'sqlite')
+    monkeypatch.setenv('TEST_CACHE_PATH', str(tmp_path / 'env.sqlite3'))
+    monkeypatch.setenv('TEST_CACHE_TTL', '5')
+
+    cache : Cache = Cache.from_env( 'TEST_CACHE', max_entries = 10, ttl = 300 )
+    assert isinstance(cache, SQLiteCache) and cache.ttl == 5 and cache.max_entries == 10
+
+    monkeypatch.setenv('TEST_CACHE_BACKEND', 'redis')
+    with pytest.raises(ValueError):
+        Cache.from_env( 'TEST_CACHE' )
@@ -0,0 +1,72 @@
+from    collections     import OrderedDict
+from    controllers     import FeedController, FeedWarmer, FriendController
+from    cache           import MemoryCache
+from    models          import Receiver
+
+import  pytest
+import  time
+
+
+def test_cursor_pages_are_full_and_disjoint(backend):
+    reader, friend, stranger = ( Receiver.create(name, 'Test', '01-01-2000') for name in ('A', 'B', 'C') )
+
+    FriendController.add_friend( reader.id, friend.id )
+    FriendController.request_reply( friend.id, next(iter(backend.read('friendships'))), True )
+
+    for index in range(30):
+        author : Receiver = (friend, reader, friend, stranger, reader)[index % 5]
+        FeedController.create_post( author.id, {'text' : f'post {index}'}, 'all' )
+        time.sleep(0.001)
+
+    expected : list[str] = [ post['content']['text'] for post in FeedController.get_feed( reader.id, limit = FeedController.max_page_size )['feed'] ]
+    FeedController.feed_cache.clear()
+
+    pages   : list[list[str]]   = []
+    cursor  : str | None        = None
+
+    while True:
+        page : dict = FeedController.get_feed( reader.id, cursor, 4 )
+        pages.append([ post['content']['text'] for post in page['feed'] ])
+        cursor = page['cursor']
+        if not cursor:
+            break
+
+    assert len(expected) > 4
+    assert all( len(page) == 4 for page in pages[:-1] )
+    assert sum(pages, []) == expected
+
+
+def test_invalid_cursor_is_rejected():
+    with pytest.raises(FeedController.FeedError.InvalidCursor):
+        FeedController.get_feed( 'r1', 'not-a-cursor', 4 )
+
+
+def test_first_page_stays_warm_across_refreshes(backend, monkeypatch):
+    reader, friend = ( Receiver.create(name, 'Test', '01-01-2000') for name in ('A', 'B') )
+
+    FriendController.add_friend( reader.id, friend.id )
+    FriendController.request_reply( friend.id, next(iter(backend.read('friendships'))), True )
+    FeedController.create_post( friend.id, {'text' : 'first'}, 'friends' )
+
+    assert len(FeedController.get_feed( reader.id )['feed']) == 1
+
+    before : int = backend.round_trips
+    for _ in range(3):
+        assert len(FeedController.get_feed( reader.id )['feed']) == 1
+    assert backend.round_trips == before
+
+    monkeypatch.setattr(FeedWarmer, 'enabled', True)
+    monkeypatch.setattr(FeedWarmer, 'activity', MemoryCache( max_entries = 16, ttl = 900 ))
+    monkeypatch.setattr(FeedWarmer, 'touched', OrderedDict())
+    FeedWarmer.touch( reader.id )
+
+    assert not FeedController.needs_warm( reader.id )
+    assert FeedWarmer.run_cycle() == 0
+
+    monkeypatch.setattr(FeedWarmer, 'interval', FeedController.warm_ttl)
+    assert FeedController.needs_warm( reader.id, FeedWarmer.interval )
+    assert FeedWarmer.run_cycle() == 1
+
+    time.sleep(0.002)
+    FeedController.create_post( friend.id, {'text' : 'second'}, 'friends' )
+    assert [ post['content']['text'] for post in FeedController.get_feed( reader.id )['feed'] ] == ['second', 'first']
@@ -0,0 +1,119 @@
+from    controllers     import FriendController
+from    storage         import Storage
+from    utils           import SuggestionEngine
+
+import  pytest
+
+
+def befriend( user_1 : str, user_2 : str ) -> str:
+    FriendController.add_friend( user_1, user_2 )
+    friendship_id : str = Storage.reference(f'/{FriendController.INDEX_TABLE}/{user_1}/{user_2}/friendship_id').get()
+    FriendController.request_reply( user_2, friendship_id )
+    return friendship_id
+
+
+@pytest.fixture
+def graph() -> None:
+    for user_id in ('a', 'b', 'c', 'd', 'e'):
+        Storage.reference(f'/receivers/{user_id}').set({'first_name' : user_id.upper(), 'last_name' : 'Test'})
+
+    for user_1, user_2 in (('a', 'c'), ('a', 'd'), ('b', 'c'), ('b', 'd'), ('e', 'c')):
+        befriend( user_1, user_2 )
+
+    Storage.reference('/subscriptions').set({
+        'a' : {'s1' : True, 's2' : True},
+        'b' : {'s2' : True, 's3' : True},
+        'e' : {'s1' : True}
+    })
+
+
+def test_mutuals_intersect_friends_and_shelters(graph):
+    mutuals : dict = FriendController.get_mutuals( 'a', ['b', 'e'], limit = 1 )
+
+    assert mutuals['b'] == {'mutual_friends' : 2, 'mutual_friend_ids' : ['c'], 'mutual_shelters' : 1, 'mutual_shelter_ids' : ['s2']}
+    assert mutuals['e'] == {'mutual_friends' : 1, 'mutual_friend_ids' : ['c'], 'mutual_shelters' : 1, 'mutual_shelter_ids' : ['s1']}
+
+
+def test_mutuals_are_served_from_the_adjacency_cache(graph, backend):
+    FriendController.get_mutuals( 'a', ['b'] )
+    round_trips : int = backend.round_trips
+
+    FriendController.get_mutuals( 'b', ['a'] )
+    assert backend.round_trips == round_trips
+
+    FriendController.remove_friend( 'a', Storage.reference(f'/{FriendController.INDEX_TABLE}/a/c/friendship_id').get() )
+    assert FriendController.get_mutuals( 'b', ['a'] )['a']['mutual_friends'] == 1
+
+
+def test_mutuals_reject_too_many_ids(graph):
+    other_ids : list[str] = [ f'u{index}' for index in range(FriendController.MAX_MUTUAL_IDS + 1) ]
+
+    with pytest.raises(FriendController.FriendError.TooManyIds):
+        FriendController.get_mutuals( 'a', other_ids )
+
+    assert len(FriendController.get_mutuals( 'a', ['b'] * (FriendController.MAX_MUTUAL_IDS + 1) )) == 1
+
+
+def test_suggestion_engine_ranks_friends_of_friends_and_shelters():
+    friendships : dict = {
+        'f1' : {'user_1' : 'a', 'user_2' : 'c', 'friends_since' : '2025-01-01'},
+        'f2' : {'user_1' : 'b', 'user_2' : 'c', 'friends_since' : '2025-01-01'},
+        'f3' : {'user_1' : 'd', 'user_2' : 'c', 'friends_since' : '2025-01-01'},
+        'f4' : {'user_1' : 'a', 'user_2' : 'd', 'friends_since' : None}
+    }
+    friends, linked     = SuggestionEngine.build_graph( friendships )
+    shelters, members   = SuggestionEngine.build_shelters({ 'a' : {'s1' : True}, 'b' : {'s1' : True}, 'e' : {'s1' : True} })
+
+    suggestions : dict = dict(SuggestionEngine.suggest_graph( friends, linked, shelters, members ))
+
+    assert [ candidate['id'] for candidate in suggestions['a'] ] == ['b', 'e']
+    assert suggestions['a'][0] == {'id' : 'b', 'score' : 1.5, 'mutual_friends' : 1, 'shared_shelters' : 1}
+    assert suggestions == dict(SuggestionEngine.suggest_all( friendships, { 'a' : {'s1' : True}, 'b' : {'s1' : True}, 'e' : {'s1' : True} } ))
+
+
+def test_suggestions_are_precomputed_and_hide_new_links(graph):
+    assert FriendController.build_suggestions() == 5
+
+    assert [ suggestion['id'] for suggestion in FriendController.get_suggestions( 'a' ) ] == ['b', 'e']
+    assert FriendController.get_suggestions( 'a' )[0]['first_name'] == 'B'
+
+    FriendController.add_friend( 'a', 'b' )
+    assert [ suggestion['id'] for suggestion in FriendController.get_suggestions( 'a' ) ] == ['e']
+
+
+def test_adjacency_index_follows_the_friendship_lifecycle(graph):
+    FriendController.add_friend( 'a', 'e' )
+    friendship_id : str = Storage.reference(f'/{FriendController.INDEX_TABLE}/a/e/friendship_id').get()
+
+    assert Storage.reference(f'/{FriendController.INDEX_TABLE}/a/e/status').get() == FriendController.FriendStatus.REQUESTED
+    assert Storage.reference(f'/{FriendController.INDEX_TABLE}/e/a/status').get() == FriendController.FriendStatus.RECEIVED
+    assert not FriendController.are_friends( 'a', 'e' )
+
+    FriendController.request_reply( 'e', friendship_id )
+    assert FriendController.are_friends( 'a', 'e' ) and FriendController.are_friends( 'e', 'a' )
+    assert sorted(FriendController.get_friend_ids( 'e' )) == ['a', 'c']
+
+    FriendController.remove_friend( 'a', friendship_id )
+    assert Storage.reference(f'/{FriendController.INDEX_TABLE}/a/e').get() is None
+    assert Storage.reference(f'/{FriendController.INDEX_TABLE}/e/a').get() is None
+
+    with pytest.raises(FriendController.FriendError.AlreadyFriends):
+        FriendController.add_friend( 'a', 'c' )
+
+
+def test_refused_requests_leave_no_index_entries(graph):
+    FriendController.add_friend( 'a', 'e' )
+    friendship_id : str = Storage.reference(f'/{FriendController.INDEX_TABLE}/a/e/friendship_id').get()
+
+    FriendController.request_reply( 'e', friendship_id, accept = False )
+
+    assert Storage.reference(f'/{FriendController.INDEX_TABLE}/e/a').get() is None
+    assert Storage.reference(f'/{FriendController.BASE_TABLE}/{friendship_id}').get() is None
+
+
+def test_backfill_rebuilds_the_index_from_friendships(graph):
+    index : dict = Storage.reference(f'/{FriendController.INDEX_TABLE}').get()
+    Storage.reference(f'/{FriendController.INDEX_TABLE}').delete()
+
+    assert FriendController.backfill_index() == 5
+    assert Storage.reference(f'/{FriendController.INDEX_TABLE}').get() == index
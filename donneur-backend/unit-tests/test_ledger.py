@@ -0,0 +1,116 @@
+from    concurrent.futures  import ThreadPoolExecutor
+from    controllers         import ReceiverController
+from    models              import Model, Receiver, Ledger
+
+import  pytest
+
+
+def test_concurrent_deposits_are_all_counted():
+    receiver : Receiver = Receiver('r1')
+
+    with ThreadPoolExecutor(16) as pool:
+        list(pool.map(lambda index : receiver.deposit(5, f'deposit-{index}'), range(40)))
+
+    assert receiver.get_balance() == 200
+
+
+def test_concurrent_withdrawals_never_overdraw():
+    receiver : Receiver = Receiver('r1')
+    receiver.deposit(100, 'deposit')
+
+    def withdraw( index : int ) -> bool:
+        try:
+            receiver.withdraw(10, f'withdraw-{index}')
+            return True
+        except Receiver.ReceiverError.InsufficientFunds:
+            return False
+
+    with ThreadPoolExecutor(16) as pool:
+        outcomes : list[bool] = list(pool.map(withdraw, range(25)))
+
+    assert outcomes.count(True) == 10
+    assert receiver.get_balance() == 0
+
+
+def test_migration_keeps_credits_received_before_it(backend):
+    backend.write('receivers/r1', {'first_name' : 'A', 'balance' : 100})
+    Receiver('r1').deposit(10, 'early')
+
+    assert ReceiverController.migrate_balances() == 1
+    assert ReceiverController.get_balance('r1') == 110
+    assert 'balance' not in backend.read('receivers/r1')
+
+
+def test_migration_can_be_run_again(backend):
+    backend.write('receivers/r1', {'first_name' : 'A', 'balance' : 100})
+    ReceiverController.migrate_balances()
+
+    backend.write('receivers/r1/balance', 100)
+
+    assert ReceiverController.migrate_balances() == 0
+    assert ReceiverController.get_balance('r1') == 100
+    assert 'balance' not in backend.read('receivers/r1')
+
+
+def test_debits_are_ledger_entries(backend):
+    receiver : Receiver = Receiver('r1')
+    receiver.deposit(50, 'deposit')
+    key : str = receiver.withdraw(20, 'withdraw')
+
+    assert backend.read(f'ledger/entries/r1/{key}')['amount'] == -20
+    assert backend.read('ledger/debits/r1') == {'total' : 20}
+    assert receiver.get_balance() == 30
+
+
+def test_failed_flush_releases_the_debit(backend):
+    receiver : Receiver = Receiver('r1')
+    receiver.deposit(50, 'deposit')
+
+    with pytest.raises(RuntimeError):
+        with Model.UnitOfWork():
+            receiver.withdraw(20, 'withdraw')
+            raise RuntimeError('crash before flush')
+
+    assert receiver.get_balance() == 50
+    assert Ledger('r1').reconcile() == 0
+
+
+def test_reconcile_releases_holds_left_by_a_crash(backend, monkeypatch):
+    receiver : Receiver = Receiver('r1')
+    receiver.deposit(50, 'deposit')
+    receiver.withdraw(10, 'withdraw')
+
+    monkeypatch.setattr(Model, 'apply', lambda changes : None)
+    receiver.withdraw(20, 'lost')
+    monkeypatch.undo()
+
+    assert receiver.get_balance() == 20
+    assert Ledger('r1').reconcile() == 0
+
+    monkeypatch.setattr(Ledger, 'PENDING_TIMEOUT', -1)
+    assert ReceiverController.reconcile_ledgers() == 0
+    assert receiver.get_balance() == 40
+    assert backend.read('ledger/debits/r1') == {'total' : 10}
+
+
+def test_reconcile_rebuilds_a_drifted_total_from_entries(backend):
+    receiver : Receiver = Receiver('r1')
+    receiver.deposit(50, 'deposit')
+    receiver.withdraw(10, 'withdraw')
+    backend.write('ledger/debits/r1/total', 35)
+
+    assert Ledger('r1').reconcile() == 25
+    assert receiver.get_balance() == 40
+
+
+def test_compaction_keeps_debits_in_the_snapshot(backend, monkeypatch):
+    receiver : Receiver = Receiver('r1')
+    receiver.deposit(50, 'deposit')
+    receiver.withdraw(10, 'withdraw')
+
+    monkeypatch.setattr(Ledger, 'SNAPSHOT_MARGIN', -60)
+    assert Ledger('r1').compact()
+
+    assert backend.read('ledger/snapshots/r1')['debits'] == 10
+    assert Ledger('r1').reconcile() == 0
+    assert receiver.get_balance() == 40
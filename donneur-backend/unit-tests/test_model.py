@@ -0,0 +1,143 @@
+from    models          import Model
+
+import  pytest
+
+
+def test_unit_of_work_flushes_staged_writes_in_one_update(backend):
+    backend.write('table/old', {'value' : 1})
+    round_trips : int = backend.round_trips
+
+    with Model.UnitOfWork() as unit:
+        Model.write('table/a', {'value' : 1, 'tags' : {'x' : True}})
+        Model.write('table/a/tags/y', True)
+        key : str = Model.push('table', {'value' : 2})
+        Model.remove('table/old')
+
+        assert backend.read('table/a') is None
+        assert unit.changes['table/a'] == {'value' : 1, 'tags' : {'x' : True, 'y' : True}}
+
+    assert backend.round_trips == round_trips + 1
+    assert backend.read('table') == {'a' : {'value' : 1, 'tags' : {'x' : True, 'y' : True}}, key : {'value' : 2}}
+
+
+def test_staging_a_parent_replaces_staged_children():
+    with Model.UnitOfWork() as unit:
+        Model.write('table/a/value', 1)
+        Model.write('table/a', {'other' : 2})
+
+    assert unit.changes == {'table/a' : {'other' : 2}}
+
+
+def test_nested_units_flush_with_the_outermost(backend):
+    commits : list[str] = []
+
+    with Model.UnitOfWork():
+        Model.write('table/a', 1)
+
+        with Model.UnitOfWork():
+            Model.write('table/b', 2)
+            Model.on_commit( lambda : commits.append('inner') )
+
+        assert backend.read('table') is None
+        assert commits == []
+        Model.on_commit( lambda : commits.append('outer') )
+
+    assert backend.read('table') == {'a' : 1, 'b' : 2}
+    assert commits == ['inner', 'outer']
+
+
+def test_exception_discards_writes_and_runs_rollbacks_in_reverse(backend):
+    rollbacks   : list[str] = []
+    commits     : list[str] = []
+
+    with pytest.raises(RuntimeError):
+        with Model.UnitOfWork():
+            Model.write('table/a', 1)
+            Model.on_rollback( lambda : rollbacks.append('first') )
+            with Model.UnitOfWork():
+                Model.on_rollback( lambda : rollbacks.append('second') )
+            Model.on_commit( lambda : commits.append('commit') )
+            raise RuntimeError('abort')
+
+    assert backend.read('table') is None
+    assert rollbacks == ['second', 'first']
+    assert commits == []
+    assert Model.UnitOfWork.current() is None
+
+
+def test_failed_flush_runs_rollbacks(monkeypatch):
+    rollbacks : list[str] = []
+
+    def fail( changes : dict ) -> None:
+        raise ConnectionError('unavailable')
+
+    monkeypatch.setattr(Model, 'apply', fail)
+
+    with pytest.raises(ConnectionError):
+        with Model.UnitOfWork():
+            Model.write('table/a', 1)
+            Model.on_rollback( lambda : rollbacks.append('released') )
+
+    assert rollbacks == ['released']
+
+
+def test_hooks_outside_a_unit(backend):
+    commits : list[str] = []
+
+    assert Model.on_rollback( lambda : None ) is False
+    Model.on_commit( lambda : commits.append('now') )
+    assert commits == ['now']
+
+    Model.write('table/a', 1)
+    assert backend.read('table/a') == 1
+
+
+def test_identity_map_serves_repeated_and_nested_reads(backend):
+    backend.write('table/a', {'value' : 1, 'child' : {'x' : 2}})
+    Model.begin_request()
+    round_trips : int = backend.round_trips
+
+    assert Model.read('table/a') == {'value' : 1, 'child' : {'x' : 2}}
+    assert Model.read('table/a') == {'value' : 1, 'child' : {'x' : 2}}
+    assert Model.read('table/a/child/x') == 2
+    assert Model.read('table/a', shallow = True) == {'value' : True, 'child' : True}
+    assert Model.read_many(['table/a/value', 'table/b']) == [1, None]
+
+    assert backend.round_trips == round_trips + 2
+    assert Model.saved_reads() == 4
+
+
+def test_identity_map_returns_copies():
+    Model.begin_request()
+    Model.write('table/a', {'value' : 1})
+
+    Model.read('table/a')['value'] = 2
+    assert Model.read('table/a') == {'value' : 1}
+
+
+def test_writes_invalidate_cached_ancestors_and_descendants(backend):
+    backend.write('table/a', {'value' : 1, 'child' : {'x' : 2}})
+    Model.begin_request()
+    Model.read('table')
+    Model.read('table/a/child', shallow = True)
+
+    Model.write('table/a/child/x', 3)
+    assert Model.read('table/a/child/x') == 3
+    assert Model.read('table/a/child', shallow = True) == {'x' : True}
+
+    with Model.UnitOfWork():
+        Model.remove('table/a/child')
+        Model.write('table/b', 1)
+        assert Model.read('table/b') is None
+
+    assert Model.read('table') == {'a' : {'value' : 1}, 'b' : 1}
+
+
+def test_reads_are_not_cached_outside_a_request(backend):
+    backend.write('table/a', 1)
+    round_trips : int = backend.round_trips
+
+    Model.read('table/a')
+    Model.read('table/a')
+
+    assert backend.round_trips == round_trips + 2
@@ -0,0 +1,35 @@
+from    controllers     import PaymentController
+
+import  pytest
+
+
+def test_batch_creates_one_intent_per_known_receiver(backend, fake_stripe):
+    backend.write('receivers/r1', {'first_name' : 'A'})
+    backend.write('receivers/r2', {'first_name' : 'B'})
+
+    results : list[dict] = PaymentController.create_payments([
+        {'receiver_id' : 'r1',      'amount' : 10},
+        {'receiver_id' : 'missing', 'amount' : 5},
+        {'receiver_id' : 'r2',      'amount' : 2.5}
+    ], organization_id = 'org1')
+
+    assert [ 'client_secret' in result for result in results ] == [True, False, True]
+    assert results[1]['error'] == 'Receiver Not Found'
+    assert len(fake_stripe.intents) == 2
+
+    payments : dict = backend.read('payments')
+    assert sorted( payment['amount'] for payment in payments.values() ) == [2.5, 10]
+    assert all( payment['organization_id'] == 'org1' and not payment['confirmed'] for payment in payments.values() )
+
+
+def test_batch_is_validated_before_calling_stripe(fake_stripe):
+    with pytest.raises(PaymentController.PaymentError.InvalidBatch):
+        PaymentController.create_payments([])
+
+    with pytest.raises(PaymentController.PaymentError.InvalidBatch):
+        PaymentController.create_payments([{'receiver_id' : 'r1', 'amount' : -1}])
+
+    with pytest.raises(PaymentController.PaymentError.InvalidBatch):
+        PaymentController.create_payments([{'receiver_id' : 'r1', 'amount' : 1}] * (PaymentController.max_batch_size + 1))
+
+    assert fake_stripe.requests == 0
@@ -0,0 +1,125 @@
+from    controllers     import FeedController, Maintenance
+from    models          import Post
+
+import  pytest
+
+
+def thread( size : int ) -> list[str]:
+    root    : Post      = Post.create( 'author', {'text' : 'root'}, Post.PostVisibility.ALL )
+    ids     : list[str] = [root.id]
+
+    for index in range(1, size):
+        parent  : str   = ids[(index - 1) // 2]
+        reply   : Post  = Post.create( 'author', {'text' : f'reply {index}'}, Post.PostVisibility.ALL, parent_id = parent )
+        Post( parent ).reply( reply.id )
+        ids.append(reply.id)
+
+    return ids
+
+
+def test_small_thread_is_deleted_inline(backend):
+    ids : list[str] = thread(5)
+
+    Post( ids[0] ).delete()
+
+    assert not backend.read('posts/posts')
+    assert not backend.read('posts/public')
+    assert not backend.read('posts/previews')
+    assert not backend.read('posts/pending_deletes')
+
+
+def test_large_thread_deletes_a_bounded_part_inline(backend, monkeypatch):
+    monkeypatch.setattr(Post, 'MAX_INLINE_DELETE', 3)
+    ids : list[str] = thread(12)
+
+    before : int = backend.round_trips
+    Post( ids[0] ).delete()
+
+    assert backend.round_trips - before <= Post.MAX_INLINE_DELETE + 2
+    assert list(backend.read('posts/pending_deletes')) == [ids[0]]
+    assert backend.read(f'posts/posts/{ids[0]}/deleted') is True
+    assert not set(ids[:3]) & set(backend.read('posts/public'))
+
+    Maintenance.register( 'purge-deleted-posts', 60, Post.purge_deleted )
+    assert Maintenance.run_job( 'purge-deleted-posts' ) == 12
+
+    assert not backend.read('posts/posts')
+    assert not backend.read('posts/public')
+    assert not backend.read('posts/pending_deletes')
+
+
+def test_deleting_a_missing_post_fails():
+    with pytest.raises(Post.PostError.PostNotFound):
+        Post( 'missing' ).delete()
+
+
+def test_stale_author_refresh_reaches_replies(backend):
+    backend.write('receivers/r1', {'first_name' : 'Ann', 'last_name' : 'Bee'})
+
+    root    : Post = Post.create( 'r1', {'text' : 'root'}, Post.PostVisibility.ALL, author_summary = {'name' : 'Old'} )
+    reply   : Post = Post.create( 'r1', {'text' : 'reply'}, Post.PostVisibility.ALL, parent_id = root.id, author_summary = {'name' : 'Old'} )
+    Post( root.id ).reply( reply.id )
+
+    FeedController.invalidate_author( 'r1' )
+    Maintenance.register( 'refresh-author-snapshots', 60, FeedController.refresh_author_snapshots )
+
+    assert Maintenance.run_job( 'refresh-author-snapshots' ) == 2
+    for post_id in (root.id, reply.id):
+        assert backend.read(f'posts/posts/{post_id}/author_summary')['name'] == 'Ann B.'
+        assert backend.read(f'posts/previews/{post_id}/author_summary')['name'] == 'Ann B.'
+    assert not backend.read('posts/stale_authors')
+
+    Post( root.id ).delete()
+    assert not backend.read('posts/reply_authors')
+
+
+def test_previews_carry_counters_in_two_reads_per_post(backend):
+    posts : list[Post] = [ Post.create( 'author', {'text' : 'x' * (Post.PREVIEW_LENGTH + 10)}, Post.PostVisibility.ALL ) for _ in range(3) ]
+
+    Post( posts[0].id ).like( 'reader' )
+    Post( posts[0].id ).like( 'other' )
+    Post( posts[0].id ).count_reply()
+
+    before      : int   = backend.round_trips
+    previews    : list  = Post.get_previews( [post.id for post in posts] + ['missing'], 'reader' )
+
+    assert backend.round_trips - before == 2 * 4 + 1     # the missing preview falls back to one body read
+    assert previews[3] is None
+    assert previews[0]['like_count'] == 2 and previews[0]['liked_by_me'] and previews[0]['reply_count'] == 1
+    assert previews[1]['like_count'] == 0 and not previews[1]['liked_by_me']
+    assert previews[1]['truncated'] and len(previews[1]['content']['text']) == Post.PREVIEW_LENGTH
+
+
+def test_backfill_keeps_preview_counters(backend):
+    post : Post = Post.create( 'author', {'text' : 'hello'}, Post.PostVisibility.ALL )
+    Post( post.id ).like( 'reader' )
+    backend.write(f'posts/previews/{post.id}/content', None)
+
+    assert Post.backfill_previews() == 1
+    assert Post.get_previews( [post.id], 'reader' )[0]['like_count'] == 1
+    assert backend.read(f'posts/previews/{post.id}/content') == {'text' : 'hello'}
+
+
+def test_likes_are_counted_once_per_user_across_shards(backend):
+    post    : Post      = Post( Post.create( 'author', {'text' : 'hello'}, Post.PostVisibility.ALL ).id )
+    users   : list[str] = [f'user-{index}' for index in range(20)]
+
+    for user_id in users:
+        post.like( user_id )
+
+    with pytest.raises(Post.PostError.PostAlreadyLiked):
+        post.like( users[0] )
+
+    post.remove_like( users[0] )
+
+    with pytest.raises(Post.PostError.PostWasNotLiked):
+        post.remove_like( users[0] )
+
+    shards : dict = backend.read(f'posts/previews/{post.id}/like_shards')
+    assert 1 < len(shards) <= Post.LIKE_SHARDS
+    assert Post.get_previews( [post.id], users[1] )[0]['like_count'] == 19
+
+
+def test_liking_a_missing_post_fails_with_a_message():
+    with pytest.raises(Post.PostError.PostNotFound, match = 'Post not found'):
+        Post( 'missing' ).like( 'reader' )
@@ -0,0 +1,61 @@
+from    models          import Rollup, Transaction
+from    storage         import Storage
+
+import  pytest
+
+
+@pytest.fixture(autouse = True)
+def no_grace(monkeypatch):
+    monkeypatch.setattr(Rollup, 'DRAIN_GRACE', 0)
+
+
+def donation_in( user_id : str ) -> dict:
+    return Rollup( user_id ).get_bucket( Rollup.Period.MONTHLY )['metrics'].get('donation_in')
+
+
+def test_transactions_are_rolled_up_on_commit():
+    Transaction.create_transaction( 'r1', 10, Transaction.TransactionType.DONATION, 'd1' )
+    Transaction.create_transaction( 'r1', 2.5, Transaction.TransactionType.DONATION, 'd1' )
+
+    assert donation_in('r1') == {'amount' : 12.5, 'count' : 2}
+    assert Rollup( 'd1' ).get_bucket( Rollup.Period.DAILY )['metrics'] == {'donation_out' : {'amount' : 12.5, 'count' : 2}}
+
+
+def test_rebuild_replaces_drifted_rollups_in_chunks(monkeypatch):
+    monkeypatch.setattr(Rollup, 'WRITE_CHUNK', 1)
+    for receiver_id in ('r1', 'r2', 'r3'):
+        Transaction.create_transaction( receiver_id, 5, Transaction.TransactionType.DONATION, 'd1' )
+    Storage.reference('/rollups/r1').delete()
+    Storage.reference('/rollups/ghost/monthly/2020-01').set({'donation_in' : {'amount' : 1, 'count' : 1}})
+
+    assert Rollup.rebuild( Transaction.BASE_TABLE ) == 3
+
+    assert [ donation_in(user_id) for user_id in ('r1', 'r2', 'r3') ] == [{'amount' : 5, 'count' : 1}] * 3
+    assert Storage.reference('/rollups/ghost').get() is None
+    assert Storage.reference('/rollup_rebuild').get() == {'generation' : 1}
+
+
+def test_increment_read_before_a_rebuild_is_not_counted_twice():
+    Transaction.create_transaction( 'r1', 5, Transaction.TransactionType.DONATION, 'd1' )
+    transaction_id, transaction_data = next(Rollup.scan_transactions( Transaction.BASE_TABLE ))
+    Storage.reference('/rollups').delete()
+
+    Rollup.rebuild( Transaction.BASE_TABLE )
+    Rollup._Rollup__increment( transaction_data, 0 )
+
+    assert donation_in('r1') == {'amount' : 5, 'count' : 1}
+
+
+def test_transactions_recorded_during_a_rebuild_are_drained(monkeypatch):
+    Transaction.create_transaction( 'r1', 5, Transaction.TransactionType.DONATION, 'd1' )
+    scan = Rollup.scan_transactions
+
+    def scan_then_record( table : str ):
+        yield from scan( table )
+        Transaction.create_transaction( 'r1', 7, Transaction.TransactionType.DONATION, 'd1' )
+
+    monkeypatch.setattr(Rollup, 'scan_transactions', scan_then_record)
+
+    assert Rollup.rebuild( Transaction.BASE_TABLE ) == 1
+    assert donation_in('r1') == {'amount' : 12, 'count' : 2}
+    assert Storage.reference(f'/{Rollup.PENDING_TABLE}').get() is None
@@ -0,0 +1,50 @@
+from    controllers     import TransactionController
+from    models          import Transaction
+
+import  pytest
+import  time
+
+
+@pytest.fixture
+def history() -> list[str]:
+    ids : list[str] = []
+
+    for index in range(7):
+        ids.append( Transaction.create_transaction( 'r1', index + 1, Transaction.TransactionType.DONATION, 'd1' ) )
+        time.sleep(0.001)
+    Transaction.create_transaction( 'r2', 100, Transaction.TransactionType.DONATION, 'd1' )
+
+    return ids[::-1]
+
+
+def test_history_without_paging_arguments_is_complete(history):
+    transactions, cursor = TransactionController.get_transactions( 'r1' )
+
+    assert [ transaction['id'] for transaction in transactions ] == history
+    assert cursor is None
+
+
+def test_cursor_pages_walk_the_history_newest_first(history):
+    seen    : list[str]     = []
+    cursor  : str | None    = None
+
+    while True:
+        transactions, cursor = TransactionController.get_transactions( 'r1', cursor, 3 )
+        assert len(transactions) == 3 or cursor is None
+        seen.extend( transaction['id'] for transaction in transactions )
+        if cursor is None:
+            break
+
+    assert seen == history
+
+
+def test_sender_history_is_indexed(history):
+    transactions, _ = TransactionController.get_transactions( 'd1', limit = 100 )
+
+    assert len(transactions) == 8
+
+
+def test_invalid_cursor_is_rejected():
+    for cursor in ('not-a-cursor', 'WyJhIl0='):
+        with pytest.raises(TransactionController.TransactionError.InvalidCursor):
+            TransactionController.get_transactions( 'r1', cursor )
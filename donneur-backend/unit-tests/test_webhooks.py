@@ -0,0 +1,74 @@
+from    controllers     import PaymentController
+from    models          import Receiver
+
+import  hashlib
+import  pytest
+import  hmac
+import  json
+import  time
+
+
+def sign( payload : bytes, secret : str = 'whsec_test' ) -> str:
+    timestamp : int = int(time.time())
+    digest    : str = hmac.new( secret.encode(), f'{timestamp}.'.encode() + payload, hashlib.sha256 ).hexdigest()
+    return f't={timestamp},v1={digest}'
+
+
+def event( event_id : str, intent_id : str = 'pi_1' ) -> bytes:
+    return json.dumps({
+        'id'    : event_id,
+        'type'  : 'payment_intent.succeeded',
+        'data'  : { 'object' : { 'id' : intent_id, 'payment_method' : 'pm_1' } }
+    }).encode()
+
+
+@pytest.fixture
+def payment(backend) -> None:
+    backend.write('receivers/r1', {'first_name' : 'A'})
+    backend.write('payments/pi_1', {'receiver_id' : 'r1', 'amount' : 25, 'confirmed' : False})
+
+
+def test_redelivered_events_credit_once(backend, payment, fake_stripe, webhook_queue):
+    deliveries : list[bytes] = [ event('evt_1'), event('evt_1'), event('evt_2') ]
+
+    queued : list[bool] = [ PaymentController.receive_webhook( payload, sign(payload) ) for payload in deliveries ]
+
+    assert queued == [True, False, True]
+    assert webhook_queue.drain() == 2
+    assert Receiver('r1').get_balance() == 25
+    assert len(backend.read('transactions')) == 1
+    assert backend.read('payments/pi_1/confirmed') is True
+
+
+def test_failed_confirmation_is_retried(backend, payment, fake_stripe, webhook_queue, monkeypatch):
+    calls : list = []
+
+    def flaky( *args, **kwargs ):
+        calls.append(args)
+        if len(calls) == 1:
+            raise RuntimeError('storage unavailable')
+        return 'sender'
+
+    monkeypatch.setattr('models.Sender.create_anonymous', flaky)
+
+    payload : bytes = event('evt_1')
+    PaymentController.receive_webhook( payload, sign(payload) )
+
+    assert webhook_queue.drain( limit = 1 ) == 1
+    assert backend.read('payments/pi_1/confirmed') is False
+    assert backend.read('payments/pi_1/processing') is None
+
+    time.sleep(0.05)
+    webhook_queue.drain()
+    assert Receiver('r1').get_balance() == 25
+
+
+def test_unsigned_events_are_rejected(payment, webhook_queue):
+    payload : bytes = event('evt_1')
+
+    with pytest.raises(PaymentController.PaymentError.InvalidWebhook):
+        PaymentController.receive_webhook( payload, sign(payload, 'whsec_other') )
+
+    PaymentController.webhook_secret = None
+    with pytest.raises(PaymentController.PaymentError.InvalidWebhook):
+        PaymentController.receive_webhook( payload )
@@ -1,2 +1,5 @@
-from .sendmail      import SendMail
-from .google_maps   import GoogleMaps
\ No newline at end of file
+from .sendmail          import SendMail
+from .google_maps       import GoogleMaps
+from .cursor            import Cursor
+from .feed_engine       import FeedEngine
+from .suggestion_engine import SuggestionEngine
@@ -0,0 +1,20 @@
+import  base64
+import  json
+
+
+class Cursor:
+
+    class CursorError(Exception):
+        class InvalidCursor (Exception) : pass
+
+    def encode( value ) -> str:
+        return base64.urlsafe_b64encode( json.dumps(value, separators = (',', ':')).encode() ).decode()
+
+    def decode( cursor : str ):
+        try:
+            return json.loads( base64.urlsafe_b64decode(cursor.encode()) )
+        except ValueError:
+            raise Cursor.CursorError.InvalidCursor('Invalid cursor')
+
+    def is_position( value ) -> bool:
+        return isinstance(value, list) and len(value) == 2 and all(isinstance(item, str) for item in value)
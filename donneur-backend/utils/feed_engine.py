@@ -0,0 +1,101 @@
+from    typing          import Callable, Iterable, Iterator
+from    .cursor         import Cursor
+import  itertools
+import  heapq
+
+
+class FeedEngine:
+
+    class FeedEngineError(Exception):
+        class InvalidCursor (Exception) : pass
+
+    PUBLIC_EVERY : int = 5
+
+    def newest_first( entries : dict, limit : int = None, presorted : bool = False ) -> Iterator[tuple[str, str]]:
+        if not entries:
+            return iter(())
+
+        if presorted:
+            stream = ( (created_at, post_id) for post_id, created_at in reversed(list(entries.items())) )
+            return itertools.islice(stream, limit) if limit is not None else stream
+
+        if limit is not None:
+            return iter(heapq.nlargest( limit, ((created_at, post_id) for post_id, created_at in entries.items()) ))
+
+        return iter(sorted( ((created_at, post_id) for post_id, created_at in entries.items()), reverse = True ))
+
+    def start() -> dict:
+        return { 'followed' : None, 'public' : None, 'since_public' : 0 }
+
+    def encode_cursor( state : dict ) -> str:
+        return Cursor.encode( state )
+
+    def decode_cursor( cursor : str | None ) -> dict:
+        if not cursor:
+            return FeedEngine.start()
+
+        try:
+            state : dict = Cursor.decode( cursor )
+        except Cursor.CursorError.InvalidCursor as e:
+            raise FeedEngine.FeedEngineError.InvalidCursor(str(e))
+
+        if not isinstance(state, dict) or set(state) != set(FeedEngine.start()) or not isinstance(state['since_public'], int):
+            raise FeedEngine.FeedEngineError.InvalidCursor('Invalid cursor')
+
+        for position in (state['followed'], state['public']):
+            if position is not None and not Cursor.is_position( position ):
+                raise FeedEngine.FeedEngineError.InvalidCursor('Invalid cursor')
+
+        return state
+
+    def keyset( fetch : Callable[[str | None, int], dict], batch : int, position : list | None = None, first : dict = None ) -> Iterator[tuple[str, str]]:
+        position    : tuple | None  = tuple(position) if position else None
+        entries     : dict          = first if first is not None else fetch(position[0] if position else None, batch)
+
+        while entries:
+            older : list = [entry for entry in FeedEngine.newest_first(entries) if position is None or entry < position]
+            yield from older
+
+            if len(entries) < batch or not older:
+                return
+
+            position = older[-1]
+            entries  = fetch(position[0], batch)
+
+    def merge( followed : Iterable[Iterable[tuple[str, str]]], public : Iterable[tuple[str, str]], public_every : int = None, state : dict = None ) -> Iterator[tuple[str, bool]]:
+        public_every    : int               = public_every or FeedEngine.PUBLIC_EVERY
+        state           : dict              = state if state is not None else FeedEngine.start()
+        followed_stream : Iterator          = heapq.merge( *followed, reverse = True )
+        public_stream   : Iterator          = iter(public)
+        seen            : set[str]          = set()
+
+        def next_public() -> str | None:
+            for entry in public_stream:
+                state['public'] = list(entry)
+                if entry[1] not in seen:
+                    return entry[1]
+            return None
+
+        for entry in followed_stream:
+            if state['since_public'] >= public_every:
+                state['since_public'] = 0
+
+                public_id : str | None = next_public()
+                if public_id is not None:
+                    seen.add(public_id)
+                    yield public_id, True
+
+            state['followed'] = list(entry)
+
+            if entry[1] in seen:
+                continue
+            seen.add(entry[1])
+            state['since_public'] += 1
+            yield entry[1], False
+
+        while (public_id := next_public()) is not None:
+            seen.add(public_id)
+            yield public_id, True
+
+    def take( stream : Iterator, limit : int ) -> list:
+        return list(itertools.islice(stream, limit))
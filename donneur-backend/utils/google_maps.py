@@ -1,6 +1,5 @@
 import  requests
 import  urllib.parse
-from    controllers     import Controller
 
 
 class GoogleMaps:
@@ -8,6 +7,7 @@ class GoogleMaps:
     BASE_URL : str = 'https://maps.googleapis.com/maps/api/geocode/json?address={}&key={}'
 
     def coordinates_from_address ( address : str ) -> tuple[float, float]:
+        from controllers import Controller
 
         response    : requests.Response = requests.get( GoogleMaps.BASE_URL.format( urllib.parse.quote(address), Controller.google_key) )
 
@@ -0,0 +1,101 @@
+from    collections     import defaultdict
+from    typing          import Iterable, Iterator
+import  itertools
+import  heapq
+import  zlib
+
+
+class SuggestionEngine:
+
+    TOP_K           : int   = 10
+    MAX_FANOUT      : int   = 200
+    MAX_SHELTER     : int   = 50
+    FRIEND_WEIGHT   : float = 1.0
+    SHELTER_WEIGHT  : float = 0.5
+
+    def build_graph( friendships : dict ) -> tuple[dict[str, set], dict[str, set]]:
+        friends : dict[str, set] = defaultdict(set)
+        linked  : dict[str, set] = defaultdict(set)
+
+        for friendship in (friendships or {}).values():
+            if not isinstance(friendship, dict):
+                continue
+
+            user_1 : str = friendship.get('user_1')
+            user_2 : str = friendship.get('user_2')
+            if not user_1 or not user_2 or user_1 == user_2:
+                continue
+
+            linked[user_1].add(user_2)
+            linked[user_2].add(user_1)
+
+            if friendship.get('friends_since'):
+                friends[user_1].add(user_2)
+                friends[user_2].add(user_1)
+
+        return friends, linked
+
+    def build_shelters( subscriptions : dict ) -> tuple[dict[str, list], dict[str, list]]:
+        shelters    : dict[str, list] = {}
+        members     : dict[str, list] = defaultdict(list)
+
+        for user, organizations in (subscriptions or {}).items():
+            if not isinstance(organizations, dict):
+                continue
+
+            shelters[user] = list(organizations)
+            for organization in organizations:
+                members[organization].append(user)
+
+        return shelters, members
+
+    def __sample( user : str, pool : list ) -> Iterable[str]:
+        if len(pool) <= SuggestionEngine.MAX_SHELTER:
+            return pool
+
+        offset  : int   = zlib.crc32(user.encode()) % len(pool)
+        sample  : list  = pool[offset : offset + SuggestionEngine.MAX_SHELTER]
+        return sample + pool[: SuggestionEngine.MAX_SHELTER - len(sample)]
+
+    def suggest( user : str, friends : dict, linked : dict, shelters : dict, members : dict, top_k : int = None ) -> list[dict]:
+        excluded    : set   = linked.get(user, set())
+        scores      : dict  = {}
+
+        for friend in itertools.islice(friends.get(user, ()), SuggestionEngine.MAX_FANOUT):
+            for candidate in itertools.islice(friends.get(friend, ()), SuggestionEngine.MAX_FANOUT):
+                if candidate == user or candidate in excluded:
+                    continue
+                scores.setdefault(candidate, [0, 0])[0] += 1
+
+        for shelter in shelters.get(user, ()):
+            for candidate in SuggestionEngine.__sample(user, members.get(shelter, [])):
+                if candidate == user or candidate in excluded:
+                    continue
+                scores.setdefault(candidate, [0, 0])[1] += 1
+
+        def score( counts : list ) -> float:
+            return counts[0] * SuggestionEngine.FRIEND_WEIGHT + counts[1] * SuggestionEngine.SHELTER_WEIGHT
+
+        best : list = heapq.nlargest(
+            top_k or SuggestionEngine.TOP_K, scores.items(), key = lambda item : (score(item[1]), item[0])
+        )
+
+        return [
+            {
+                'id'                : candidate,
+                'score'             : score(counts),
+                'mutual_friends'    : counts[0],
+                'shared_shelters'   : counts[1]
+            }
+            for candidate, counts in best
+        ]
+
+    def suggest_all( friendships : dict, subscriptions : dict, top_k : int = None ) -> Iterator[tuple[str, list[dict]]]:
+        friends, linked     = SuggestionEngine.build_graph( friendships )
+        shelters, members   = SuggestionEngine.build_shelters( subscriptions )
+
+        return SuggestionEngine.suggest_graph( friends, linked, shelters, members, top_k )
+
+    def suggest_graph( friends : dict, linked : dict, shelters : dict, members : dict, top_k : int = None ) -> Iterator[tuple[str, list[dict]]]:
+        for user in dict.fromkeys(itertools.chain(friends, shelters)):
+            yield user, SuggestionEngine.suggest( user, friends, linked, shelters, members, top_k )